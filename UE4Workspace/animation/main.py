@@ -1,7 +1,10 @@
 import bpy
 from bpy.utils import register_class, unregister_class
 from bpy.types import Operator, UIList
-from .. utils.base import ExportOperator, Panel, ExportOptionPanel
+from .. utils.base import ExportOperator, UniqueNameAllocator, Panel, ExportOptionPanel
+from .. utils.export_scene import ExportScene
+from .. utils import key_reduction
+from .. utils import worker
 
 class ANIMATION_UL_action_list(UIList):
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
@@ -137,7 +140,7 @@ class OP_ExportAnimationMesh(ExportOperator):
                 return bool(preferences.export.export_folder.strip())
         return False
 
-    def execute(self, context):
+    def export_steps(self, context):
         preferences = context.preferences.addons['UE4Workspace'].preferences
         animation = preferences.animation
         fbx_setting = animation.fbx
@@ -145,12 +148,15 @@ class OP_ExportAnimationMesh(ExportOperator):
 
         active_object = context.active_object
         selected_objects = context.selected_objects
+        scene = context.scene
+
+        profiler = self.create_export_profiler('animation')
 
         directory = self.create_string_directory(preferences.export.export_folder if preferences.export.type in ['FILE','BOTH'] else preferences.export.temp_folder, animation.subfolder)
 
         self.create_directory_if_not_exist(directory, animation.subfolder)
 
-        list_name_animations = []
+        name_allocator = UniqueNameAllocator()
         unreal_engine_import_setting = {
             'files': [],
             'main_folder': self.safe_string_path(preferences.connect_unreal_engine.main_folder),
@@ -161,6 +167,26 @@ class OP_ExportAnimationMesh(ExportOperator):
 
         unreal_engine_import_setting.update(unreal_engine_setting.to_dict())
 
+        # to unreal engine only keep the cache in temporary folder, the import record is the asset in unreal engine project
+        export_cache = self.create_export_cache(directory, ['FILE', 'BOTH', 'UNREAL'])
+        remote_asset_names = yield from self.get_remote_asset_names(unreal_engine_import_setting, ['AnimSequence'], [animation.skeleton.split(':')[0]])
+
+        export_actions = [action for action in bpy.data.actions if action.is_export and (not worker.is_worker() or action.name in worker.job_objects)]
+
+        if self.is_background_export(export_actions):
+            # bake time follow the frame count, longest action go first on the least busy worker
+            return (yield from self.execute_background(directory, export_actions, 'animation', 'ImportAnimation.py', unreal_engine_import_setting, weight=(lambda action: 1 + int(action.frame_range[1] - action.frame_range[0])), data={'remote_asset_names': (sorted(remote_asset_names) if remote_asset_names is not None else None)}))
+
+        self.create_import_pipeline('ImportAnimation.py', unreal_engine_import_setting)
+
+        cache_setting = {
+            'fbx': fbx_setting.to_dict(),
+            'unreal_engine': unreal_engine_setting.to_dict(),
+            'option': [animation.use_custom_props, animation.apply_rotation, animation.root_bone, animation.origin, animation.skeleton],
+            'key_reduction': [fbx_setting.key_reduction, fbx_setting.key_reduction_location, fbx_setting.key_reduction_rotation, fbx_setting.key_reduction_scale],
+            'scene': [scene.frame_start, scene.frame_end, scene.render.fps, scene.render.fps_base]
+        }
+
         bpy.ops.object.select_all(action='DESELECT')
 
         self.mute_attach_constraint(active_object)
@@ -168,8 +194,8 @@ class OP_ExportAnimationMesh(ExportOperator):
         active_object.select_set(True)
 
         original_action = active_object.animation_data.action
-        original_frame_start = context.scene.frame_start
-        original_frame_end = context.scene.frame_end
+        original_frame_start = scene.frame_start
+        original_frame_end = scene.frame_end
 
         original_object_name = active_object.name
         is_armature_has_root_bone = active_object.data.bones.get('root', False)
@@ -184,90 +210,130 @@ class OP_ExportAnimationMesh(ExportOperator):
         elif animation.root_bone == 'OBJECT':
             pass
 
-        export_actions = [action for action in bpy.data.actions if action.is_export]
-
-        for export_action in export_actions:
-            filename = self.safe_string_path(export_action.name)
-            check_duplicate = len([animation_name for animation_name in list_name_animations if animation_name.startswith(filename)])
-            list_name_animations.append(filename)
-
-            filename += '_' + str(check_duplicate) if bool(check_duplicate) else ''
-            filename_ext = filename + '.' + self.ext_file
-
-            if not self.is_file_exist(directory, filename_ext) or animation.overwrite_file:
-
-                original_location = active_object.matrix_world.to_translation()
-                if animation.origin == 'OBJECT':
-                    active_object.matrix_world.translation = (0, 0, 0)
-
-                original_rotation = active_object.rotation_quaternion.copy() if active_object.rotation_mode == 'QUATERNION' else active_object.rotation_euler.copy()
-                if not animation.apply_rotation:
-                    if active_object.rotation_mode == 'QUATERNION':
-                        active_object.rotation_quaternion = (1, 0, 0, 0)
-                    else:
-                        active_object.rotation_euler = (0, 0, 0)
-
-                active_object.animation_data.action = export_action
-
-                if fbx_setting.bake_anim_force_startend_keying:
-                    context.scene.frame_start, context.scene.frame_end = export_action.frame_range
-
-                export_setting = {
-                    'filepath': self.create_string_directory(directory, filename_ext),
-                    'check_existing': False,
-                    'filter_glob': '*.fbx',
-                    'use_selection': True,
-                    'use_active_collection': False,
-                    'object_types': {'ARMATURE'},
-                    'use_custom_props': animation.use_custom_props,
-                    'bake_anim': True,
-                    'bake_anim_use_nla_strips': False,
-                    'bake_anim_use_all_actions': False,
-                    'path_mode': 'AUTO',
-                    'embed_textures': False,
-                    'batch_mode': 'OFF'
-                }
-
-                export_setting.update(fbx_setting.to_dict())
-
-                # EXPORT
-                bpy.ops.export_scene.fbx(**export_setting)
-
-                unreal_engine_import_setting['files'].append({
-                    'path': export_setting['filepath'],
-                    'skeleton': animation.skeleton
-                })
-
-                if animation.origin == 'OBJECT':
-                    active_object.matrix_world.translation = original_location
-
-                if not animation.apply_rotation:
-                    if active_object.rotation_mode == 'QUATERNION':
-                        active_object.rotation_quaternion = original_rotation
-                    else:
-                        active_object.rotation_euler = original_rotation
-
-        self.unmute_attach_constraint(active_object)
-
-        active_object.select_set(False)
-
-        active_object.animation_data.action = original_action
-        context.scene.frame_start = original_frame_start
-        context.scene.frame_end = original_frame_end
-
-        if animation.root_bone == 'ARMATURE':
-            active_object.name = original_object_name
-        elif animation.root_bone == 'AUTO':
-            active_object.name = original_object_name
-        elif animation.root_bone == 'OBJECT':
-            pass
-
-        for obj in selected_objects:
-            obj.select_set(state=True)
-
-        self.unreal_engine_exec_script('ImportAnimation.py', unreal_engine_import_setting)
-
-        self.report({'INFO'}, 'export ' + str(len(unreal_engine_import_setting['files'])) + ' animation success')
+        # bake in a scene with only the armature, the rest of the scene is not evaluated on every frame
+        export_scene = ExportScene(scene) if preferences.export.temporary_scene else None
+        bake_scene = scene
+        if export_scene is not None:
+            export_scene.add_armature(active_object)
+            bake_scene = export_scene.scene
+
+        try:
+            for index, export_action in enumerate(export_actions):
+                # upload of the file added by the previous item, its changes to the scene are restored
+                yield from self.send_import_files()
+
+                yield index, len(export_actions)
+
+                filename = name_allocator.allocate(self.safe_string_path(export_action.name))
+                filename_ext = filename + '.' + self.ext_file
+
+                if not self.is_file_exist(directory, filename_ext) or animation.overwrite_file:
+
+                    filepath = self.create_string_directory(directory, filename_ext)
+                    digest = export_cache.create_digest(objects=[active_object], actions=[export_action], setting=cache_setting, pose=False)
+                    # unreal engine name the anim sequence after the file
+                    is_imported = remote_asset_names is not None and filename in remote_asset_names
+                    if preferences.export.type == 'UNREAL':
+                        if export_cache.is_cached(filepath, digest, is_exist=is_imported):
+                            continue
+                    elif export_cache.is_cached(filepath, digest):
+                        # file is up to date, only import it when the anim sequence is missing from unreal engine project
+                        if remote_asset_names is not None and not is_imported:
+                            self.add_import_file(unreal_engine_import_setting, {
+                                'path': filepath,
+                                'skeleton': animation.skeleton
+                            })
+                        continue
+
+                    original_location = active_object.matrix_world.to_translation()
+                    if animation.origin == 'OBJECT':
+                        active_object.matrix_world.translation = (0, 0, 0)
+
+                    original_rotation = active_object.rotation_quaternion.copy() if active_object.rotation_mode == 'QUATERNION' else active_object.rotation_euler.copy()
+                    if not animation.apply_rotation:
+                        if active_object.rotation_mode == 'QUATERNION':
+                            active_object.rotation_quaternion = (1, 0, 0, 0)
+                        else:
+                            active_object.rotation_euler = (0, 0, 0)
+
+                    active_object.animation_data.action = export_action
+
+                    if fbx_setting.bake_anim_force_startend_keying:
+                        bake_scene.frame_start, bake_scene.frame_end = export_action.frame_range
+
+                    export_setting = {
+                        'filepath': filepath,
+                        'check_existing': False,
+                        'filter_glob': '*.fbx',
+                        'use_selection': True,
+                        'use_active_collection': False,
+                        'object_types': {'ARMATURE'},
+                        'use_custom_props': animation.use_custom_props,
+                        'bake_anim': True,
+                        'bake_anim_use_nla_strips': False,
+                        'bake_anim_use_all_actions': False,
+                        'path_mode': 'AUTO',
+                        'embed_textures': False,
+                        'batch_mode': 'OFF'
+                    }
+
+                    export_setting.update(fbx_setting.to_dict())
+
+                    # EXPORT
+                    self.export_file(bpy.ops.export_scene.fbx, export_action.name, export_setting, export_scene)
+
+                    if fbx_setting.key_reduction:
+                        with self.profiler.phase('key_reduction', export_action.name):
+                            key_reduction.reduce_fbx_animation(filepath, fbx_setting.key_reduction_location, fbx_setting.key_reduction_rotation, fbx_setting.key_reduction_scale, use_compression=(preferences.export.type != 'UNREAL'))
+
+                    export_cache.update(filepath, digest)
+
+                    self.add_import_file(unreal_engine_import_setting, {
+                        'path': export_setting['filepath'],
+                        'skeleton': animation.skeleton
+                    })
+
+                    if animation.origin == 'OBJECT':
+                        active_object.matrix_world.translation = original_location
+
+                    if not animation.apply_rotation:
+                        if active_object.rotation_mode == 'QUATERNION':
+                            active_object.rotation_quaternion = original_rotation
+                        else:
+                            active_object.rotation_euler = original_rotation
+        finally:
+            if export_scene is not None:
+                export_scene.remove()
+
+            self.unmute_attach_constraint(active_object)
+
+            active_object.select_set(False)
+
+            active_object.animation_data.action = original_action
+            scene.frame_start = original_frame_start
+            scene.frame_end = original_frame_end
+
+            if animation.root_bone == 'ARMATURE':
+                active_object.name = original_object_name
+            elif animation.root_bone == 'AUTO':
+                active_object.name = original_object_name
+            elif animation.root_bone == 'OBJECT':
+                pass
+
+            for obj in selected_objects:
+                obj.select_set(state=True)
+
+        yield from self.send_import_files()
+
+        export_cache.save()
+
+        yield len(export_actions), len(export_actions)
+
+        yield from self.unreal_engine_exec_script_steps('ImportAnimation.py', unreal_engine_import_setting)
+
+        profiler.write(directory)
+
+        self.report({'INFO'}, 'export ' + str(len(unreal_engine_import_setting['files'])) + ' animation success' + export_cache.summary + profiler.summary)
 
         return {'FINISHED'}
 
@@ -353,6 +419,10 @@ class SUB_PANEL_1(ExportOptionPanel):
                 ('Force Start/End Keying', 'bake_anim_force_startend_keying'),
                 ('Sampling Rate', 'bake_anim_step'),
                 ('Simplify', 'bake_anim_simplify_factor'),
+                ('Key Reduction', 'key_reduction'),
+                ('Location Tolerance', 'key_reduction_location'),
+                ('Rotation Tolerance', 'key_reduction_rotation'),
+                ('Scale Tolerance', 'key_reduction_scale'),
             ],
         })
 
@@ -0,0 +1,16 @@
+import sys
+import bpy
+import addon_utils
+
+# run by background Blender process, export or LOD job
+# blender --background snapshot.blend --python ExportWorker.py -- job.json
+
+if 'UE4Workspace' not in bpy.context.preferences.addons:
+    addon_utils.enable('UE4Workspace', default_set=False)
+
+from UE4Workspace.utils import worker
+
+result = worker.run_job(sys.argv[sys.argv.index('--') + 1])
+
+if 'FINISHED' not in result:
+    sys.exit(1)
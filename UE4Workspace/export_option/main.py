@@ -14,7 +14,7 @@ class OP_ConnectToUnrealEngine(Operator):
         if remote.is_connect:
             remote.disconnect()
         else:
-            remote.connect(DEFAULT_MULTICAST_TTL=connect_unreal_engine.multicast_ttl, DEFAULT_MULTICAST_GROUP_ENDPOINT=(connect_unreal_engine.multicast_group_end_point.split(':')[0], int(connect_unreal_engine.multicast_group_end_point.split(':')[1])), DEFAULT_MULTICAST_BIND_ADDRESS=connect_unreal_engine.multicast_bind_address, DEFAULT_COMMAND_ENDPOINT=('127.0.0.1', 6776))
+            remote.connect(DEFAULT_MULTICAST_TTL=connect_unreal_engine.multicast_ttl, DEFAULT_MULTICAST_GROUP_ENDPOINT=(connect_unreal_engine.multicast_group_end_point.split(':')[0], int(connect_unreal_engine.multicast_group_end_point.split(':')[1])), DEFAULT_MULTICAST_BIND_ADDRESS=connect_unreal_engine.multicast_bind_address, DEFAULT_COMMAND_ENDPOINT=('127.0.0.1', 6776), DEFAULT_COMMAND_TIMEOUT=(connect_unreal_engine.command_timeout or None))
 
         return {'FINISHED'}
 
@@ -37,21 +37,34 @@ class PANEL(Panel):
         layout = self.layout
         preferences = context.preferences.addons['UE4Workspace'].preferences
 
-        row = layout.row()
-        split = row.split(factor=0.6)
-        col = split.column()
-        col.alignment = 'RIGHT'
-        col.label(text='Export Type')
-        col = split.column()
-        col.prop(preferences.export, 'type', text='')
-
-        row = layout.row()
-        split = row.split(factor=0.6)
-        col = split.column()
-        col.alignment = 'RIGHT'
-        col.label(text=('Export Folder' if preferences.export.type in ['BOTH', 'FILE'] else 'Temporary Folder'))
-        col = split.column()
-        col.prop(preferences.export, ('export_folder' if preferences.export.type in ['BOTH', 'FILE'] else 'temp_folder'), text='')
+        col_data = [
+            ('Export Type', 'type'),
+            (('Export Folder', 'export_folder') if preferences.export.type in ['BOTH', 'FILE'] else ('Temporary Folder', 'temp_folder')),
+            ('Export Cache', 'use_cache'),
+        ]
+
+        if preferences.export.type in ['BOTH', 'UNREAL']:
+            col_data.append(('Batch Import', 'batch_import'))
+            col_data.append(('Pipeline Import', 'pipeline_import'))
+
+        if preferences.export.type == 'UNREAL':
+            col_data.append(('Transfer', 'transfer'))
+
+        col_data += [
+            ('Temporary Export Scene', 'temporary_scene'),
+            ('Non-Blocking Export', 'modal'),
+            ('Background Workers', 'background_worker'),
+            ('Export Profiler', 'profile'),
+        ]
+
+        for label_str, property_str in col_data:
+            row = layout.row()
+            split = row.split(factor=0.6)
+            col = split.column()
+            col.alignment = 'RIGHT'
+            col.label(text=label_str)
+            col = split.column()
+            col.prop(preferences.export, property_str, text='')
 
         if preferences.export.type in ['BOTH', 'UNREAL']:
             col = layout.column()
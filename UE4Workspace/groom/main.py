@@ -1,7 +1,7 @@
 import bpy
 from bpy.types import Operator
 from bpy.utils import register_class, unregister_class
-from .. utils.base import ExportOperator, ExperimentalPanel
+from .. utils.base import ExportOperator, UniqueNameAllocator, ExperimentalPanel
 
 class OP_ExportGroom(ExportOperator):
     bl_idname = 'ue4workspace.export_groom'
@@ -10,19 +10,21 @@ class OP_ExportGroom(ExportOperator):
 
     ext_file = 'abc'
 
-    def execute(self, context):
+    def export_steps(self, context):
         preferences = context.preferences.addons['UE4Workspace'].preferences
         groom = preferences.groom
 
         selected_objects = context.selected_objects
-        objects = context.scene.objects if groom.option == 'ALL' else selected_objects
+        objects = self.get_objects(context, groom.option)
         objects = [obj for obj in objects if obj.type == 'MESH' and 'HAIR' in [mod.particle_system.settings.type for mod in obj.modifiers if mod.type == 'PARTICLE_SYSTEM'] and not obj.data.mesh_as_lod]
 
+        profiler = self.create_export_profiler('groom')
+
         directory = self.create_string_directory(preferences.export.export_folder if preferences.export.type in ['FILE','BOTH'] else preferences.export.temp_folder, groom.subfolder)
 
         self.create_directory_if_not_exist(directory, groom.subfolder)
 
-        list_name_objects = []
+        name_allocator = UniqueNameAllocator()
         unreal_engine_import_setting = {
             'files': [],
             'main_folder': self.safe_string_path(preferences.connect_unreal_engine.main_folder),
@@ -31,115 +33,122 @@ class OP_ExportGroom(ExportOperator):
             'temporary': preferences.export.type == 'UNREAL'
         }
 
-        bpy.ops.object.select_all(action='DESELECT')
-
-        for obj in objects:
-            filename = self.safe_string_path(obj.name)
-            check_duplicate = len([obj_name for obj_name in list_name_objects if obj_name.startswith(filename)])
-            list_name_objects.append(filename)
-
-            filename += '_' + str(check_duplicate) if bool(check_duplicate) else ''
-            filename_ext = filename + '.' + self.ext_file
-
-            if not self.is_file_exist(directory, filename_ext) or groom.overwrite_file:
+        if self.is_background_export(objects):
+            return (yield from self.execute_background(directory, objects, 'groom', None, unreal_engine_import_setting))
 
-                self.mute_attach_constraint(obj)
-
-                original_location = obj.matrix_world.to_translation()
-                if groom.origin == 'OBJECT':
-                    obj.matrix_world.translation = (0, 0, 0)
-
-                original_rotation = obj.rotation_quaternion.copy() if obj.rotation_mode == 'QUATERNION' else obj.rotation_euler.copy()
-                if not groom.apply_rotation:
-                    if obj.rotation_mode == 'QUATERNION':
-                        obj.rotation_quaternion = (1, 0, 0, 0)
-                    else:
-                        obj.rotation_euler = (0, 0, 0)
-
-                self.prepare_groom(obj)
+        bpy.ops.object.select_all(action='DESELECT')
 
+        try:
+            for index, obj in enumerate(objects):
+                yield index, len(objects)
+
+                filename = name_allocator.allocate(self.safe_string_path(obj.name))
+                filename_ext = filename + '.' + self.ext_file
+
+                if not self.is_file_exist(directory, filename_ext) or groom.overwrite_file:
+
+                    self.mute_attach_constraint(obj)
+
+                    original_location = obj.matrix_world.to_translation()
+                    if groom.origin == 'OBJECT':
+                        obj.matrix_world.translation = (0, 0, 0)
+
+                    original_rotation = obj.rotation_quaternion.copy() if obj.rotation_mode == 'QUATERNION' else obj.rotation_euler.copy()
+                    if not groom.apply_rotation:
+                        if obj.rotation_mode == 'QUATERNION':
+                            obj.rotation_quaternion = (1, 0, 0, 0)
+                        else:
+                            obj.rotation_euler = (0, 0, 0)
+
+                    self.prepare_groom(obj)
+
+                    obj.select_set(state=True)
+
+                    export_setting = {
+                        'filepath': self.create_string_directory(directory, filename_ext),
+                        'check_existing': False,
+                        'filter_blender': False,
+                        'filter_backup': False,
+                        'filter_image': False,
+                        'filter_movie': False,
+                        'filter_python': False,
+                        'filter_font': False,
+                        'filter_sound': False,
+                        'filter_text': False,
+                        'filter_archive': False,
+                        'filter_btx': False,
+                        'filter_collada': False,
+                        'filter_alembic': True,
+                        'filter_usd': False,
+                        'filter_volume': False,
+                        'filter_folder': True,
+                        'filter_blenlib': False,
+                        'filemode': 8,
+                        'display_type': 'DEFAULT',
+                        'sort_method': 'FILE_SORT_ALPHA',
+                        'start': 1,
+                        'end': 1,
+                        'xsamples': 1,
+                        'gsamples': 1,
+                        'sh_open': 0.0,
+                        'sh_close': 1.0,
+                        'selected': True,
+                        'renderable_only': False,
+                        'visible_objects_only': True,
+                        'flatten': False,
+                        'uvs': True,
+                        'packuv': True,
+                        'normals': True,
+                        'vcolors': False,
+                        'face_sets': False,
+                        'subdiv_schema': False,
+                        'apply_subdiv': False,
+                        'curves_as_mesh': False,
+                        'use_instancing': True,
+                        'global_scale': 100.0,
+                        'triangulate': False,
+                        'quad_method': 'SHORTEST_DIAGONAL',
+                        'ngon_method': 'BEAUTY',
+                        'export_hair': True,
+                        'export_particles': False,
+                        'export_custom_properties': groom.use_custom_props,
+                        'as_background_job': False,
+                        'init_scene_frame_range': False
+                    }
+
+                    # EXPORT
+                    self.export_file(bpy.ops.wm.alembic_export, obj.name, export_setting)
+
+                    unreal_engine_import_setting['files'].append({
+                        'path': export_setting['filepath']
+                    })
+
+                    self.restore_groom(obj)
+
+                    obj.select_set(state=False)
+
+                    if groom.origin == 'OBJECT':
+                        obj.matrix_world.translation = original_location
+
+                    if not groom.apply_rotation:
+                        if obj.rotation_mode == 'QUATERNION':
+                            obj.rotation_quaternion = original_rotation
+                        else:
+                            obj.rotation_euler = original_rotation
+
+                    self.unmute_attach_constraint(obj)
+        finally:
+            for obj in selected_objects:
                 obj.select_set(state=True)
 
-                export_setting = {
-                    'filepath': self.create_string_directory(directory, filename_ext),
-                    'check_existing': False,
-                    'filter_blender': False,
-                    'filter_backup': False,
-                    'filter_image': False,
-                    'filter_movie': False,
-                    'filter_python': False,
-                    'filter_font': False,
-                    'filter_sound': False,
-                    'filter_text': False,
-                    'filter_archive': False,
-                    'filter_btx': False,
-                    'filter_collada': False,
-                    'filter_alembic': True,
-                    'filter_usd': False,
-                    'filter_volume': False,
-                    'filter_folder': True,
-                    'filter_blenlib': False,
-                    'filemode': 8,
-                    'display_type': 'DEFAULT',
-                    'sort_method': 'FILE_SORT_ALPHA',
-                    'start': 1,
-                    'end': 1,
-                    'xsamples': 1,
-                    'gsamples': 1,
-                    'sh_open': 0.0,
-                    'sh_close': 1.0,
-                    'selected': True,
-                    'renderable_only': False,
-                    'visible_objects_only': True,
-                    'flatten': False,
-                    'uvs': True,
-                    'packuv': True,
-                    'normals': True,
-                    'vcolors': False,
-                    'face_sets': False,
-                    'subdiv_schema': False,
-                    'apply_subdiv': False,
-                    'curves_as_mesh': False,
-                    'use_instancing': True,
-                    'global_scale': 100.0,
-                    'triangulate': False,
-                    'quad_method': 'SHORTEST_DIAGONAL',
-                    'ngon_method': 'BEAUTY',
-                    'export_hair': True,
-                    'export_particles': False,
-                    'export_custom_properties': groom.use_custom_props,
-                    'as_background_job': False,
-                    'init_scene_frame_range': False
-                }
-
-                # EXPORT
-                bpy.ops.wm.alembic_export(**export_setting)
-
-                unreal_engine_import_setting['files'].append({
-                    'path': export_setting['filepath']
-                })
-
-                self.restore_groom(obj)
-
-                obj.select_set(state=False)
-
-                if groom.origin == 'OBJECT':
-                    obj.matrix_world.translation = original_location
-
-                if not groom.apply_rotation:
-                    if obj.rotation_mode == 'QUATERNION':
-                        obj.rotation_quaternion = original_rotation
-                    else:
-                        obj.rotation_euler = original_rotation
-
-                self.unmute_attach_constraint(obj)
-
-        for obj in selected_objects:
-            obj.select_set(state=True)
+        if self.send_worker_result(unreal_engine_import_setting):
+            return {'FINISHED'}
 
         # self.unreal_engine_exec_script('ImportGroom.py', unreal_engine_import_setting)
 
-        self.report({'INFO'}, 'export ' + str(len(unreal_engine_import_setting['files'])) + ' groom success')
+        profiler.write(directory)
+
+        self.report({'INFO'}, 'export ' + str(len(unreal_engine_import_setting['files'])) + ' groom success' + profiler.summary)
 
         return {'FINISHED'}
 
@@ -1,4 +1,5 @@
 import os
+import math
 import json
 import bpy
 from mathutils import Vector
@@ -31,21 +32,43 @@ class OP_UpdateAssetList(Operator):
         return preferences.export.type in ['BOTH', 'UNREAL'] and bool(remote.remote_nodes)
 
     def execute(self, context):
+        preferences = context.preferences.addons['UE4Workspace'].preferences
         collections = {
             'StaticMesh': context.scene.import_asset_static_mesh,
             'SkeletalMesh': context.scene.import_asset_skeletal_mesh,
             'AnimSequence': context.scene.import_asset_animation
         }
 
-        reset_import_asset_list = open(os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'temp', 'import_asset_list.json')), 'w+')
-        reset_import_asset_list.write(json.dumps([]))
-        reset_import_asset_list.close()
+        if preferences.connect_unreal_engine.result_channel == 'FILE':
+            self.update_all(context, collections)
+        elif context.scene.import_asset_page_size > 0:
+            self.update_page(context, collections)
+        else:
+            self.update_delta(context, collections)
+
+        for index_name, collection in [('index_static_mesh', collections['StaticMesh']), ('index_skeletal_mesh', collections['SkeletalMesh']), ('index_animation', collections['AnimSequence'])]:
+            if getattr(context.scene, index_name) >= len(collection):
+                setattr(context.scene, index_name, -1)
+
+        self.report({'INFO'}, 'Update asset list success')
+
+        return {'FINISHED'}
+
+    def get_filter(self, context, class_names=[]):
+        return {
+            'path': context.scene.import_asset_filter_path,
+            'name': context.scene.import_asset_filter_name,
+            'class_names': class_names
+        }
+
+    def update_all(self, context, collections):
+        preferences = context.preferences.addons['UE4Workspace'].preferences
 
-        remote.exec_script('GetAllImportableAsset.py')
+        asset_list, reports = remote.exec_script_result('GetAllImportableAsset.py', 'import_asset_list.json', preferences.connect_unreal_engine.result_channel, args={'filter': self.get_filter(context)})
 
-        load_import_asset_list = open(os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'temp', 'import_asset_list.json')), 'r')
-        asset_list = json.loads(load_import_asset_list.read())
-        load_import_asset_list.close()
+        message = remote.failed_report(reports)
+        if message:
+            self.report({'WARNING'}, message)
 
         for collection in collections.values():
             collection.clear()
@@ -53,6 +76,7 @@ class OP_UpdateAssetList(Operator):
         context.scene.index_static_mesh = -1
         context.scene.index_skeletal_mesh = -1
         context.scene.index_animation = -1
+        context.scene.import_asset_sync_tokens = ''
 
         for node_id, object_path, asset_name, asset_class in asset_list:
             collection = collections[asset_class]
@@ -61,9 +85,120 @@ class OP_UpdateAssetList(Operator):
             asset.path = object_path
             asset.name = asset_name
 
-        self.report({'INFO'}, 'Update asset list success')
+    def update_delta(self, context, collections):
+        # every node keep a snapshot of the last sync, only changed assets are sent and patched in place
+        sync_tokens = json.loads(context.scene.import_asset_sync_tokens or '{}')
+
+        reports = remote.exec_script('GetAllImportableAsset.py', args={'sync_tokens': sync_tokens, 'filter': self.get_filter(context)})
+
+        message = remote.failed_report(reports)
+        if message:
+            self.report({'WARNING'}, message)
+
+        node_ids = [report['node_id'] for report in reports]
+        deltas = {report['node_id']: report['payload'] for report in reports if report['success'] and isinstance(report['payload'], dict)}
+        removes = {node_id: set(delta['removes']) for node_id, delta in deltas.items()}
+        upserts = {node_id: {object_path: (asset_name, asset_class) for object_path, asset_name, asset_class in delta['upserts']} for node_id, delta in deltas.items()}
+        updated = set()
+
+        for asset_class, collection in collections.items():
+            remove_indexes = []
+            for index, asset in enumerate(collection):
+                delta = deltas.get(asset.node_id)
+                if asset.node_id not in node_ids or (delta and (delta['reset'] or asset.path in removes[asset.node_id])):
+                    remove_indexes.append(index)
+                elif delta and asset.path in upserts[asset.node_id]:
+                    asset_name, new_asset_class = upserts[asset.node_id][asset.path]
+                    if new_asset_class == asset_class:
+                        asset.name = asset_name
+                        updated.add((asset.node_id, asset.path))
+                    else:
+                        remove_indexes.append(index)
+
+            if len(remove_indexes) == len(collection):
+                collection.clear()
+            else:
+                for index in reversed(remove_indexes):
+                    collection.remove(index)
+
+        for node_id, node_upserts in upserts.items():
+            for object_path, (asset_name, asset_class) in node_upserts.items():
+                if (node_id, object_path) not in updated:
+                    asset = collections[asset_class].add()
+                    asset.node_id = node_id
+                    asset.path = object_path
+                    asset.name = asset_name
+
+        # node that failed keep its token, its assets are left untouched
+        sync_tokens = {node_id: token for node_id, token in sync_tokens.items() if node_id in node_ids}
+        sync_tokens.update({node_id: delta['token'] for node_id, delta in deltas.items()})
+        context.scene.import_asset_sync_tokens = json.dumps(sync_tokens)
+
+    def update_page(self, context, collections):
+        # only the current page of the current tab live in the scene, filtered and paginated by unreal engine
+        scene = context.scene
+        asset_class = {
+            'STATIC_MESH': 'StaticMesh',
+            'SKELETAL_MESH': 'SkeletalMesh',
+            'ANIMATION': 'AnimSequence'
+        }[scene.import_asset_tab]
+        collection = collections[asset_class]
+
+        # every node send its sorted rows up to the end of the page, the page is cut from the merged rows
+        page_start = scene.import_asset_page * scene.import_asset_page_size
+        reports = remote.exec_script('GetAllImportableAsset.py', args={'filter': self.get_filter(context, [asset_class]), 'page': 0, 'page_size': page_start + scene.import_asset_page_size})
+
+        message = remote.failed_report(reports)
+        if message:
+            self.report({'WARNING'}, message)
+
+        selected_assets = set([(asset.node_id, asset.path) for asset in collection if asset.is_import])
+
+        collection.clear()
+
+        total = 0
+        rows = []
+        for node_index, report in enumerate(reports):
+            if report['success'] and isinstance(report['payload'], dict):
+                total += report['payload']['total']
+                rows.extend([(asset_name.lower(), object_path, node_index, report['node_id'], asset_name) for object_path, asset_name, asset_class in report['payload']['page']])
+
+        # same order as GetAllImportableAsset.py, node order break the tie
+        rows.sort(key=lambda row: row[:3])
+
+        for sort_name, object_path, node_index, node_id, asset_name in rows[page_start:page_start + scene.import_asset_page_size]:
+            asset = collection.add()
+            asset.node_id = node_id
+            asset.path = object_path
+            asset.name = asset_name
+            asset.is_import = (node_id, object_path) in selected_assets
 
-        return {'FINISHED'}
+        page_count = math.ceil(total / scene.import_asset_page_size)
+
+        scene.import_asset_total = total
+        scene.import_asset_page_count = page_count
+        scene.import_asset_page = min(scene.import_asset_page, max(page_count - 1, 0))
+
+        # the collection no longer match the snapshot of the last sync
+        scene.import_asset_sync_tokens = ''
+
+class OP_ChangeAssetListPage(Operator):
+    bl_idname = 'ue4workspace.change_asset_list_page'
+    bl_label = 'Change Asset List Page'
+    bl_description = 'Go To Next Or Previous Page Of Asset List'
+
+    step: bpy.props.IntProperty(default=1)
+
+    @classmethod
+    def poll(self, context):
+        return OP_UpdateAssetList.poll(context) and context.scene.import_asset_page_size > 0
+
+    def execute(self, context):
+        page = max(context.scene.import_asset_page + self.step, 0)
+        if bool(context.scene.import_asset_page_count):
+            page = min(page, context.scene.import_asset_page_count - 1)
+        context.scene.import_asset_page = page
+        return bpy.ops.ue4workspace.update_asset_list()
 
 class OP_SelectImportAsset(Operator):
     bl_idname = 'ue4workspace.select_import_asset'
@@ -122,15 +257,11 @@ class OP_ImportAsset(Operator):
         import_asset_setting.write(json.dumps(unreal_engine_export_setting, indent=4))
         import_asset_setting.close()
 
-        reset_imported_asset_list = open(os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'temp', 'imported_asset_list.json')), 'w+')
-        reset_imported_asset_list.write(json.dumps([]))
-        reset_imported_asset_list.close()
-
-        remote.exec_script('ExportAsset.py')
+        imported_asset_list, reports = remote.exec_script_result('ExportAsset.py', 'imported_asset_list.json', preferences.connect_unreal_engine.result_channel)
 
-        load_imported_asset_list = open(os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'temp', 'imported_asset_list.json')), 'r')
-        imported_asset_list = json.loads(load_imported_asset_list.read())
-        load_imported_asset_list.close()
+        message = remote.failed_report(reports)
+        if message:
+            self.report({'WARNING'}, message)
 
         for asset_path, asset_type, asset_name in imported_asset_list:
             if os.path.isfile(asset_path):
@@ -238,6 +369,17 @@ class PANEL(Panel):
         row.scale_y = 1.5
         row.prop(context.scene, 'import_asset_tab', expand=True)
 
+        row = layout.row(align=True)
+        row.prop(context.scene, 'import_asset_filter_path', text='', icon='FILE_FOLDER')
+        row.prop(context.scene, 'import_asset_filter_name', text='', icon='VIEWZOOM')
+
+        row = layout.row(align=True)
+        row.prop(context.scene, 'import_asset_page_size')
+        if context.scene.import_asset_page_size > 0:
+            row.operator('ue4workspace.change_asset_list_page', text='', icon='TRIA_LEFT').step = -1
+            row.label(text=str(context.scene.import_asset_page + 1) + ' / ' + str(max(context.scene.import_asset_page_count, 1)) + ' (' + str(context.scene.import_asset_total) + ')')
+            row.operator('ue4workspace.change_asset_list_page', text='', icon='TRIA_RIGHT').step = 1
+
         layout.template_list('IMPORTASSET_UL_AssetList', '', context.scene, {
             'STATIC_MESH': 'import_asset_static_mesh',
             'SKELETAL_MESH': 'import_asset_skeletal_mesh',
@@ -338,6 +480,7 @@ list_class_to_register = [
     PG_ImportAsset,
     IMPORTASSET_UL_AssetList,
     OP_UpdateAssetList,
+    OP_ChangeAssetListPage,
     OP_SelectImportAsset,
     OP_ImportAsset,
     PANEL,
@@ -345,6 +488,9 @@ list_class_to_register = [
     SUB_PANEL_2
 ]
 
+def reset_import_asset_page(self, context):
+    self.import_asset_page = 0
+
 def register():
 
     bpy.types.Scene.import_asset_tab = bpy.props.EnumProperty(
@@ -368,6 +514,31 @@ def register():
     bpy.types.Scene.import_asset_skeletal_mesh = bpy.props.CollectionProperty(type=PG_ImportAsset)
     bpy.types.Scene.import_asset_animation = bpy.props.CollectionProperty(type=PG_ImportAsset)
 
+    bpy.types.Scene.import_asset_sync_tokens = bpy.props.StringProperty(default='')
+
+    bpy.types.Scene.import_asset_filter_path = bpy.props.StringProperty(
+        name='Path',
+        description='Only list asset inside this Unreal Engine folder',
+        default='/Game',
+        update=reset_import_asset_page
+    )
+    bpy.types.Scene.import_asset_filter_name = bpy.props.StringProperty(
+        name='Name',
+        description='Only list asset with name containing this text',
+        default='',
+        update=reset_import_asset_page
+    )
+    bpy.types.Scene.import_asset_page_size = bpy.props.IntProperty(
+        name='Page Size',
+        description='Number of asset per page, 0 to list every asset',
+        default=0,
+        min=0,
+        update=reset_import_asset_page
+    )
+    bpy.types.Scene.import_asset_page = bpy.props.IntProperty(default=0, min=0)
+    bpy.types.Scene.import_asset_page_count = bpy.props.IntProperty(default=0)
+    bpy.types.Scene.import_asset_total = bpy.props.IntProperty(default=0)
+
 def unregister():
     del bpy.types.Scene.import_asset_tab
 
@@ -379,5 +550,14 @@ def unregister():
     del bpy.types.Scene.import_asset_skeletal_mesh
     del bpy.types.Scene.import_asset_animation
 
+    del bpy.types.Scene.import_asset_sync_tokens
+
+    del bpy.types.Scene.import_asset_filter_path
+    del bpy.types.Scene.import_asset_filter_name
+    del bpy.types.Scene.import_asset_page_size
+    del bpy.types.Scene.import_asset_page
+    del bpy.types.Scene.import_asset_page_count
+    del bpy.types.Scene.import_asset_total
+
     for x in list_class_to_register[::-1]:
         unregister_class(x)
\ No newline at end of file
@@ -1,10 +1,24 @@
 import numpy as np
 import bpy
-from mathutils import Matrix, Vector
 import bmesh
 from bpy.utils import register_class, unregister_class
 from bpy.types import Operator
 from .. utils.base import ObjectSubPanel
+from .. utils import geometry
+
+def get_collision_material():
+    # create material (MAT_UE4CustomCollision) if not exist
+    mat = bpy.data.materials.get('MAT_UE4CustomCollision')
+    if mat is None:
+        mat = bpy.data.materials.new(name='MAT_UE4CustomCollision')
+        mat.blend_method = 'BLEND'
+        mat.use_nodes = True
+        # input index change between blender version, look them up by name
+        principled_bsdf = mat.node_tree.nodes['Principled BSDF']
+        principled_bsdf.inputs['Base Color'].default_value = (0.15, 1.000000, 0, 1)
+        principled_bsdf.inputs['Alpha'].default_value = 0.1
+        mat.use_fake_user = True
+    return mat
 
 class OP_CreateCollision(Operator):
     bl_idname = 'ue4workspace.create_collision'
@@ -31,7 +45,11 @@ class OP_CreateCollision(Operator):
         active_object = context.active_object
 
         active_object.update_from_editmode()
-        selected_verts = [verts.co for verts in active_object.data.vertices if verts.select]
+        selected_verts = geometry.get_vertices_co(active_object.data, selected_only=True)
+
+        if not len(selected_verts):
+            self.report({'WARNING'}, 'Select at least one vertex')
+            return {'CANCELLED'}
 
         # create collection (UE4CustomCollision) if not exist
         collection = bpy.data.collections.get('UE4CustomCollision', False)
@@ -41,11 +59,12 @@ class OP_CreateCollision(Operator):
 
         bm = bmesh.new()
 
-        median_space = Vector(np.median([list(vert) for vert in selected_verts], axis=0))
+        median_space = np.median(selected_verts, axis=0)
 
         # scale
-        for vert_co in selected_verts:
-            bmesh.ops.create_vert(bm, co=(median_space + self.size * (vert_co - median_space)))
+        hull_verts = geometry.reduce_hull_points(median_space + self.size * (selected_verts - median_space))
+        for vert_co in hull_verts:
+            bm.verts.new(vert_co)
 
         # convex hull
         bmesh.ops.convex_hull(bm, input=bm.verts, use_existing_faces=True)
@@ -62,15 +81,7 @@ class OP_CreateCollision(Operator):
         obj.parent = active_object
         context.space_data.shading.color_type = 'OBJECT'
 
-        # create material (MAT_UE4CustomCollision) if not exist
-        mat = bpy.data.materials.get('MAT_UE4CustomCollision')
-        if mat is None:
-            mat = bpy.data.materials.new(name='MAT_UE4CustomCollision')
-            mat.blend_method = 'BLEND'
-            mat.use_nodes = True
-            mat.node_tree.nodes['Principled BSDF'].inputs[0].default_value = (0.15, 1.000000, 0, 1)
-            mat.node_tree.nodes['Principled BSDF'].inputs[19].default_value = 0.1
-            mat.use_fake_user = True
+        mat = get_collision_material()
 
         if obj.data.materials:
             obj.data.materials[0] = mat
@@ -110,15 +121,7 @@ class OP_CollisionPicker(Operator):
         obj.color = (0.15, 1.000000, 0, 0.200000)
         context.space_data.shading.color_type = 'OBJECT'
 
-        # create material (MAT_UE4CustomCollision) if not exist
-        mat = bpy.data.materials.get('MAT_UE4CustomCollision')
-        if mat is None:
-            mat = bpy.data.materials.new(name='MAT_UE4CustomCollision')
-            mat.blend_method = 'BLEND'
-            mat.use_nodes = True
-            mat.node_tree.nodes['Principled BSDF'].inputs[0].default_value = (0.15, 1.000000, 0, 1)
-            mat.node_tree.nodes['Principled BSDF'].inputs[19].default_value = 0.1
-            mat.use_fake_user = True
+        mat = get_collision_material()
 
         if obj.data.materials:
             obj.data.materials[0] = mat
@@ -137,6 +140,99 @@ class OP_CollisionPicker(Operator):
 
         return {'FINISHED'}
 
+class OP_CreateConvexDecomposition(Operator):
+    bl_idname = 'ue4workspace.create_convex_decomposition'
+    bl_label = 'Convex Decomposition'
+    bl_description = 'Create Custom Collision Meshes from approximate convex decomposition of the mesh\nSelect a Mesh > Object Mode'
+    bl_options = {'UNDO', 'REGISTER'}
+
+    collision_name: bpy.props.StringProperty(
+        name='Name',
+        default='collision_name'
+        )
+
+    max_hulls: bpy.props.IntProperty(
+        name='Max Hulls',
+        description='Maximum number of convex hull',
+        min=1,
+        max=64,
+        default=8
+        )
+
+    max_vertices: bpy.props.IntProperty(
+        name='Max Hull Vertices',
+        description='Maximum number of vertex per convex hull',
+        min=4,
+        max=255,
+        default=16
+        )
+
+    concavity: bpy.props.FloatProperty(
+        name='Concavity',
+        description='Stop splitting when every hull is this close to the mesh volume, relative to the whole mesh volume',
+        min=0.0,
+        max=1.0,
+        default=0.01
+        )
+
+    resolution: bpy.props.IntProperty(
+        name='Resolution',
+        description='Number of voxel along the longest side of the mesh',
+        min=8,
+        max=128,
+        default=32
+        )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH' and context.mode == 'OBJECT' and not context.active_object.data.is_custom_collision
+
+    def execute(self, context):
+        active_object = context.active_object
+
+        obj_eval = active_object.evaluated_get(context.evaluated_depsgraph_get())
+        mesh = obj_eval.to_mesh()
+        points = geometry.get_vertices_co(mesh)
+        triangles = geometry.get_mesh_triangles(mesh)
+        obj_eval.to_mesh_clear()
+
+        if len(points) < 4:
+            self.report({'WARNING'}, 'Mesh need at least 4 vertices')
+            return {'CANCELLED'}
+
+        hulls = geometry.convex_decomposition(points, triangles, max_hulls=self.max_hulls, concavity=self.concavity, resolution=self.resolution)
+
+        # create collection (UE4CustomCollision) if not exist
+        collection = bpy.data.collections.get('UE4CustomCollision', False)
+        if (not collection):
+            collection = bpy.data.collections.new('UE4CustomCollision')
+            context.scene.collection.children.link(collection)
+
+        mat = get_collision_material()
+
+        for hull_points in hulls:
+            bm = geometry.create_convex_hull(geometry.limit_hull_vertices(hull_points, self.max_vertices))
+
+            data_mesh = bpy.data.meshes.new(self.collision_name)
+            bm.to_mesh(data_mesh)
+            bm.free()
+
+            obj = bpy.data.objects.new(self.collision_name, data_mesh)
+            obj.data.is_custom_collision = True
+            obj.show_wire = True
+            obj.display_type = 'SOLID'
+            obj.color = (0.15, 1.000000, 0, 0.200000)
+            obj.parent = active_object
+            obj.data.materials.append(mat)
+
+            collection.objects.link(obj)
+
+        context.space_data.shading.color_type = 'OBJECT'
+
+        self.report({'INFO'}, f'Create {len(hulls)} custom collision success')
+
+        return {'FINISHED'}
+
 class PANEL(ObjectSubPanel):
     bl_idname = 'UE4WORKSPACE_PT_ObjectCustomCollisionPanel'
     bl_label = 'Custom Collision'
@@ -166,6 +262,11 @@ class PANEL(ObjectSubPanel):
         row.scale_y = 1.5
         row.operator('ue4workspace.create_collision',icon='OUTLINER_OB_MESH')
 
+        if context.mode == 'OBJECT' and not active_object.data.is_custom_collision:
+            row = layout.box().row()
+            row.scale_y = 1.5
+            row.operator('ue4workspace.create_convex_decomposition',icon='MOD_EXPLODE')
+
         collision_objects = [obj for obj in context.scene.objects if obj.type == 'MESH' and obj.parent == active_object and obj.data.is_custom_collision]
 
         if collision_objects:
@@ -183,6 +284,7 @@ class PANEL(ObjectSubPanel):
 list_class_to_register = [
     OP_CreateCollision,
     OP_CollisionPicker,
+    OP_CreateConvexDecomposition,
     PANEL
 ]
 
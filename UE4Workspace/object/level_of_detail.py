@@ -3,7 +3,8 @@ import bpy
 from mathutils import Vector
 from bpy.utils import register_class, unregister_class
 from bpy.types import Operator, PropertyGroup
-from .. utils.base import ObjectSubPanel
+from .. utils.base import ObjectSubPanel, StepOperator
+from .. utils import worker
 
 class OP_GenerateLODs(Operator):
     bl_idname = 'ue4workspace.generate_lods'
@@ -77,6 +78,146 @@ class OP_GenerateLODs(Operator):
             lod_data.obj = lod_obj
         return {'FINISHED'}
 
+def is_lod_source(obj):
+    return obj.type == 'MESH' and not 'ARMATURE' in [mod.type for mod in obj.modifiers] and not obj.data.mesh_as_lod and not obj.data.is_custom_collision
+
+def bake_lod_meshes(context, objects, total, ratio):
+    # decimate on temporary object and keep the evaluated mesh, LOD does not need a live modifier
+    temp_objects = []
+    for obj in objects:
+        for index in range(1, total + 1):
+            temp_obj = bpy.data.objects.new(obj.name + '_LOD' + str(index), obj.data)
+            context.scene.collection.objects.link(temp_obj)
+
+            decimate = temp_obj.modifiers.new('LOD', 'DECIMATE')
+            decimate.decimate_type = 'COLLAPSE'
+            decimate.ratio = ((0.1 * ratio) / total) * (total - (index - 1))
+            decimate.use_collapse_triangulate = True
+            decimate.use_symmetry = True
+
+            temp_objects.append((obj, index, temp_obj))
+
+    # every temporary object evaluated in one depsgraph update
+    depsgraph = context.evaluated_depsgraph_get()
+
+    meshes = {}
+    for obj, index, temp_obj in temp_objects:
+        mesh = bpy.data.meshes.new_from_object(temp_obj.evaluated_get(depsgraph))
+        mesh.name = obj.name + '_LOD' + str(index)
+        mesh.mesh_as_lod = True
+        meshes.setdefault(obj.name, []).append(mesh)
+        bpy.data.objects.remove(temp_obj, do_unlink=True)
+
+    return meshes
+
+class OP_BatchGenerateLODs(StepOperator):
+    bl_idname = 'ue4workspace.batch_generate_lods'
+    bl_label = 'Batch Generate LODs'
+    bl_description = 'Generate baked LOD meshes for every selected mesh or every mesh in the scene'
+    bl_options = {'UNDO', 'REGISTER'}
+
+    option: bpy.props.EnumProperty(
+        name='Option',
+        items=[
+            ('SELECT', 'Selected Meshes', 'Generate LODs for selected meshes'),
+            ('ALL', 'All Meshes', 'Generate LODs for all meshes in the scene')
+            ],
+        default='SELECT'
+    )
+
+    total: bpy.props.IntProperty(
+        name='Total',
+        default=3,
+        min=1,
+        max=7
+    )
+
+    angel: bpy.props.FloatProperty(
+        name='Angel',
+        default=0.0,
+        min=0.0,
+        max=math.pi*2,
+        subtype='ANGLE',
+        unit='ROTATION'
+    )
+
+    margin: bpy.props.FloatProperty(
+        name='Margin',
+        default=1.0,
+        min=0.0,
+        subtype='DISTANCE',
+        unit='LENGTH'
+    )
+
+    ratio: bpy.props.FloatProperty(
+        name='Ratio',
+        default=1.0,
+        min=0.0,
+        max=10.0
+    )
+
+    workers: bpy.props.IntProperty(
+        name='Background Workers',
+        description='Number of background Blender process to decimate in parallel, 0 to decimate on this Blender process',
+        default=0,
+        min=0,
+        max=64
+    )
+
+    waiting_for = 'background worker'
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT' and not StepOperator.is_running
+
+    def is_modal(self, context):
+        return self.workers > 0 and not worker.is_worker()
+
+    def create_steps(self, context):
+        if worker.is_worker():
+            objects = [bpy.data.objects[name] for name in worker.job_objects if name in bpy.data.objects]
+            worker.write_worker_meshes(bake_lod_meshes(context, objects, self.total, self.ratio))
+            return {'FINISHED'}
+
+        objects = [obj for obj in (context.scene.objects if self.option == 'ALL' else context.selected_objects) if is_lod_source(obj)]
+
+        if self.workers > 0 and len(objects) > 1:
+            object_names = [obj.name for obj in objects]
+            meshes, failed = yield from worker.run_mesh_workers(self.bl_idname, objects, {'total': self.total, 'ratio': self.ratio}, self.workers)
+            # look the objects up again, the scene may change while the workers run
+            objects = [bpy.data.objects[name] for name in object_names if name in bpy.data.objects]
+            if failed:
+                self.report({'WARNING'}, str(failed) + ' background worker failed, see system console for detail')
+        else:
+            meshes = bake_lod_meshes(context, objects, self.total, self.ratio)
+
+        vector_angle = Vector((math.cos(self.angel), math.sin(self.angel), 0))
+        vector_margin = vector_angle * self.margin
+
+        for obj in objects:
+            obj_world_location = obj.matrix_world.to_translation()
+
+            obj.data.lods.clear()
+            for index, mesh in enumerate(meshes.get(obj.name, []), start=1):
+                lod_obj = bpy.data.objects.new(obj.name, mesh)
+                lod_obj.matrix_world = obj.matrix_world.copy()
+
+                for collection in obj.users_collection:
+                    collection.objects.link(lod_obj)
+                lod_obj.matrix_world.translation = obj_world_location + ((obj.dimensions * vector_angle) * index) + (vector_margin * index)
+
+                lod_obj.parent = obj
+                lod_obj.matrix_parent_inverse = obj.matrix_world.inverted()
+
+                lod_data = obj.data.lods.add()
+                lod_data.obj = lod_obj
+                # half screen size every LOD, used when auto LOD screen size is off
+                lod_data.screen_size = 0.5 ** index
+
+        self.report({'INFO'}, f'Generate LODs for {len(meshes)} mesh success')
+
+        return {'FINISHED'}
+
 class OP_AddLODSlot(Operator):
     bl_idname = 'ue4workspace.add_lod_slot'
     bl_label = 'Add LOD Slot'
@@ -151,6 +292,7 @@ class PANEL(ObjectSubPanel):
             row = layout.box().row()
             row.scale_y = 1.5
             row.operator('ue4workspace.generate_lods', icon='MOD_DECIM')
+            row.operator('ue4workspace.batch_generate_lods', icon='MOD_DECIM')
 
             split = box.column().split(factor=0.6)
             col = split.column()
@@ -215,6 +357,7 @@ class PANEL(ObjectSubPanel):
 list_class_to_register = [
     PG_LOD,
     OP_GenerateLODs,
+    OP_BatchGenerateLODs,
     OP_AddLODSlot,
     OP_RemoveLODSlot,
     PANEL
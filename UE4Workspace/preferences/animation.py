@@ -161,6 +161,36 @@ class ANIMATION_FBX_export(PropertyGroup):
         max=100
     )
 
+    key_reduction: bpy.props.BoolProperty(
+        name='Key Reduction',
+        description='After the bake, remove every key of bone location, rotation and scale that linear interpolation of the kept keys give within the tolerance',
+        default=False
+    )
+
+    key_reduction_location: bpy.props.FloatProperty(
+        name='Location Tolerance',
+        description='Maximum location error of key reduction, in FBX unit',
+        default=0.01,
+        min=0.0,
+        precision=4
+    )
+
+    key_reduction_rotation: bpy.props.FloatProperty(
+        name='Rotation Tolerance',
+        description='Maximum rotation error of key reduction, in degree',
+        default=0.05,
+        min=0.0,
+        precision=4
+    )
+
+    key_reduction_scale: bpy.props.FloatProperty(
+        name='Scale Tolerance',
+        description='Maximum scale error of key reduction',
+        default=0.0001,
+        min=0.0,
+        precision=4
+    )
+
     def to_dict(self):
         return {prop: getattr(self, prop, None) for prop in ['global_scale', 'apply_unit_scale', 'axis_forward', 'axis_up', 'apply_unit_scale', 'bake_space_transform', 'primary_bone_axis', 'secondary_bone_axis', 'armature_nodetype', 'use_armature_deform_only', 'add_leaf_bones', 'bake_anim_use_all_bones', 'bake_anim_force_startend_keying', 'bake_anim_step', 'bake_anim_simplify_factor']}
 
@@ -1,5 +1,6 @@
 import bpy
 from bpy.types import PropertyGroup
+from .. utils.connect import remote
 
 class CONNECT_unreal_engine(PropertyGroup):
 
@@ -23,6 +24,27 @@ class CONNECT_unreal_engine(PropertyGroup):
         default=0
     )
 
+    result_channel: bpy.props.EnumProperty(
+        name='Result Channel',
+        description='How Unreal Engine send script result back to Blender',
+        items=[
+            ('SOCKET', 'Socket', 'Return script result through remote execution connection'),
+            ('FILE', 'File', 'Return script result through JSON file in temporary folder, slower fallback')
+            ],
+        default='SOCKET'
+    )
+
+    def update_command_timeout(self, context):
+        remote.set_command_timeout(self.command_timeout)
+
+    command_timeout: bpy.props.IntProperty(
+        name='Command Timeout',
+        description='Seconds to wait for each Unreal Engine node to answer a script, 0 to wait forever',
+        default=0,
+        min=0,
+        update=update_command_timeout
+    )
+
     @classmethod
     def draw_panel(cls, context, layout, preferences):
         box = layout.box()
@@ -34,6 +56,8 @@ class CONNECT_unreal_engine(PropertyGroup):
             (preferences.connect_unreal_engine, 'Multicast Group Endpoint', 'multicast_group_end_point'),
             (preferences.connect_unreal_engine, 'Multicast Bind Address', 'multicast_bind_address'),
             (preferences.connect_unreal_engine, 'Multicast Time-To-Live', 'multicast_ttl'),
+            (preferences.connect_unreal_engine, 'Command Timeout', 'command_timeout'),
+            (preferences.connect_unreal_engine, 'Result Channel', 'result_channel'),
         ]
 
         for data, label_str, property_str in data_properties:
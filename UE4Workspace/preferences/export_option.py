@@ -30,6 +30,60 @@ class EXPORT_option(PropertyGroup):
         subtype='DIR_PATH'
     )
 
+    use_cache: bpy.props.BoolProperty(
+        name='Export Cache',
+        description='Skip export for object that has not changed since the last export. To Unreal Engine only work for animation, checked against the animation already in Unreal Engine project',
+        default=False
+    )
+
+    batch_import: bpy.props.BoolProperty(
+        name='Batch Import',
+        description='Import every exported file to Unreal Engine in one import call, disable to import file one by one',
+        default=True
+    )
+
+    temporary_scene: bpy.props.BoolProperty(
+        name='Temporary Export Scene',
+        description='Export from a temporary scene, with a copy of the static mesh, collision, socket and LOD, or only the armature and what it depend on for skeletal mesh and animation. The rest of the scene is not changed or evaluated',
+        default=False
+    )
+
+    pipeline_import: bpy.props.BoolProperty(
+        name='Pipeline Import',
+        description='Send every exported file to Unreal Engine while the rest is still exporting, instead of one import after all file exported',
+        default=False
+    )
+
+    transfer: bpy.props.EnumProperty(
+        name='Transfer',
+        description='How exported file reach Unreal Engine when export to Unreal Engine only',
+        items=[
+            ('FILE', 'Temporary Folder', 'Unreal Engine read the file from temporary folder'),
+            ('SOCKET', 'Command Socket', 'Send the file to Unreal Engine over the command socket, Unreal Engine write it to its own temporary folder. Work with Unreal Engine on other machine')
+            ],
+        default='FILE'
+    )
+
+    profile: bpy.props.BoolProperty(
+        name='Export Profiler',
+        description='Record time spent in every export phase and write a JSON and CSV report to the export folder',
+        default=False
+    )
+
+    modal: bpy.props.BoolProperty(
+        name='Non-Blocking Export',
+        description='Export a few object on every timer tick with progress on status bar, Blender stay responsive and ESC cancel the export',
+        default=False
+    )
+
+    background_worker: bpy.props.IntProperty(
+        name='Background Workers',
+        description='Number of background Blender process to export in parallel, 0 to export on this Blender process',
+        default=0,
+        min=0,
+        max=64
+    )
+
     project_list: bpy.props.BoolProperty(
         name='Project List',
         description='Project List Tab',
@@ -509,6 +509,12 @@ class STATIC_MESH_export(PropertyGroup):
         default='OBJECT'
     )
 
+    fast_fbx_writer: bpy.props.BoolProperty(
+        name='Fast FBX Writer',
+        description='Write FBX directly from mesh buffer instead of Blender FBX exporter, need temporary export scene, does not export texture, tangent space and other axis than -Z forward and Y up use Blender FBX exporter',
+        default=False
+    )
+
     fbx: bpy.props.PointerProperty(
         type=STATIC_MESH_FBX_export
     )
@@ -3,7 +3,8 @@ import json
 import bpy
 from bpy.utils import register_class, unregister_class
 from bpy.types import Operator
-from .. utils.base import ExportOperator, Panel, ExportOptionPanel
+from .. utils.base import ExportOperator, UniqueNameAllocator, Panel, ExportOptionPanel
+from .. utils.export_scene import ExportScene
 from .. utils.connect import remote, skeletons
 
 class OP_UpdateSkeleton(Operator):
@@ -19,15 +20,11 @@ class OP_UpdateSkeleton(Operator):
     def execute(self, context):
         preferences = context.preferences.addons['UE4Workspace'].preferences
 
-        reset_skeleton_list = open(os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'temp', 'skeleton_list.json')), 'w+')
-        reset_skeleton_list.write(json.dumps([]))
-        reset_skeleton_list.close()
+        skeleton_list, reports = remote.exec_script_result('GetAllSkeleton.py', 'skeleton_list.json', preferences.connect_unreal_engine.result_channel)
 
-        remote.exec_script('GetAllSkeleton.py')
-
-        load_skeleton_list = open(os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'temp', 'skeleton_list.json')), 'r')
-        skeleton_list = json.loads(load_skeleton_list.read())
-        load_skeleton_list.close()
+        message = remote.failed_report(reports)
+        if message:
+            self.report({'WARNING'}, message)
 
         skeletons.clear()
 
@@ -45,21 +42,24 @@ class OP_ExportSkeletalMesh(ExportOperator):
 
     ext_file = 'fbx'
 
-    def execute(self, context):
+    def export_steps(self, context):
         preferences = context.preferences.addons['UE4Workspace'].preferences
         skeletal_mesh = preferences.skeletal_mesh
         fbx_setting = skeletal_mesh.fbx
         unreal_engine_setting = skeletal_mesh.unreal_engine
 
         selected_objects = context.selected_objects
-        objects = context.scene.objects if skeletal_mesh.option == 'ALL' else selected_objects
+        scene = context.scene
+        objects = self.get_objects(context, skeletal_mesh.option)
         objects = [obj for obj in objects if obj.type == 'ARMATURE']
 
+        profiler = self.create_export_profiler('skeletal_mesh')
+
         directory = self.create_string_directory(preferences.export.export_folder if preferences.export.type in ['FILE','BOTH'] else preferences.export.temp_folder, skeletal_mesh.subfolder)
 
         self.create_directory_if_not_exist(directory, skeletal_mesh.subfolder)
 
-        list_name_objects = []
+        name_allocator = UniqueNameAllocator()
         unreal_engine_import_setting = {
             'files': [],
             'main_folder': self.safe_string_path(preferences.connect_unreal_engine.main_folder),
@@ -70,19 +70,132 @@ class OP_ExportSkeletalMesh(ExportOperator):
 
         unreal_engine_import_setting.update(unreal_engine_setting.to_dict())
 
+        export_cache = self.create_export_cache(directory)
+        cache_setting = {
+            'fbx': fbx_setting.to_dict(),
+            'unreal_engine': unreal_engine_setting.to_dict(),
+            'option': [skeletal_mesh.use_custom_props, skeletal_mesh.apply_rotation, skeletal_mesh.root_bone, skeletal_mesh.origin, skeletal_mesh.mesh, skeletal_mesh.skeleton]
+        }
+        remote_asset_names = yield from self.get_remote_asset_names(unreal_engine_import_setting, ['SkeletalMesh'])
+
+        if self.is_background_export(objects):
+            return (yield from self.execute_background(directory, objects, 'skeletal_mesh', 'ImportSkeletalMesh.py', unreal_engine_import_setting, data={'remote_asset_names': (sorted(remote_asset_names) if remote_asset_names is not None else None)}))
+
+        child_index = self.create_child_index()
+
+        self.create_import_pipeline('ImportSkeletalMesh.py', unreal_engine_import_setting)
+
         bpy.ops.object.select_all(action='DESELECT')
 
-        for obj in objects:
-            if skeletal_mesh.mesh == 'COMBINE':
-                filename = self.safe_string_path(obj.name)
-                check_duplicate = len([obj_name for obj_name in list_name_objects if obj_name.startswith(filename)])
-                list_name_objects.append(filename)
+        # every armature is exported from a scene with only the armature and its meshes, the rest of the scene is not evaluated
+        export_scene = ExportScene(scene) if preferences.export.temporary_scene else None
+
+        try:
+            for index, obj in enumerate(objects):
+                # upload of the file added by the previous item, its changes to the scene are restored
+                yield from self.send_import_files()
+
+                yield index, len(objects)
+
+                if export_scene is not None:
+                    export_scene.clear()
+                    export_scene.add_skeletal_mesh(obj, child_index.get_skeletal_mesh_parts(obj))
+
+                if skeletal_mesh.mesh == 'COMBINE':
+                    filename = name_allocator.allocate(self.safe_string_path(obj.name))
+                    filename_ext = filename + '.' + self.ext_file
+
+                    if not self.is_file_exist(directory, filename_ext) or skeletal_mesh.overwrite_file:
+
+                        filepath = self.create_string_directory(directory, filename_ext)
+                        digest = export_cache.create_digest(objects=([obj] + child_index.get_skeletal_mesh_parts(obj)), setting=cache_setting)
+                        if export_cache.is_cached(filepath, digest):
+                            # file is up to date, only import it when the skeletal mesh is missing from unreal engine project
+                            if remote_asset_names is not None and filename not in remote_asset_names:
+                                self.add_import_file(unreal_engine_import_setting, {
+                                    'path': filepath,
+                                    'skeleton': skeletal_mesh.skeleton
+                                })
+                            continue
+
+                        self.mute_attach_constraint(obj)
+
+                        original_location = obj.matrix_world.to_translation()
+                        if skeletal_mesh.origin == 'OBJECT':
+                            obj.matrix_world.translation = (0, 0, 0)
+
+                        original_rotation = obj.rotation_quaternion.copy() if obj.rotation_mode == 'QUATERNION' else obj.rotation_euler.copy()
+                        if not skeletal_mesh.apply_rotation:
+                            if obj.rotation_mode == 'QUATERNION':
+                                obj.rotation_quaternion = (1, 0, 0, 0)
+                            else:
+                                obj.rotation_euler = (0, 0, 0)
+
+                        original_object_name = obj.name
+                        is_armature_has_root_bone = obj.data.bones.get('root', False)
+
+                        if skeletal_mesh.root_bone == 'ARMATURE':
+                            obj.name = 'Armature'
+                        elif skeletal_mesh.root_bone == 'AUTO':
+                            if is_armature_has_root_bone:
+                                obj.name = 'Armature'
+                            else:
+                                obj.name = 'root'
+                        elif skeletal_mesh.root_bone == 'OBJECT':
+                            pass
+
+                        self.prepare_skeletal_meshes(obj)
+
+                        obj.select_set(state=True)
+
+                        export_setting = {
+                            'filepath': filepath,
+                            'check_existing': False,
+                            'filter_glob': '*.fbx',
+                            'use_selection': True,
+                            'use_active_collection': False,
+                            'object_types': {'MESH', 'ARMATURE'},
+                            'use_custom_props': skeletal_mesh.use_custom_props,
+                            'bake_anim': False,
+                            'path_mode': 'AUTO',
+                            'embed_textures': False,
+                            'batch_mode': 'OFF'
+                        }
+
+                        export_setting.update(fbx_setting.to_dict())
+
+                        # EXPORT
+                        self.export_file(bpy.ops.export_scene.fbx, filename, export_setting, export_scene)
+
+                        export_cache.update(filepath, digest)
+
+                        self.add_import_file(unreal_engine_import_setting, {
+                            'path': export_setting['filepath'],
+                            'skeleton': skeletal_mesh.skeleton
+                        })
+
+                        self.restore_skeletal_meshes(obj)
+
+                        obj.select_set(state=False)
 
-                filename += '_' + str(check_duplicate) if bool(check_duplicate) else ''
-                filename_ext = filename + '.' + self.ext_file
+                        if skeletal_mesh.root_bone == 'ARMATURE':
+                            obj.name = original_object_name
+                        elif skeletal_mesh.root_bone == 'AUTO':
+                            obj.name = original_object_name
+                        elif skeletal_mesh.root_bone == 'OBJECT':
+                            pass
 
-                if not self.is_file_exist(directory, filename_ext) or skeletal_mesh.overwrite_file:
+                        if skeletal_mesh.origin == 'OBJECT':
+                            obj.matrix_world.translation = original_location
 
+                        if not skeletal_mesh.apply_rotation:
+                            if obj.rotation_mode == 'QUATERNION':
+                                obj.rotation_quaternion = original_rotation
+                            else:
+                                obj.rotation_euler = original_rotation
+
+                        self.unmute_attach_constraint(obj)
+                else:
                     self.mute_attach_constraint(obj)
 
                     original_location = obj.matrix_world.to_translation()
@@ -109,35 +222,65 @@ class OP_ExportSkeletalMesh(ExportOperator):
                     elif skeletal_mesh.root_bone == 'OBJECT':
                         pass
 
-                    self.prepare_skeletal_meshes(obj)
-
                     obj.select_set(state=True)
 
-                    export_setting = {
-                        'filepath': self.create_string_directory(directory, filename_ext),
-                        'check_existing': False,
-                        'filter_glob': '*.fbx',
-                        'use_selection': True,
-                        'use_active_collection': False,
-                        'object_types': {'MESH', 'ARMATURE'},
-                        'use_custom_props': skeletal_mesh.use_custom_props,
-                        'bake_anim': False,
-                        'path_mode': 'AUTO',
-                        'embed_textures': False,
-                        'batch_mode': 'OFF'
-                    }
+                    for skeletal_mesh_object, hide, hide_select, hide_viewport in [(children_obj, children_obj.hide_get(), children_obj.hide_select, children_obj.hide_viewport) for children_obj in child_index.get_skeletal_mesh_parts(obj)]:
+                        filename = name_allocator.allocate(self.safe_string_path(obj.name + '_' + skeletal_mesh_object.name))
+                        filename_ext = filename + '.' + self.ext_file
+
+                        if not self.is_file_exist(directory, filename_ext) or skeletal_mesh.overwrite_file:
+
+                            filepath = self.create_string_directory(directory, filename_ext)
+                            digest = export_cache.create_digest(objects=[obj, skeletal_mesh_object], setting=cache_setting)
+                            if export_cache.is_cached(filepath, digest):
+                                # file is up to date, only import it when the skeletal mesh is missing from unreal engine project
+                                if remote_asset_names is not None and filename not in remote_asset_names:
+                                    self.add_import_file(unreal_engine_import_setting, {
+                                        'path': filepath,
+                                        'skeleton': skeletal_mesh.skeleton
+                                    })
+                                continue
+
+                            skeletal_mesh_object.hide_set(False)
+                            skeletal_mesh_object.hide_select = False
+                            skeletal_mesh_object.hide_viewport = False
+
+                            skeletal_mesh_object.select_set(state=True)
 
-                    export_setting.update(fbx_setting.to_dict())
+                            export_setting = {
+                                'filepath': filepath,
+                                'check_existing': False,
+                                'filter_glob': '*.fbx',
+                                'use_selection': True,
+                                'use_active_collection': False,
+                                'object_types': {'MESH', 'ARMATURE'},
+                                'use_custom_props': False,
+                                'bake_anim': False,
+                                'path_mode': 'AUTO',
+                                'embed_textures': False,
+                                'batch_mode': 'OFF'
+                            }
 
-                    # EXPORT
-                    bpy.ops.export_scene.fbx(**export_setting)
+                            export_setting.update(fbx_setting.to_dict())
 
-                    unreal_engine_import_setting['files'].append({
-                        'path': export_setting['filepath'],
-                        'skeleton': skeletal_mesh.skeleton
-                    })
+                            if export_scene is not None:
+                                export_scene.select_only([obj, skeletal_mesh_object])
 
-                    self.restore_skeletal_meshes(obj)
+                            # EXPORT
+                            self.export_file(bpy.ops.export_scene.fbx, filename, export_setting, export_scene)
+
+                            export_cache.update(filepath, digest)
+
+                            self.add_import_file(unreal_engine_import_setting, {
+                                'path': export_setting['filepath'],
+                                'skeleton': skeletal_mesh.skeleton
+                            })
+
+                            skeletal_mesh_object.select_set(state=False)
+
+                            skeletal_mesh_object.hide_set(hide)
+                            skeletal_mesh_object.hide_select = hide_select
+                            skeletal_mesh_object.hide_viewport = hide_viewport
 
                     obj.select_set(state=False)
 
@@ -158,106 +301,24 @@ class OP_ExportSkeletalMesh(ExportOperator):
                             obj.rotation_euler = original_rotation
 
                     self.unmute_attach_constraint(obj)
-            else:
-                self.mute_attach_constraint(obj)
-
-                original_location = obj.matrix_world.to_translation()
-                if skeletal_mesh.origin == 'OBJECT':
-                    obj.matrix_world.translation = (0, 0, 0)
-
-                original_rotation = obj.rotation_quaternion.copy() if obj.rotation_mode == 'QUATERNION' else obj.rotation_euler.copy()
-                if not skeletal_mesh.apply_rotation:
-                    if obj.rotation_mode == 'QUATERNION':
-                        obj.rotation_quaternion = (1, 0, 0, 0)
-                    else:
-                        obj.rotation_euler = (0, 0, 0)
-
-                original_object_name = obj.name
-                is_armature_has_root_bone = obj.data.bones.get('root', False)
-
-                if skeletal_mesh.root_bone == 'ARMATURE':
-                    obj.name = 'Armature'
-                elif skeletal_mesh.root_bone == 'AUTO':
-                    if is_armature_has_root_bone:
-                        obj.name = 'Armature'
-                    else:
-                        obj.name = 'root'
-                elif skeletal_mesh.root_bone == 'OBJECT':
-                    pass
+        finally:
+            if export_scene is not None:
+                export_scene.remove()
 
+            for obj in selected_objects:
                 obj.select_set(state=True)
 
-                for skeletal_mesh_object, hide, hide_select, hide_viewport in [(children_obj, children_obj.hide_get(), children_obj.hide_select, children_obj.hide_viewport) for children_obj in obj.children if children_obj.type == 'MESH' and children_obj.data.is_export_skeletal_mesh_part]:
-                    filename = self.safe_string_path(obj.name + '_' + skeletal_mesh_object.name)
-                    check_duplicate = len([obj_name for obj_name in list_name_objects if obj_name.startswith(filename)])
-                    list_name_objects.append(filename)
-
-                    filename += '_' + str(check_duplicate) if bool(check_duplicate) else ''
-                    filename_ext = filename + '.' + self.ext_file
-
-                    if not self.is_file_exist(directory, filename_ext) or skeletal_mesh.overwrite_file:
-                        skeletal_mesh_object.hide_set(False)
-                        skeletal_mesh_object.hide_select = False
-                        skeletal_mesh_object.hide_viewport = False
-
-                        skeletal_mesh_object.select_set(state=True)
-
-                        export_setting = {
-                            'filepath': self.create_string_directory(directory, filename_ext),
-                            'check_existing': False,
-                            'filter_glob': '*.fbx',
-                            'use_selection': True,
-                            'use_active_collection': False,
-                            'object_types': {'MESH', 'ARMATURE'},
-                            'use_custom_props': False,
-                            'bake_anim': False,
-                            'path_mode': 'AUTO',
-                            'embed_textures': False,
-                            'batch_mode': 'OFF'
-                        }
-
-                        export_setting.update(fbx_setting.to_dict())
-
-                        # EXPORT
-                        bpy.ops.export_scene.fbx(**export_setting)
-
-                        unreal_engine_import_setting['files'].append({
-                            'path': export_setting['filepath'],
-                            'skeleton': skeletal_mesh.skeleton
-                        })
-
-                        skeletal_mesh_object.select_set(state=False)
-
-                        skeletal_mesh_object.hide_set(hide)
-                        skeletal_mesh_object.hide_select = hide_select
-                        skeletal_mesh_object.hide_viewport = hide_viewport
-
-                obj.select_set(state=False)
-
-                if skeletal_mesh.root_bone == 'ARMATURE':
-                    obj.name = original_object_name
-                elif skeletal_mesh.root_bone == 'AUTO':
-                    obj.name = original_object_name
-                elif skeletal_mesh.root_bone == 'OBJECT':
-                    pass
-
-                if skeletal_mesh.origin == 'OBJECT':
-                    obj.matrix_world.translation = original_location
+        yield from self.send_import_files()
 
-                if not skeletal_mesh.apply_rotation:
-                    if obj.rotation_mode == 'QUATERNION':
-                        obj.rotation_quaternion = original_rotation
-                    else:
-                        obj.rotation_euler = original_rotation
+        export_cache.save()
 
-                self.unmute_attach_constraint(obj)
+        yield len(objects), len(objects)
 
-        for obj in selected_objects:
-            obj.select_set(state=True)
+        yield from self.unreal_engine_exec_script_steps('ImportSkeletalMesh.py', unreal_engine_import_setting)
 
-        self.unreal_engine_exec_script('ImportSkeletalMesh.py', unreal_engine_import_setting)
+        profiler.write(directory)
 
-        self.report({'INFO'}, 'export ' + str(len(unreal_engine_import_setting['files'])) + ' skeletal mesh success')
+        self.report({'INFO'}, 'export ' + str(len(unreal_engine_import_setting['files'])) + ' skeletal mesh success' + export_cache.summary + profiler.summary)
 
         return {'FINISHED'}
 
@@ -1,7 +1,10 @@
+import io
 import bpy
 from bpy.utils import register_class, unregister_class
 from bpy.types import Operator
-from .. utils.base import ExportOperator, Panel, ExportOptionPanel
+from .. utils.base import ExportOperator, UniqueNameAllocator, Panel, ExportOptionPanel
+from .. utils.export_scene import ExportScene
+from .. utils import fbx_writer
 
 class OP_ExportStaticMesh(ExportOperator):
     bl_idname = 'ue4workspace.export_static_mesh'
@@ -10,25 +13,24 @@ class OP_ExportStaticMesh(ExportOperator):
 
     ext_file = 'fbx'
 
-    def execute(self, context):
+    def export_steps(self, context):
         preferences = context.preferences.addons['UE4Workspace'].preferences
         static_mesh = preferences.static_mesh
         fbx_setting = static_mesh.fbx
         unreal_engine_setting = static_mesh.unreal_engine
 
         selected_objects = context.selected_objects
-        objects = context.scene.objects if static_mesh.option == 'ALL' else selected_objects
+        scene = context.scene
+        objects = self.get_objects(context, static_mesh.option)
         objects = [obj for obj in objects if obj.type == 'MESH' and not 'ARMATURE' in [mod.type for mod in obj.modifiers] and not obj.data.mesh_as_lod]
 
+        profiler = self.create_export_profiler('static_mesh')
+
         directory = self.create_string_directory(preferences.export.export_folder if preferences.export.type in ['FILE','BOTH'] else preferences.export.temp_folder, static_mesh.subfolder)
 
         self.create_directory_if_not_exist(directory, static_mesh.subfolder)
 
-        list_unhide_collection_name = [('UE4CustomCollision', static_mesh.custom_collision), ('UE4Socket', static_mesh.socket)]
-
-        self.unhide_collection(*list_unhide_collection_name)
-
-        list_name_objects = []
+        name_allocator = UniqueNameAllocator()
         unreal_engine_import_setting = {
             'files': [],
             'main_folder': self.safe_string_path(preferences.connect_unreal_engine.main_folder),
@@ -39,101 +41,177 @@ class OP_ExportStaticMesh(ExportOperator):
 
         unreal_engine_import_setting.update(unreal_engine_setting.to_dict())
 
-        bpy.ops.object.select_all(action='DESELECT')
+        export_cache = self.create_export_cache(directory)
+        cache_setting = {
+            'fbx': fbx_setting.to_dict(),
+            'unreal_engine': unreal_engine_setting.to_dict(),
+            'option': [static_mesh.use_custom_props, static_mesh.apply_rotation, static_mesh.custom_collision, static_mesh.socket, static_mesh.lod, static_mesh.origin]
+        }
+        remote_asset_names = yield from self.get_remote_asset_names(unreal_engine_import_setting, ['StaticMesh'])
+
+        if self.is_background_export(objects):
+            return (yield from self.execute_background(directory, objects, 'static_mesh', 'ImportStaticMesh.py', unreal_engine_import_setting, data={'remote_asset_names': (sorted(remote_asset_names) if remote_asset_names is not None else None)}))
+
+        list_unhide_collection_name = [('UE4CustomCollision', static_mesh.custom_collision), ('UE4Socket', static_mesh.socket)]
+
+        # temporary scene does not touch collection visibility and selection of the user scene
+        export_scene = ExportScene(scene) if preferences.export.temporary_scene else None
+
+        if export_scene is None:
+            self.unhide_collection(*list_unhide_collection_name)
 
-        for obj in objects:
-            filename = self.safe_string_path(obj.name)
-            check_duplicate = len([obj_name for obj_name in list_name_objects if obj_name.startswith(filename)])
-            list_name_objects.append(filename)
+            bpy.ops.object.select_all(action='DESELECT')
 
-            filename += '_' + str(check_duplicate) if bool(check_duplicate) else ''
-            filename_ext = filename + '.' + self.ext_file
+        child_index = self.create_child_index()
 
-            if not self.is_file_exist(directory, filename_ext) or static_mesh.overwrite_file:
+        self.create_import_pipeline('ImportStaticMesh.py', unreal_engine_import_setting)
+        is_transfer_file = self.is_transfer_file()
 
-                is_object_has_custom_collision = bool([True for children_object in obj.children if children_object.type == 'MESH' and children_object.data.is_custom_collision])
-                if static_mesh.custom_collision and is_object_has_custom_collision:
-                    self.prepare_custom_collision(obj)
+        try:
+            for index, obj in enumerate(objects):
+                # upload of the file added by the previous item, its changes to the scene are restored
+                yield from self.send_import_files()
 
-                is_object_has_socket = bool([True for children_object in obj.children if children_object.type == 'EMPTY' and children_object.is_socket])
-                if static_mesh.socket and is_object_has_socket:
-                    self.prepare_socket(obj)
+                yield index, len(objects)
 
-                self.mute_attach_constraint(obj)
+                filename = name_allocator.allocate(self.safe_string_path(obj.name))
+                filename_ext = filename + '.' + self.ext_file
 
-                original_location = obj.matrix_world.to_translation()
-                if static_mesh.origin == 'OBJECT':
-                    obj.matrix_world.translation = (0, 0, 0)
+                if not self.is_file_exist(directory, filename_ext) or static_mesh.overwrite_file:
 
-                original_rotation = obj.rotation_quaternion.copy() if obj.rotation_mode == 'QUATERNION' else obj.rotation_euler.copy()
-                if not static_mesh.apply_rotation:
-                    if obj.rotation_mode == 'QUATERNION':
-                        obj.rotation_quaternion = (1, 0, 0, 0)
+                    filepath = self.create_string_directory(directory, filename_ext)
+                    digest = export_cache.create_digest(objects=([obj] + child_index.get_children(obj) + [lod_obj for lod_obj, screen_size in child_index.get_lods(obj)]), setting=cache_setting)
+
+                    is_object_has_custom_collision = child_index.has_custom_collision(obj)
+                    is_object_has_socket = child_index.has_socket(obj)
+
+                    import_file = {
+                        'path': filepath,
+                        'custom_lightmap': 'lightmap' in [uv.name.lower() for uv in obj.data.uv_layers],
+                        'custom_collision': (static_mesh.custom_collision and is_object_has_custom_collision),
+                        'auto_compute_lod_distances': obj.data.auto_compute_lod_screen_size,
+                        'lod': (([obj.data.lod_0_screen_size] + [screen_size for lod_obj, screen_size in child_index.get_lods(obj)]) if (static_mesh.lod and bool(child_index.get_lods(obj))) else [])
+                    }
+
+                    if export_cache.is_cached(filepath, digest):
+                        # file is up to date, only import it when the static mesh is missing from unreal engine project
+                        if remote_asset_names is not None and filename not in remote_asset_names:
+                            self.add_import_file(unreal_engine_import_setting, import_file)
+                        continue
+
+                    if export_scene is not None:
+                        with self.profiler.phase('prepare_export_scene', obj.name):
+                            proxy = export_scene.add_static_mesh(obj, static_mesh.origin, static_mesh.apply_rotation)
+
+                            if static_mesh.custom_collision and is_object_has_custom_collision:
+                                export_scene.add_custom_collision(proxy, child_index.get_custom_collisions(obj))
+
+                            if static_mesh.socket and is_object_has_socket:
+                                export_scene.add_socket(proxy, child_index.get_sockets(obj))
+
+                            if static_mesh.lod:
+                                export_scene.add_lod(proxy, child_index.get_lods(obj))
                     else:
-                        obj.rotation_euler = (0, 0, 0)
+                        if static_mesh.custom_collision and is_object_has_custom_collision:
+                            self.prepare_custom_collision(obj)
+
+                        if static_mesh.socket and is_object_has_socket:
+                            self.prepare_socket(obj)
+
+                        self.mute_attach_constraint(obj)
+
+                        original_location = obj.matrix_world.to_translation()
+                        if static_mesh.origin == 'OBJECT':
+                            obj.matrix_world.translation = (0, 0, 0)
+
+                        original_rotation = obj.rotation_quaternion.copy() if obj.rotation_mode == 'QUATERNION' else obj.rotation_euler.copy()
+                        if not static_mesh.apply_rotation:
+                            if obj.rotation_mode == 'QUATERNION':
+                                obj.rotation_quaternion = (1, 0, 0, 0)
+                            else:
+                                obj.rotation_euler = (0, 0, 0)
+
+                        if static_mesh.lod:
+                            self.prepare_lod(obj)
+
+                        obj.select_set(state=True)
+
+                    export_setting = {
+                        'filepath': filepath,
+                        'check_existing': False,
+                        'filter_glob': '*.fbx',
+                        'use_selection': True,
+                        'use_active_collection': False,
+                        'object_types': {'MESH', 'EMPTY'},
+                        'use_custom_props': static_mesh.use_custom_props,
+                        'bake_anim': False,
+                        'path_mode': 'AUTO',
+                        'embed_textures': False,
+                        'batch_mode': 'OFF'
+                    }
+
+                    export_setting.update(fbx_setting.to_dict())
+
+                    # EXPORT
+                    fbx_data = None
+                    if export_scene is not None and static_mesh.fast_fbx_writer and fbx_writer.is_supported(export_setting):
+                        # fbx sent over the command socket never touch the temporary folder
+                        fbx_file = io.BytesIO() if is_transfer_file else None
+                        self.export_file(export_scene.write_fbx, obj.name, dict(export_setting, use_compression=(preferences.export.type != 'UNREAL'), file=fbx_file))
+                        fbx_data = fbx_file.getvalue() if fbx_file is not None else None
+                    else:
+                        self.export_file(bpy.ops.export_scene.fbx, obj.name, export_setting, export_scene)
 
-                if static_mesh.lod:
-                    self.prepare_lod(obj)
+                    export_cache.update(filepath, digest)
 
-                obj.select_set(state=True)
+                    self.add_import_file(unreal_engine_import_setting, import_file, fbx_data)
 
-                export_setting = {
-                    'filepath': self.create_string_directory(directory, filename_ext),
-                    'check_existing': False,
-                    'filter_glob': '*.fbx',
-                    'use_selection': True,
-                    'use_active_collection': False,
-                    'object_types': {'MESH', 'EMPTY'},
-                    'use_custom_props': static_mesh.use_custom_props,
-                    'bake_anim': False,
-                    'path_mode': 'AUTO',
-                    'embed_textures': False,
-                    'batch_mode': 'OFF'
-                }
+                    if export_scene is not None:
+                        export_scene.clear()
+                        continue
 
-                export_setting.update(fbx_setting.to_dict())
+                    obj.select_set(state=False)
 
-                # EXPORT
-                bpy.ops.export_scene.fbx(**export_setting)
+                    if static_mesh.custom_collision and is_object_has_custom_collision:
+                        self.restore_custom_collision()
 
-                unreal_engine_import_setting['files'].append({
-                    'path': export_setting['filepath'],
-                    'custom_lightmap': 'lightmap' in [uv.name.lower() for uv in obj.data.uv_layers],
-                    'custom_collision': (static_mesh.custom_collision and is_object_has_custom_collision),
-                    'auto_compute_lod_distances': obj.data.auto_compute_lod_screen_size,
-                    'lod': (([obj.data.lod_0_screen_size] + [lod.screen_size for lod in obj.data.lods if lod.obj is not None]) if (static_mesh.lod and bool([True for lod in obj.data.lods if lod.obj is not None])) else [])
-                })
+                    if static_mesh.socket and is_object_has_socket:
+                        self.restore_socket()
 
-                obj.select_set(state=False)
+                    if static_mesh.lod:
+                        self.restore_lod()
 
-                if static_mesh.custom_collision and is_object_has_custom_collision:
-                    self.restore_custom_collision()
+                    if static_mesh.origin == 'OBJECT':
+                        obj.matrix_world.translation = original_location
 
-                if static_mesh.socket and is_object_has_socket:
-                    self.restore_socket()
+                    if not static_mesh.apply_rotation:
+                        if obj.rotation_mode == 'QUATERNION':
+                            obj.rotation_quaternion = original_rotation
+                        else:
+                            obj.rotation_euler = original_rotation
 
-                if static_mesh.lod:
-                    self.restore_lod()
+                    self.unmute_attach_constraint(obj)
+        finally:
+            # failed or cancelled export leave nothing behind
+            if export_scene is not None:
+                export_scene.remove()
+            else:
+                self.restore_collection(*list_unhide_collection_name)
 
-                if static_mesh.origin == 'OBJECT':
-                    obj.matrix_world.translation = original_location
+                for obj in selected_objects:
+                    obj.select_set(state=True)
 
-                if not static_mesh.apply_rotation:
-                    if obj.rotation_mode == 'QUATERNION':
-                        obj.rotation_quaternion = original_rotation
-                    else:
-                        obj.rotation_euler = original_rotation
+        yield from self.send_import_files()
 
-                self.unmute_attach_constraint(obj)
+        export_cache.save()
 
-        self.restore_collection(*list_unhide_collection_name)
+        yield len(objects), len(objects)
 
-        for obj in selected_objects:
-            obj.select_set(state=True)
+        yield from self.unreal_engine_exec_script_steps('ImportStaticMesh.py', unreal_engine_import_setting)
 
-        self.unreal_engine_exec_script('ImportStaticMesh.py', unreal_engine_import_setting)
+        profiler.write(directory)
 
-        self.report({'INFO'}, 'export ' + str(len(unreal_engine_import_setting['files'])) + ' static mesh success')
+        self.report({'INFO'}, 'export ' + str(len(unreal_engine_import_setting['files'])) + ' static mesh success' + export_cache.summary + profiler.summary)
 
         return {'FINISHED'}
 
@@ -156,6 +234,7 @@ class PANEL(Panel):
             ('Level of Detail', 'lod'),
             ('Export Static Mesh Option', 'option'),
             ('Origin', 'origin'),
+            ('Fast FBX Writer', 'fast_fbx_writer'),
         ]
 
         for label_str, property_str in col_data:
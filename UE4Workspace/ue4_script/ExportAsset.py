@@ -15,12 +15,11 @@ from unreal import (
 
 # addon_path is Blender Unreal Engien 4 Workspace addon path
 # node_id is unreal engine project instance
+# result_channel is SOCKET to return result as command result or FILE to write result to temp folder
 
 asset_registry = AssetRegistryHelpers.get_asset_registry()
 
-load_imported_asset_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'imported_asset_list.json')), 'r')
-original_imported_asset_list = json.loads(load_imported_asset_list.read())
-load_imported_asset_list.close()
+imported_asset_list = []
 
 json_file = open(os.path.normpath(os.path.join(addon_path, 'temp', 'import_asset_setting.json')), 'r')
 import_asset_setting = json.loads(json_file.read())
@@ -69,8 +68,17 @@ for asset_path, index in assets:
 
         is_export_success = Exporter.run_asset_export_task(export_task)
         if is_export_success:
-            original_imported_asset_list.append([target_path, str(asset.asset_class), str(asset.asset_name)])
+            imported_asset_list.append([target_path, str(asset.asset_class), str(asset.asset_name)])
 
-save_imported_asset_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'imported_asset_list.json')), 'w+')
-save_imported_asset_list.write(json.dumps(original_imported_asset_list, indent=4))
-save_imported_asset_list.close()
\ No newline at end of file
+if result_channel == 'FILE':
+    load_imported_asset_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'imported_asset_list.json')), 'r')
+    original_imported_asset_list = json.loads(load_imported_asset_list.read())
+    load_imported_asset_list.close()
+
+    original_imported_asset_list.extend(imported_asset_list)
+
+    save_imported_asset_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'imported_asset_list.json')), 'w+')
+    save_imported_asset_list.write(json.dumps(original_imported_asset_list, indent=4))
+    save_imported_asset_list.close()
+else:
+    result = json.dumps(imported_asset_list, separators=(',', ':'))
\ No newline at end of file
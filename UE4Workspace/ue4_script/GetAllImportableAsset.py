@@ -1,24 +1,108 @@
 import os
+import sys
 import json
+import uuid
+import types
 from unreal import (
-    AssetRegistryHelpers
+    AssetRegistryHelpers,
+    ARFilter,
+    Paths
 )
 
 # addon_path is Blender Unreal Engien 4 Workspace addon path
 # node_id is unreal engine project instance
+# result_channel is SOCKET to return result as command result or FILE to write result to temp folder
+# args is {'sync_tokens': {node_id: token}, 'filter': {'path': str, 'name': str, 'class_names': [str]}, 'page': int, 'page_size': int}
+# sync_tokens is from last sync of the blender scene, page_size above 0 return one page of the filtered asset instead of sync
+
+# snapshot of the last sync stay alive between script call as a module, keyed by sync token
+if 'ue4workspace_asset_snapshot' not in sys.modules:
+    sys.modules['ue4workspace_asset_snapshot'] = types.ModuleType('ue4workspace_asset_snapshot')
+    sys.modules['ue4workspace_asset_snapshot'].snapshots = {}
+
+snapshots = sys.modules['ue4workspace_asset_snapshot'].snapshots
 
 asset_registry = AssetRegistryHelpers.get_asset_registry()
 
-all_assets = asset_registry.get_assets_by_path('/Game', recursive=True)
+asset_filter = args.get('filter', {})
+filter_path = asset_filter.get('path', '').strip().rstrip('/') or '/Game'
+filter_name = asset_filter.get('name', '').strip().lower()
+filter_class_names = asset_filter.get('class_names') or ['StaticMesh', 'SkeletalMesh', 'AnimSequence']
+
+all_assets = asset_registry.get_assets(ARFilter(class_names=filter_class_names, package_paths=[filter_path], recursive_paths=True))
+
+if filter_name:
+    all_assets = [asset for asset in all_assets if filter_name in str(asset.asset_name).lower()]
+
+page_size = args.get('page_size', 0)
+
+if result_channel == 'FILE':
+    asset_list = [(node_id, str(asset.object_path), str(asset.asset_name), str(asset.asset_class)) for asset in all_assets]
+
+    load_import_asset_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'import_asset_list.json')), 'r')
+    original_asset_list = json.loads(load_import_asset_list.read())
+    load_import_asset_list.close()
+
+    original_asset_list.extend(asset_list)
+
+    save_import_asset_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'import_asset_list.json')), 'w+')
+    save_import_asset_list.write(json.dumps(original_asset_list, indent=4))
+    save_import_asset_list.close()
+elif page_size > 0:
+    rows = sorted([[str(asset.object_path), str(asset.asset_name), str(asset.asset_class)] for asset in all_assets], key=lambda row: (row[1].lower(), row[0]))
+    start = args.get('page', 0) * page_size
+
+    result = json.dumps({
+        'total': len(rows),
+        'page': rows[start:start + page_size]
+    }, separators=(',', ':'))
+else:
+    # plugin mount point content folder is not known here, those asset have no stamp and are sent on every sync
+    content_dirs = {
+        '/Game/': Paths.convert_relative_path_to_full(Paths.project_content_dir()),
+        '/Engine/': Paths.convert_relative_path_to_full(Paths.engine_content_dir())
+    }
+
+    def get_modification_stamp(package_name):
+        for mount_point, content_dir in content_dirs.items():
+            if package_name.startswith(mount_point):
+                try:
+                    return os.path.getmtime(os.path.join(content_dir, package_name[len(mount_point):] + '.uasset'))
+                except OSError:
+                    # not saved yet
+                    return 0
+        return None
+
+    snapshot = {}
+    for asset in all_assets:
+        package_name = str(asset.package_name)
+        snapshot[str(asset.object_path)] = (str(asset.asset_name), str(asset.asset_class), get_modification_stamp(package_name))
+
+    sync_token = args.get('sync_tokens', {}).get(node_id)
+    last_snapshot = snapshots.pop(sync_token, None)
+
+    # snapshot of another filter can not be used as base of the delta
+    filter_key = [filter_path, filter_name, sorted(filter_class_names)]
+    if last_snapshot is not None and last_snapshot['filter'] != filter_key:
+        last_snapshot = None
 
-asset_list = [(node_id, str(asset.object_path), str(asset.asset_name), str(asset.asset_class)) for asset in all_assets if str(asset.asset_class) in ['StaticMesh', 'SkeletalMesh', 'AnimSequence']]
+    if last_snapshot is None:
+        upserts = [[object_path, asset_name, asset_class] for object_path, (asset_name, asset_class, stamp) in snapshot.items()]
+        removes = []
+    else:
+        upserts = [[object_path, asset_name, asset_class] for object_path, (asset_name, asset_class, stamp) in snapshot.items() if stamp is None or last_snapshot['assets'].get(object_path) != (asset_name, asset_class, stamp)]
+        removes = [object_path for object_path in last_snapshot['assets'].keys() if object_path not in snapshot]
 
-load_import_asset_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'import_asset_list.json')), 'r')
-original_asset_list = json.loads(load_import_asset_list.read())
-load_import_asset_list.close()
+    token = str(uuid.uuid4())
+    snapshots[token] = {'filter': filter_key, 'assets': snapshot}
 
-original_asset_list.extend(asset_list)
+    # keep a few snapshot for other blender scene, drop the oldest
+    for old_token in list(snapshots.keys())[:-8]:
+        del snapshots[old_token]
 
-save_import_asset_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'import_asset_list.json')), 'w+')
-save_import_asset_list.write(json.dumps(original_asset_list, indent=4))
-save_import_asset_list.close()
\ No newline at end of file
+    result = json.dumps({
+        'reset': last_snapshot is None,
+        'token': token,
+        'upserts': upserts,
+        'removes': removes
+    }, separators=(',', ':'))
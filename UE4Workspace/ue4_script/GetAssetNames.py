@@ -0,0 +1,30 @@
+import os
+import json
+from unreal import (
+    AssetRegistryHelpers,
+    ARFilter
+)
+
+# addon_path is Blender Unreal Engien 4 Workspace addon path
+# node_id is unreal engine project instance
+# result_channel is SOCKET to return result as command result or FILE to write result to temp folder
+# args is {'path': str, 'class_names': [str]}, name of the asset directly in the path, used by export cache to know what is already imported
+
+asset_registry = AssetRegistryHelpers.get_asset_registry()
+
+all_assets = asset_registry.get_assets(ARFilter(class_names=args.get('class_names', []), package_paths=[args['path'].rstrip('/')], recursive_paths=False))
+
+asset_name_list = [(node_id, str(asset.asset_name)) for asset in all_assets]
+
+if result_channel == 'FILE':
+    load_asset_name_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'asset_name_list.json')), 'r')
+    original_asset_name_list = json.loads(load_asset_name_list.read())
+    load_asset_name_list.close()
+
+    original_asset_name_list.extend(asset_name_list)
+
+    save_asset_name_list = open(os.path.normpath(os.path.join(addon_path, 'temp', 'asset_name_list.json')), 'w+')
+    save_asset_name_list.write(json.dumps(original_asset_name_list, indent=4))
+    save_asset_name_list.close()
+else:
+    result = json.dumps(asset_name_list, separators=(',', ':'))
@@ -1,6 +1,7 @@
 import os
 import inspect
 import json
+import tempfile
 
 from unreal import (
     EditorAssetLibrary,
@@ -17,69 +18,94 @@ from unreal import (
 
 # addon_path is Blender Unreal Engien 4 Workspace addon path
 # node_id is unreal engine project instance
+# args is {'import_setting': dict} when blender send files in batch while export still running, otherwise read from temp folder
 
-json_file = open(os.path.normpath(os.path.join(addon_path, 'temp', 'unreal_engine_import_setting.json')), 'r')
-unreal_engine_import_setting = json.loads(json_file.read())
-json_file.close()
+if args.get('import_setting'):
+    unreal_engine_import_setting = args['import_setting']
+else:
+    json_file = open(os.path.normpath(os.path.join(addon_path, 'temp', 'unreal_engine_import_setting.json')), 'r')
+    unreal_engine_import_setting = json.loads(json_file.read())
+    json_file.close()
 
 target_path = '/' + os.path.join('Game', unreal_engine_import_setting['main_folder'], unreal_engine_import_setting['subfolder']).replace(os.sep, '/')
 
 if EditorAssetLibrary.does_directory_exist(directory_path=target_path):
     EditorAssetLibrary.make_directory(directory_path=target_path)
 
-for file in unreal_engine_import_setting['files']:
-    source_file = file['path'].replace(os.sep, '/')
-    target_node_id, skeleton_path = file['skeleton'].split(':')
+skeleton_assets = {}
+
+def get_skeleton_asset(skeleton_path):
+    if skeleton_path not in skeleton_assets:
+        skeleton_assets[skeleton_path] = load_asset(skeleton_path) if skeleton_path != 'NONE' else None
+    return skeleton_assets[skeleton_path]
+
+import_options_cache = {}
+
+def get_import_options(key):
+    # files with the same skeleton share one import options object
+    if key in import_options_cache:
+        return import_options_cache[key]
+
+    import_options = FbxImportUI()
 
-    skeleton_asset = load_asset(skeleton_path) if skeleton_path != 'NONE' else None
+    skeleton_asset = get_skeleton_asset(key)
 
-    if os.path.exists(source_file) and bool(skeleton_asset):
-        import_options = FbxImportUI()
+    frame_import_range_min, frame_import_range_max = unreal_engine_import_setting['frame_import_range']
+    frame_import_range = Int32Interval()
 
-        frame_import_range_min, frame_import_range_max = unreal_engine_import_setting['frame_import_range']
-        frame_import_range = Int32Interval()
+    for option, prop, value in ([
+        (import_options, 'import_mesh', False),
+        (import_options, 'import_as_skeletal', False),
+        (import_options, 'import_animations', True),
 
-        for option, prop, value in ([
-            (import_options, 'import_mesh', False),
-            (import_options, 'import_as_skeletal', False),
-            (import_options, 'import_animations', True),
+        (import_options, 'skeleton', skeleton_asset),
 
-            (import_options, 'skeleton', skeleton_asset),
+        (import_options.anim_sequence_import_data, 'animation_length', getattr(FBXAnimationLengthImportType, unreal_engine_import_setting['animation_length'])),
+        (import_options.anim_sequence_import_data, 'import_meshes_in_bone_hierarchy', unreal_engine_import_setting['import_meshes_in_bone_hierarchy']),
+        (frame_import_range, 'min', frame_import_range_min),
+        (frame_import_range, 'max', frame_import_range_max),
+        (import_options.anim_sequence_import_data, 'frame_import_range', frame_import_range),
+        (import_options.anim_sequence_import_data, 'use_default_sample_rate', unreal_engine_import_setting['use_default_sample_rate']),
+        (import_options.anim_sequence_import_data, 'custom_sample_rate', unreal_engine_import_setting['custom_sample_rate']),
+        (import_options.anim_sequence_import_data, 'import_custom_attribute', unreal_engine_import_setting['import_custom_attribute']),
+        (import_options.anim_sequence_import_data, 'delete_existing_custom_attribute_curves', unreal_engine_import_setting['delete_existing_custom_attribute_curves']),
+        (import_options.anim_sequence_import_data, 'import_bone_tracks', unreal_engine_import_setting['import_bone_tracks']),
+        (import_options.anim_sequence_import_data, 'set_material_drive_parameter_on_custom_attribute', unreal_engine_import_setting['set_material_drive_parameter_on_custom_attribute']),
+        (import_options.anim_sequence_import_data, 'material_curve_suffixes', unreal_engine_import_setting['material_curve_suffixes']),
+        (import_options.anim_sequence_import_data, 'remove_redundant_keys', unreal_engine_import_setting['remove_redundant_keys']),
+        (import_options.anim_sequence_import_data, 'delete_existing_morph_target_curves', unreal_engine_import_setting['delete_existing_morph_target_curves']),
+        (import_options.anim_sequence_import_data, 'do_not_import_curve_with_zero', unreal_engine_import_setting['do_not_import_curve_with_zero']),
+        (import_options.anim_sequence_import_data, 'preserve_local_transform', unreal_engine_import_setting['preserve_local_transform']),
 
-            (import_options.anim_sequence_import_data, 'animation_length', getattr(FBXAnimationLengthImportType, unreal_engine_import_setting['animation_length'])),
-            (import_options.anim_sequence_import_data, 'import_meshes_in_bone_hierarchy', unreal_engine_import_setting['import_meshes_in_bone_hierarchy']),
-            (frame_import_range, 'min', frame_import_range_min),
-            (frame_import_range, 'max', frame_import_range_max),
-            (import_options.anim_sequence_import_data, 'frame_import_range', frame_import_range),
-            (import_options.anim_sequence_import_data, 'use_default_sample_rate', unreal_engine_import_setting['use_default_sample_rate']),
-            (import_options.anim_sequence_import_data, 'custom_sample_rate', unreal_engine_import_setting['custom_sample_rate']),
-            (import_options.anim_sequence_import_data, 'import_custom_attribute', unreal_engine_import_setting['import_custom_attribute']),
-            (import_options.anim_sequence_import_data, 'delete_existing_custom_attribute_curves', unreal_engine_import_setting['delete_existing_custom_attribute_curves']),
-            (import_options.anim_sequence_import_data, 'import_bone_tracks', unreal_engine_import_setting['import_bone_tracks']),
-            (import_options.anim_sequence_import_data, 'set_material_drive_parameter_on_custom_attribute', unreal_engine_import_setting['set_material_drive_parameter_on_custom_attribute']),
-            (import_options.anim_sequence_import_data, 'material_curve_suffixes', unreal_engine_import_setting['material_curve_suffixes']),
-            (import_options.anim_sequence_import_data, 'remove_redundant_keys', unreal_engine_import_setting['remove_redundant_keys']),
-            (import_options.anim_sequence_import_data, 'delete_existing_morph_target_curves', unreal_engine_import_setting['delete_existing_morph_target_curves']),
-            (import_options.anim_sequence_import_data, 'do_not_import_curve_with_zero', unreal_engine_import_setting['do_not_import_curve_with_zero']),
-            (import_options.anim_sequence_import_data, 'preserve_local_transform', unreal_engine_import_setting['preserve_local_transform']),
+        # Transform
 
-            # Transform
+        (import_options.anim_sequence_import_data, 'import_translation', Vector(*unreal_engine_import_setting['import_translation'])),
+        (import_options.anim_sequence_import_data, 'import_rotation', Rotator(*unreal_engine_import_setting['import_rotation'])),
+        (import_options.anim_sequence_import_data, 'import_uniform_scale', unreal_engine_import_setting['import_uniform_scale']),
 
-            (import_options.anim_sequence_import_data, 'import_translation', Vector(*unreal_engine_import_setting['import_translation'])),
-            (import_options.anim_sequence_import_data, 'import_rotation', Rotator(*unreal_engine_import_setting['import_rotation'])),
-            (import_options.anim_sequence_import_data, 'import_uniform_scale', unreal_engine_import_setting['import_uniform_scale']),
+        # Misc.
 
-            # Misc.
+        (import_options.anim_sequence_import_data, 'convert_scene', unreal_engine_import_setting['convert_scene']),
+        (import_options.anim_sequence_import_data, 'force_front_x_axis', unreal_engine_import_setting['force_front_x_axis']),
+        (import_options.anim_sequence_import_data, 'convert_scene_unit', unreal_engine_import_setting['convert_scene_unit']),
+        (import_options, 'override_full_name', unreal_engine_import_setting['override_full_name']),
+    ]):
+        option.set_editor_property(prop, value)
 
-            (import_options.anim_sequence_import_data, 'convert_scene', unreal_engine_import_setting['convert_scene']),
-            (import_options.anim_sequence_import_data, 'force_front_x_axis', unreal_engine_import_setting['force_front_x_axis']),
-            (import_options.anim_sequence_import_data, 'convert_scene_unit', unreal_engine_import_setting['convert_scene_unit']),
-            (import_options, 'override_full_name', unreal_engine_import_setting['override_full_name']),
-        ]):
-            option.set_editor_property(prop, value)
+    import_options_cache[key] = import_options
+    return import_options
 
-        # Task
+# Task
 
+import_tasks = []
+transfer_files = []
+
+for file in unreal_engine_import_setting['files']:
+    # file sent over the command socket is already in unreal engine temporary folder, see ReceiveFile.py
+    source_file = (os.path.join(tempfile.gettempdir(), 'UE4Workspace', os.path.basename(file['transfer']), node_id, os.path.basename(file['path'])) if file.get('transfer') else file['path']).replace(os.sep, '/')
+    target_node_id, skeleton_path = file['skeleton'].split(':')
+
+    if os.path.exists(source_file) and bool(get_skeleton_asset(skeleton_path)):
         import_task = AssetImportTask()
 
         for prop, value in [
@@ -89,14 +115,32 @@ for file in unreal_engine_import_setting['files']:
             ('filename', source_file),
             ('replace_existing', unreal_engine_import_setting['overwrite_file']),
             ('save', False),
-            ('options', import_options),
+            ('options', get_import_options(skeleton_path)),
         ]:
             import_task.set_editor_property(prop, value)
 
+        import_tasks.append((import_task, source_file))
+        if file.get('transfer'):
+            transfer_files.append(source_file)
+
+if unreal_engine_import_setting.get('batch_import', True) and bool(import_tasks):
+    # one call for every file, unreal engine share the import pipeline setup between tasks
+    AssetToolsHelpers.get_asset_tools().import_asset_tasks([import_task for import_task, source_file in import_tasks])
+else:
+    for import_task, source_file in import_tasks:
         AssetToolsHelpers.get_asset_tools().import_asset_tasks([import_task])
 
-        if unreal_engine_import_setting['temporary']:
-            try:
-                os.remove(source_file)
-            except:
-                print('Failed to Remove Temporary File, Location : ' + source_file)
+# every node read the same file in the temporary folder, blender remove it once all nodes finished
+# only the copy sent over the command socket belong to this node
+for source_file in transfer_files:
+    try:
+        os.remove(source_file)
+    except:
+        print('Failed to Remove Temporary File, Location : ' + source_file)
+
+    # node folder and the folder of the sent file, last node on the machine remove it, see ReceiveFile.py
+    for folder in [os.path.dirname(source_file), os.path.dirname(os.path.dirname(source_file))]:
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
@@ -0,0 +1,23 @@
+import os
+import json
+import base64
+import tempfile
+
+# addon_path is Blender Unreal Engien 4 Workspace addon path
+# node_id is unreal engine project instance
+# args is {'folder': str, 'filename': str, 'offset': int, 'data': base64 str}, one chunk of a file blender send over the command socket
+# folder is unique for every sent file, node_id keep nodes on the same machine from sharing the file
+
+transfer_folder = os.path.join(tempfile.gettempdir(), 'UE4Workspace', os.path.basename(args['folder']), node_id)
+
+os.makedirs(transfer_folder, exist_ok=True)
+
+transfer_path = os.path.join(transfer_folder, os.path.basename(args['filename']))
+
+# first chunk create the file, the rest append at their offset
+transfer_file = open(transfer_path, 'wb' if args['offset'] == 0 else 'r+b')
+transfer_file.seek(args['offset'])
+transfer_file.write(base64.b64decode(args['data']))
+transfer_file.close()
+
+result = json.dumps(transfer_path.replace(os.sep, '/'))
@@ -2,14 +2,83 @@ import os
 import math
 import re
 import json
+import time
+import threading
 import bpy
 from bpy.types import Panel as OriginalPanel, Operator as OriginalOperator
 from mathutils import Matrix
 from . connect import remote
+from . cache import ExportCache
+from . profiler import ExportProfiler, profile_phase
+from . pipeline import ImportPipeline, transfer_file, remove_temporary_files
+from . import worker
 
 def create_matrix_scale_from_vector(vec):
     return Matrix.Scale(vec[0], 4, (1.0, 0.0, 0.0)) @ Matrix.Scale(vec[1], 4, (0.0, 1.0, 0.0)) @ Matrix.Scale(vec[2], 4, (0.0, 0.0, 1.0))
 
+class UniqueNameAllocator:
+
+    def __init__(self):
+        self.counters = {}
+        self.used = set()
+
+    def allocate(self, name):
+        # compare in lower case, file name and unreal engine asset name are case insensitive
+        key = name.lower()
+        unique_name = name
+        if key in self.used:
+            index = self.counters.get(key, 0) + 1
+            while (key + '_' + str(index)) in self.used:
+                index += 1
+            self.counters[key] = index
+            unique_name = name + '_' + str(index)
+        self.used.add(unique_name.lower())
+        return unique_name
+
+class ExportChildIndex:
+
+    def __init__(self):
+        # built once per export, obj.children and the collection scan walk every object on each call
+        self.children = {}
+        for obj in bpy.data.objects:
+            if obj.parent is not None:
+                self.children.setdefault(obj.parent.as_pointer(), []).append(obj)
+
+        self.custom_collisions = {}
+        collision_collection = bpy.data.collections.get('UE4CustomCollision', False)
+        if collision_collection:
+            for collision_object in collision_collection.objects:
+                if collision_object.parent is not None and collision_object.type == 'MESH' and collision_object.data.is_custom_collision:
+                    self.custom_collisions.setdefault(collision_object.parent.as_pointer(), []).append(collision_object)
+
+        self.sockets = {}
+        socket_collection = bpy.data.collections.get('UE4Socket', False)
+        if socket_collection:
+            for socket_object in socket_collection.objects:
+                if socket_object.parent is not None and socket_object.type == 'EMPTY' and socket_object.is_socket:
+                    self.sockets.setdefault(socket_object.parent.as_pointer(), []).append(socket_object)
+
+    def get_children(self, obj):
+        return self.children.get(obj.as_pointer(), [])
+
+    def get_custom_collisions(self, obj):
+        return self.custom_collisions.get(obj.as_pointer(), [])
+
+    def get_sockets(self, obj):
+        return self.sockets.get(obj.as_pointer(), [])
+
+    def get_lods(self, obj):
+        return [(lod.obj, lod.screen_size) for lod in obj.data.lods if lod.obj is not None]
+
+    def get_skeletal_mesh_parts(self, obj):
+        return [children_obj for children_obj in self.get_children(obj) if children_obj.type == 'MESH' and children_obj.data.is_export_skeletal_mesh_part]
+
+    def has_custom_collision(self, obj):
+        return bool([True for children_obj in self.get_children(obj) if children_obj.type == 'MESH' and children_obj.data.is_custom_collision])
+
+    def has_socket(self, obj):
+        return bool([True for children_obj in self.get_children(obj) if children_obj.type == 'EMPTY' and children_obj.is_socket])
+
 class Panel(OriginalPanel):
     bl_category = 'UE4Workspace'
     bl_space_type = 'VIEW_3D'
@@ -86,7 +155,150 @@ class ExportOptionPanel(Panel):
                     else:
                         col.prop(data, property_str, text='')
 
-class ExportOperator(OriginalOperator):
+# event the modal operator let through, only view navigation, everything else could edit, undo or save the scene the steps are changing
+MODAL_PASS_THROUGH_EVENTS = {
+    'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'WHEELINMOUSE', 'WHEELOUTMOUSE',
+    'TRACKPADPAN', 'TRACKPADZOOM', 'MOUSEROTATE', 'NDOF_MOTION',
+    'NUMPAD_0', 'NUMPAD_1', 'NUMPAD_2', 'NUMPAD_3', 'NUMPAD_4', 'NUMPAD_5', 'NUMPAD_6', 'NUMPAD_7', 'NUMPAD_8', 'NUMPAD_9', 'NUMPAD_PERIOD', 'NUMPAD_PLUS', 'NUMPAD_MINUS'
+}
+
+class StepOperator(OriginalOperator):
+    # create_steps of the operator is a generator, yield (done, total) between item and None while waiting, return the operator result
+    # invoke run the steps on a timer so the ui stay responsive, execute run them at once
+
+    # time budget of work per timer tick on modal operator, in second
+    modal_step_time = 0.05
+    # one modal operator at a time, a second one would start from the scene the first one is changing
+    is_running = False
+    # shown on the status bar while a step is waiting
+    waiting_for = ''
+
+    def create_steps(self, context):
+        # no step, operator that does not override it finish at once
+        yield from ()
+        return {'FINISHED'}
+
+    def is_modal(self, context):
+        return not worker.is_worker()
+
+    def finish_steps(self):
+        pass
+
+    def run_steps(self, steps):
+        while True:
+            try:
+                next(steps)
+            except StopIteration as result:
+                return result.value
+
+    def execute(self, context):
+        try:
+            return self.run_steps(self.create_steps(context))
+        finally:
+            self.finish_steps()
+
+    def invoke(self, context, event):
+        if StepOperator.is_running:
+            self.report({'WARNING'}, 'Wait for the running export to finish or press ESC to cancel it')
+            return {'CANCELLED'}
+
+        if not self.is_modal(context):
+            return self.execute(context)
+
+        self.steps = self.create_steps(context)
+
+        # first step run here, everything that read the context happen before the first yield
+        try:
+            self.progress = next(self.steps)
+        except StopIteration as result:
+            self.finish_steps()
+            return result.value
+        except Exception:
+            self.finish_steps()
+            raise
+
+        StepOperator.is_running = True
+        window_manager = context.window_manager
+        self.timer = window_manager.event_timer_add(0.01, window=context.window)
+        window_manager.modal_handler_add(self)
+        window_manager.progress_begin(0, 100)
+        self.update_modal_progress(context)
+
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            # close run the finally block of the steps, scene is restored from there
+            self.finish_modal(context)
+            self.report({'WARNING'}, self.bl_label + ' cancelled')
+            return {'CANCELLED'}
+
+        if event.type in MODAL_PASS_THROUGH_EVENTS:
+            return {'PASS_THROUGH'}
+
+        if event.type != 'TIMER':
+            return {'RUNNING_MODAL'}
+
+        deadline = time.perf_counter() + self.modal_step_time
+        try:
+            while time.perf_counter() < deadline:
+                self.progress = next(self.steps)
+                if self.progress is None:
+                    break
+        except StopIteration as result:
+            self.finish_modal(context)
+            return result.value
+        except Exception:
+            self.finish_modal(context)
+            raise
+
+        self.update_modal_progress(context)
+
+        return {'RUNNING_MODAL'}
+
+    def update_modal_progress(self, context):
+        if self.progress is None:
+            status = self.bl_label + ', waiting for ' + self.waiting_for
+        else:
+            done, total = self.progress
+            context.window_manager.progress_update(int(100 * done / total) if total else 0)
+            status = self.bl_label + ' ' + str(done) + '/' + str(total)
+        context.workspace.status_text_set(status + ', ESC to cancel')
+
+    def cancel(self, context):
+        # modal handler removed by blender, like on file load
+        self.finish_modal(context)
+
+    def finish_modal(self, context):
+        StepOperator.is_running = False
+        self.steps.close()
+        self.finish_steps()
+        window_manager = context.window_manager
+        window_manager.event_timer_remove(self.timer)
+        window_manager.progress_end()
+        context.workspace.status_text_set(None)
+
+    def wait_for_thread(self, function, *args):
+        # blocking call run on a thread, yield until it finish so modal operator keep the ui responsive
+        result = {}
+
+        def target():
+            try:
+                result['value'] = function(*args)
+            except Exception as error:
+                result['error'] = error
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        while thread.is_alive():
+            thread.join(0.01)
+            yield None
+
+        if 'error' in result:
+            raise result['error']
+        return result.get('value')
+
+class ExportOperator(StepOperator):
 
     ext_file = ''
     collections_dict = {}
@@ -97,6 +309,12 @@ class ExportOperator(OriginalOperator):
     temp_main_lod_matrix_and_parent = None
     temp_skeletal_meshes = []
     temp_hair_particle = []
+    profiler = ExportProfiler(enabled=False)
+    child_index = None
+    import_pipeline = None
+    import_files_to_send = ()
+    export_cache = None
+    waiting_for = 'Unreal Engine'
 
     @classmethod
     def description(cls, context, properties):
@@ -111,10 +329,23 @@ class ExportOperator(OriginalOperator):
     def poll(cls, context):
         preferences = context.preferences.addons['UE4Workspace'].preferences
 
+        if StepOperator.is_running:
+            return False
         if preferences.export.type in ['FILE', 'BOTH']:
             return bool(preferences.export.export_folder.strip()) and context.mode == 'OBJECT'
         return bool(preferences.export.temp_folder.strip()) and context.mode == 'OBJECT'
 
+    def create_steps(self, context):
+        # export_steps of the export operator yield (done, total) between object
+        return self.export_steps(context)
+
+    def is_modal(self, context):
+        preferences = context.preferences.addons['UE4Workspace'].preferences
+        return preferences.export.modal and not worker.is_worker()
+
+    def finish_steps(self):
+        self.cancel_import_pipeline()
+
     def safe_string_path(self, string):
         return re.sub("[\\/:<>\'\"|?*&]", '', string).strip()
 
@@ -129,6 +360,102 @@ class ExportOperator(OriginalOperator):
     def is_file_exist(self, *args):
         return os.path.isfile(os.path.join(*args))
 
+    def get_objects(self, context, option):
+        if worker.is_worker():
+            return [bpy.data.objects[name] for name in worker.job_objects if name in bpy.data.objects]
+        return context.scene.objects if option == 'ALL' else context.selected_objects
+
+    def is_background_export(self, objects):
+        preferences = bpy.context.preferences.addons['UE4Workspace'].preferences
+        return preferences.export.background_worker > 0 and len(objects) > 1 and not worker.is_worker()
+
+    def execute_background(self, directory, objects, section, script, unreal_engine_import_setting, weight=None, data=None):
+        # generator like export_steps, objects is anything with a name, weight is the export cost of one of them for load balancing
+        preferences = bpy.context.preferences.addons['UE4Workspace'].preferences
+
+        self.waiting_for = 'background worker'
+        with self.profiler.phase('background_worker'):
+            files, cache_changes, failed = yield from worker.run_export_workers(self.bl_idname, section, objects, preferences, preferences.export.background_worker, self.safe_string_path, weight, data)
+        self.waiting_for = 'Unreal Engine'
+        unreal_engine_import_setting['files'].extend(files)
+
+        # worker hand the cache changes back, the cache file is written once here
+        if cache_changes:
+            export_cache = ExportCache(directory)
+            export_cache.changes.update(cache_changes)
+            export_cache.save()
+
+        if self.is_transfer_file():
+            for file in files:
+                yield from self.send_import_file(file)
+
+        if script:
+            yield from self.unreal_engine_exec_script_steps(script, unreal_engine_import_setting)
+
+        if failed:
+            self.report({'WARNING'}, str(failed) + ' background worker failed, see system console for detail')
+
+        self.profiler.write(directory)
+
+        self.report({'INFO'}, 'export ' + str(len(files)) + ' ' + section.replace('_', ' ') + ' success' + self.profiler.summary)
+
+        return {'FINISHED'}
+
+    def send_worker_result(self, unreal_engine_import_setting):
+        if worker.is_worker():
+            worker.write_worker_result(dict(unreal_engine_import_setting, cache_changes=(self.export_cache.changes if self.export_cache is not None else {})))
+            return True
+        return False
+
+    def create_export_profiler(self, name):
+        preferences = bpy.context.preferences.addons['UE4Workspace'].preferences
+        self.profiler = ExportProfiler(name, enabled=preferences.export.profile)
+        return self.profiler
+
+    def export_file(self, export_operator, object_name, export_setting, export_scene=None):
+        with self.profiler.phase('export_file', object_name) as record:
+            if export_scene is not None:
+                export_scene.export(export_operator, export_setting)
+            else:
+                export_operator(**export_setting)
+            if self.profiler.enabled and os.path.isfile(export_setting['filepath']):
+                record['bytes'] = os.path.getsize(export_setting['filepath'])
+
+    def create_child_index(self):
+        self.child_index = ExportChildIndex()
+        return self.child_index
+
+    def create_export_cache(self, directory, export_types=('FILE', 'BOTH')):
+        preferences = bpy.context.preferences.addons['UE4Workspace'].preferences
+        self.export_cache = ExportCache(directory, enabled=(preferences.export.use_cache and preferences.export.type in export_types), deferred=worker.is_worker())
+        return self.export_cache
+
+    def get_remote_asset_names(self, unreal_engine_import_setting, class_names, node_ids=None):
+        # generator like export_steps, name of the asset already in the import folder of every node in node_ids
+        # None when unreal engine is not asked, background worker get the names from the parent in the job data
+        if worker.is_worker():
+            asset_names = worker.job_data.get('remote_asset_names')
+            return set(asset_names) if asset_names is not None else None
+
+        preferences = bpy.context.preferences.addons['UE4Workspace'].preferences
+        if not (self.export_cache is not None and self.export_cache.enabled and preferences.export.type in ['UNREAL', 'BOTH'] and remote.remote_nodes):
+            return None
+
+        target_path = '/' + os.path.join('Game', unreal_engine_import_setting['main_folder'], unreal_engine_import_setting['subfolder']).replace(os.sep, '/')
+
+        with self.profiler.phase('remote_asset_names'):
+            rows, reports = yield from self.wait_for_thread(remote.exec_script_result, 'GetAssetNames.py', 'asset_name_list.json', preferences.connect_unreal_engine.result_channel, {'path': target_path, 'class_names': class_names})
+
+        # asset list is not known when a node failed, import everything again
+        if remote.failed_report(reports):
+            return set()
+
+        node_ids = set([str(node_id) for node_id in (node_ids if node_ids is not None else [node['node_id'] for node in remote.remote_nodes])])
+        asset_node_ids = {}
+        for node_id, asset_name in rows:
+            asset_node_ids.setdefault(asset_name, set()).add(str(node_id))
+        return set([asset_name for asset_name, asset_nodes in asset_node_ids.items() if node_ids <= asset_nodes])
+
     def unhide_collection(self, *args):
         self.collections_dict = {}
         for collection, state in args:
@@ -151,32 +478,106 @@ class ExportOperator(OriginalOperator):
                     setattr(collection_data, 'hide_' + key, val)
         self.collections_dict = {}
 
-    def unreal_engine_exec_script(self, script='ImportStaticMesh.py', unreal_engine_import_setting={}):
+    def create_import_pipeline(self, script, unreal_engine_import_setting):
+        preferences = bpy.context.preferences.addons['UE4Workspace'].preferences
+        self.import_pipeline = None
+        self.import_files_to_send = []
+        if preferences.export.pipeline_import and preferences.export.type in ['UNREAL', 'BOTH'] and remote.remote_nodes and not worker.is_worker():
+            unreal_engine_import_setting['batch_import'] = preferences.export.batch_import
+            self.import_pipeline = ImportPipeline(script, unreal_engine_import_setting, transfer=self.is_transfer_file())
+        return self.import_pipeline
+
+    def cancel_import_pipeline(self):
+        if self.import_pipeline is not None:
+            self.import_pipeline.cancel()
+            self.import_pipeline = None
+
+    def is_transfer_file(self):
+        # only temporary file can skip the disk, file and both export keep the fbx in export folder
+        preferences = bpy.context.preferences.addons['UE4Workspace'].preferences
+        return preferences.export.transfer == 'SOCKET' and preferences.export.type == 'UNREAL' and bool(remote.remote_nodes) and not worker.is_worker()
+
+    def send_import_file(self, file, data=None):
+        # generator, upload run on a thread so modal export keep the ui responsive
+        with self.profiler.phase('transfer_file', os.path.basename(file['path'])) as record:
+            record['bytes'] = len(data) if data is not None else os.path.getsize(file['path'])
+            reports = yield from self.wait_for_thread(transfer_file, file, data)
+
+        message = remote.failed_report(reports)
+        if message:
+            self.report({'WARNING'}, message)
+
+    def add_import_file(self, unreal_engine_import_setting, file, data=None):
+        # data is the fbx bytes when it was written in memory, only when is_transfer_file
+        # upload wait for send_import_files, the steps only yield once the scene is restored
+        unreal_engine_import_setting['files'].append(file)
+        if self.import_pipeline is not None:
+            with self.profiler.phase('import_pipeline_wait', os.path.basename(file['path'])):
+                self.import_pipeline.put(file, data)
+        elif self.is_transfer_file():
+            self.import_files_to_send.append((file, data))
+
+    def send_import_files(self):
+        # generator like export_steps, upload the file added since the last call
+        while self.import_files_to_send:
+            file, data = self.import_files_to_send.pop(0)
+            yield from self.send_import_file(file, data)
+
+    def unreal_engine_exec_script(self, script, unreal_engine_import_setting):
+        return self.run_steps(self.unreal_engine_exec_script_steps(script, unreal_engine_import_setting))
+
+    def unreal_engine_exec_script_steps(self, script, unreal_engine_import_setting):
+        if self.send_worker_result(unreal_engine_import_setting):
+            return
+
+        if self.import_pipeline is not None:
+            # files are already on their way, only wait for the last batch
+            import_pipeline = self.import_pipeline
+            self.import_pipeline = None
+            with self.profiler.phase('unreal_engine_import'):
+                reports = yield from self.wait_for_thread(import_pipeline.close)
+            self.profiler.add_remote_reports(script, reports)
+
+            message = remote.failed_report(reports)
+            if message:
+                self.report({'WARNING'}, message)
+            return
+
         preferences = bpy.context.preferences.addons['UE4Workspace'].preferences
         if preferences.export.type in ['UNREAL', 'BOTH'] and remote.remote_nodes:
+            unreal_engine_import_setting['batch_import'] = preferences.export.batch_import
+
             unreal_engine_import_setting_path = os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'temp', 'unreal_engine_import_setting.json')).replace(os.sep, '/')
 
-            file = open(unreal_engine_import_setting_path, 'w+')
-            file.write(json.dumps(unreal_engine_import_setting, indent=4))
-            file.close()
+            with self.profiler.phase('write_import_setting') as record:
+                file = open(unreal_engine_import_setting_path, 'w+')
+                record['bytes'] = file.write(json.dumps(unreal_engine_import_setting, indent=4))
+                file.close()
+
+            with self.profiler.phase('unreal_engine_import'):
+                reports = yield from self.wait_for_thread(remote.exec_script, script)
+            self.profiler.add_remote_reports(script, reports)
+            remove_temporary_files(unreal_engine_import_setting, unreal_engine_import_setting['files'], reports)
 
-            remote.exec_script(script)
+            message = remote.failed_report(reports)
+            if message:
+                self.report({'WARNING'}, message)
     
+    @profile_phase('prepare_custom_collision')
     def prepare_custom_collision(self, obj):
         self.temp_custom_collision = []
         base_collision_name = 'UCX_' + obj.name + '_'
-        collision_collection = bpy.data.collections.get('UE4CustomCollision', False)
-        if collision_collection:
-            for index, collision_object in enumerate([collision_object for collision_object in collision_collection.objects if collision_object.parent is obj and collision_object.type == 'MESH' and collision_object.data.is_custom_collision], start=1):
-                self.temp_custom_collision.append((collision_object, collision_object.name, collision_object.hide_get(), collision_object.hide_select, collision_object.hide_viewport))
+        for index, collision_object in enumerate(self.child_index.get_custom_collisions(obj), start=1):
+            self.temp_custom_collision.append((collision_object, collision_object.name, collision_object.hide_get(), collision_object.hide_select, collision_object.hide_viewport))
 
-                collision_object.hide_set(False)
-                collision_object.hide_select = False
-                collision_object.hide_viewport = False
-                collision_object.select_set(state=True)
+            collision_object.hide_set(False)
+            collision_object.hide_select = False
+            collision_object.hide_viewport = False
+            collision_object.select_set(state=True)
 
-                collision_object.name = base_collision_name + ('0' if index <= 9 else '') + str(index)
+            collision_object.name = base_collision_name + ('0' if index <= 9 else '') + str(index)
 
+    @profile_phase('restore_custom_collision')
     def restore_custom_collision(self):
         for collision_object, original_name, hide, hide_select, hide_viewport in self.temp_custom_collision:
             collision_object.hide_set(hide)
@@ -188,24 +589,24 @@ class ExportOperator(OriginalOperator):
 
         self.temp_custom_collision = []
 
+    @profile_phase('prepare_socket')
     def prepare_socket(self, obj):
         self.temp_socket = []
-        socket_collection = bpy.data.collections.get('UE4Socket', False)
-        if socket_collection:
-            for socket_object in [socket_object for socket_object in socket_collection.objects if socket_object.parent is obj and socket_object.type == 'EMPTY' and socket_object.is_socket]:
-                self.temp_socket.append((socket_object, socket_object.hide_get(), socket_object.hide_select, socket_object.hide_viewport))
+        for socket_object in self.child_index.get_sockets(obj):
+            self.temp_socket.append((socket_object, socket_object.hide_get(), socket_object.hide_select, socket_object.hide_viewport))
 
-                socket_object.hide_set(False)
-                socket_object.hide_select = False
-                socket_object.hide_viewport = False
-                socket_object.select_set(state=True)
+            socket_object.hide_set(False)
+            socket_object.hide_select = False
+            socket_object.hide_viewport = False
+            socket_object.select_set(state=True)
 
-                socket_object.scale /= 100
+            socket_object.scale /= 100
 
-                socket_object.rotation_euler.x += math.radians(90)
+            socket_object.rotation_euler.x += math.radians(90)
 
-                socket_object.name = 'SOCKET_' + socket_object.name
+            socket_object.name = 'SOCKET_' + socket_object.name
 
+    @profile_phase('restore_socket')
     def restore_socket(self):
         for socket_object, hide, hide_select, hide_viewport in self.temp_socket:
             socket_object.hide_set(hide)
@@ -220,9 +621,10 @@ class ExportOperator(OriginalOperator):
 
         self.temp_socket = []
 
+    @profile_phase('prepare_lod')
     def prepare_lod(self, obj):
         self.temp_lod = []
-        lods_data = [(lod.obj, lod.screen_size) for lod in obj.data.lods if lod.obj is not None]
+        lods_data = self.child_index.get_lods(obj)
         if bool(lods_data):
             lod_parent = bpy.data.objects.new('LOD_' + obj.name, None)
 
@@ -258,6 +660,7 @@ class ExportOperator(OriginalOperator):
 
                 self.temp_lod.append(lod_obj_copy)
 
+    @profile_phase('restore_lod')
     def restore_lod(self):
         if bool(self.temp_lod):
             lod_parent, obj, obj_matrix_world, obj_original_parent = self.temp_main_lod_matrix_and_parent
@@ -283,9 +686,10 @@ class ExportOperator(OriginalOperator):
         if constraint:
             constraint.mute = self.temp_attach_mute_state
 
+    @profile_phase('prepare_skeletal_meshes')
     def prepare_skeletal_meshes(self, obj):
         self.temp_skeletal_meshes = []
-        meshes = [children_obj for children_obj in obj.children if children_obj.type == 'MESH' and children_obj.data.is_export_skeletal_mesh_part]
+        meshes = self.child_index.get_skeletal_mesh_parts(obj)
         if bool(meshes):
             for skeletal_mesh_object in meshes:
                 self.temp_skeletal_meshes.append((skeletal_mesh_object, skeletal_mesh_object.hide_get(), skeletal_mesh_object.hide_select, skeletal_mesh_object.hide_viewport))
@@ -295,6 +699,7 @@ class ExportOperator(OriginalOperator):
                 skeletal_mesh_object.hide_viewport = False
                 skeletal_mesh_object.select_set(state=True)
 
+    @profile_phase('restore_skeletal_meshes')
     def restore_skeletal_meshes(self, obj):
         for skeletal_mesh_object, hide, hide_select, hide_viewport in self.temp_skeletal_meshes:
 
@@ -305,10 +710,12 @@ class ExportOperator(OriginalOperator):
 
         self.temp_skeletal_meshes = []
 
+    @profile_phase('prepare_groom')
     def prepare_groom(self, obj):
         self.temp_hair_particle = [obj.show_instancer_for_render, obj.show_instancer_for_viewport]
         obj.show_instancer_for_render, obj.show_instancer_for_viewport = [False, True]
 
+    @profile_phase('restore_groom')
     def restore_groom(self, obj):
         obj.show_instancer_for_render, obj.show_instancer_for_viewport = self.temp_hair_particle
         self.temp_hair_particle = []
\ No newline at end of file
@@ -0,0 +1,206 @@
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+
+CACHE_FILENAME = '.ue4workspace_cache.json'
+
+# ui state of the property, does not affect exported data
+IGNORE_RNA_PROPERTIES = ['rna_type', 'show_expanded', 'is_active', 'is_override_data_local']
+
+def to_plain_value(value):
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, 'name') and hasattr(value, 'bl_rna'):
+        # ID or struct reference, identify it by name
+        return value.name
+    try:
+        return [to_plain_value(item) for item in value]
+    except TypeError:
+        return repr(value)
+
+def hash_setting(hasher, setting):
+    hasher.update(json.dumps(setting, sort_keys=True, default=to_plain_value).encode('utf-8'))
+
+def hash_foreach(hasher, collection, prop, size=1, dtype=np.float32):
+    data = np.empty(len(collection) * size, dtype=dtype)
+    if len(collection):
+        collection.foreach_get(prop, data)
+    hasher.update(data.tobytes())
+
+def hash_rna(hasher, data):
+    for prop in data.bl_rna.properties:
+        if prop.identifier in IGNORE_RNA_PROPERTIES or prop.type == 'COLLECTION':
+            continue
+        hasher.update(repr((prop.identifier, to_plain_value(getattr(data, prop.identifier, None)))).encode('utf-8'))
+
+def hash_material(hasher, material):
+    if material is None:
+        hasher.update(b'NONE')
+        return
+    hash_setting(hasher, [material.name, list(material.diffuse_color), material.metallic, material.roughness])
+    if material.use_nodes and material.node_tree:
+        hash_setting(hasher, sorted([node.image.filepath for node in material.node_tree.nodes if node.type == 'TEX_IMAGE' and node.image]))
+
+def hash_mesh(hasher, mesh):
+    hash_foreach(hasher, mesh.vertices, 'co', 3)
+    hash_foreach(hasher, mesh.edges, 'vertices', 2, np.int32)
+    hash_foreach(hasher, mesh.edges, 'use_edge_sharp', 1, bool)
+    hash_foreach(hasher, mesh.loops, 'vertex_index', 1, np.int32)
+    hash_foreach(hasher, mesh.polygons, 'loop_start', 1, np.int32)
+    hash_foreach(hasher, mesh.polygons, 'loop_total', 1, np.int32)
+    hash_foreach(hasher, mesh.polygons, 'material_index', 1, np.int32)
+    hash_foreach(hasher, mesh.polygons, 'use_smooth', 1, bool)
+
+    for uv_layer in mesh.uv_layers:
+        hasher.update(uv_layer.name.encode('utf-8'))
+        hash_foreach(hasher, uv_layer.data, 'uv', 2)
+
+    for vertex_color in mesh.vertex_colors:
+        hasher.update(vertex_color.name.encode('utf-8'))
+        hash_foreach(hasher, vertex_color.data, 'color', 4)
+
+    if mesh.shape_keys:
+        for key_block in mesh.shape_keys.key_blocks:
+            hasher.update(key_block.name.encode('utf-8'))
+            hash_foreach(hasher, key_block.data, 'co', 3)
+
+    hash_setting(hasher, [mesh.use_auto_smooth, mesh.auto_smooth_angle, mesh.has_custom_normals])
+    # screen size of the level of detail go in the unreal engine import
+    hash_setting(hasher, [mesh.auto_compute_lod_screen_size, mesh.lod_0_screen_size, [(lod.obj, lod.screen_size) for lod in mesh.lods]])
+
+    for material in mesh.materials:
+        hash_material(hasher, material)
+
+def hash_vertex_groups(hasher, obj):
+    hash_setting(hasher, [vertex_group.name for vertex_group in obj.vertex_groups])
+    # vertex groups of a vertex is the only per vertex collection, gather every vertex into flat arrays
+    vertices_groups = [vertex.groups for vertex in obj.data.vertices]
+    counts = np.fromiter(map(len, vertices_groups), dtype=np.int32, count=len(vertices_groups))
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    groups = np.empty(offsets[-1], dtype=np.int32)
+    weights = np.empty(offsets[-1], dtype=np.float32)
+    for vertex_groups, start, end in zip(vertices_groups, offsets[:-1], offsets[1:]):
+        if end > start:
+            vertex_groups.foreach_get('group', groups[start:end])
+            vertex_groups.foreach_get('weight', weights[start:end])
+    hasher.update(counts.tobytes())
+    hasher.update(groups.tobytes())
+    hasher.update(weights.tobytes())
+
+def hash_armature(hasher, armature, pose=None):
+    bones = armature.bones
+    hash_setting(hasher, [(bone.name, bone.parent.name if bone.parent else None, bone.use_deform) for bone in bones])
+    hash_foreach(hasher, bones, 'head_local', 3)
+    hash_foreach(hasher, bones, 'tail_local', 3)
+    hash_foreach(hasher, bones, 'matrix_local', 16)
+    if pose is not None:
+        hash_foreach(hasher, pose.bones, 'matrix_basis', 16)
+
+def hash_object(hasher, obj, pose=True):
+    hash_setting(hasher, [obj.name, obj.type, [list(row) for row in obj.matrix_world], obj.parent.name if obj.parent else None, obj.parent_type, obj.parent_bone])
+    hash_setting(hasher, {key: obj[key] for key in obj.keys() if key != '_RNA_UI'})
+
+    for modifier in obj.modifiers:
+        hash_rna(hasher, modifier)
+
+    for material_slot in obj.material_slots:
+        hasher.update(material_slot.link.encode('utf-8'))
+        hash_material(hasher, material_slot.material)
+
+    if obj.type == 'MESH':
+        hash_mesh(hasher, obj.data)
+        if bool(obj.vertex_groups):
+            hash_vertex_groups(hasher, obj)
+    elif obj.type == 'ARMATURE':
+        hash_armature(hasher, obj.data, obj.pose if pose else None)
+    elif obj.type == 'EMPTY':
+        hash_setting(hasher, [obj.empty_display_type, obj.empty_display_size])
+
+def hash_action(hasher, action):
+    hash_setting(hasher, [action.name, list(action.frame_range)])
+    for fcurve in action.fcurves:
+        hash_setting(hasher, [fcurve.data_path, fcurve.array_index, fcurve.extrapolation, fcurve.mute])
+        hash_foreach(hasher, fcurve.keyframe_points, 'co', 2)
+        hash_foreach(hasher, fcurve.keyframe_points, 'handle_left', 2)
+        hash_foreach(hasher, fcurve.keyframe_points, 'handle_right', 2)
+        hash_foreach(hasher, fcurve.keyframe_points, 'interpolation', 1, np.int32)
+
+class ExportCache:
+
+    def __init__(self, directory, enabled=True, deferred=False):
+        # deferred cache keep its changes for another process to save, background worker share the export folder
+        self.enabled = enabled
+        self.deferred = deferred
+        self.path = os.path.join(directory, CACHE_FILENAME)
+        self.entries = self.load() if enabled else {}
+        self.changes = {}
+        self.hit = 0
+        self.miss = 0
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as file:
+                entries = json.loads(file.read())
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def create_digest(self, objects=(), actions=(), setting=None, pose=True):
+        if not self.enabled:
+            return None
+
+        hasher = hashlib.sha1()
+        hash_setting(hasher, setting if setting is not None else {})
+        for obj in objects:
+            hash_object(hasher, obj, pose=pose)
+        for action in actions:
+            hash_action(hasher, action)
+        return hasher.hexdigest()
+
+    def is_cached(self, filepath, digest, is_exist=None):
+        # is_exist replace the file check when the file does not stay on disk, temporary file for unreal engine
+        if digest is None:
+            return False
+
+        is_cached = (os.path.isfile(filepath) if is_exist is None else is_exist) and self.entries.get(os.path.basename(filepath)) == digest
+        if is_cached:
+            self.hit += 1
+        else:
+            self.miss += 1
+        return is_cached
+
+    def update(self, filepath, digest):
+        if digest is not None:
+            self.entries[os.path.basename(filepath)] = digest
+            self.changes[os.path.basename(filepath)] = digest
+
+    def save(self):
+        if not self.enabled or self.deferred or not bool(self.changes):
+            return
+
+        # merge with the file on disk, other export may have written it meanwhile
+        entries = self.load()
+        entries.update(self.changes)
+
+        # unique temporary file, two blender writing the same cache do not truncate each other file
+        file_descriptor, temp_path = tempfile.mkstemp(prefix=CACHE_FILENAME, suffix='.tmp', dir=os.path.dirname(self.path))
+        try:
+            with os.fdopen(file_descriptor, 'w') as file:
+                file.write(json.dumps(entries, indent=4))
+            os.replace(temp_path, self.path)
+        except OSError:
+            print('Failed to Save Export Cache, Location : ' + self.path)
+            if os.path.isfile(temp_path):
+                os.remove(temp_path)
+            return
+
+        self.entries = entries
+        self.changes = {}
+
+    @property
+    def summary(self):
+        return ', cache ' + str(self.hit) + ' hit ' + str(self.miss) + ' miss' if self.enabled else ''
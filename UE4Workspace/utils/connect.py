@@ -1,4 +1,7 @@
 import os
+import ast
+import json
+import base64
 import abc
 from abc import ABC, abstractmethod
 
@@ -12,7 +15,7 @@ class AbstractConnect(ABC):
         pass
 
     @abstractmethod
-    def connect(self, DEFAULT_MULTICAST_TTL=0, DEFAULT_MULTICAST_GROUP_ENDPOINT=('239.0.0.1', 6766), DEFAULT_MULTICAST_BIND_ADDRESS='0.0.0.0', DEFAULT_COMMAND_ENDPOINT=('127.0.0.1', 6776)):
+    def connect(self, DEFAULT_MULTICAST_TTL=0, DEFAULT_MULTICAST_GROUP_ENDPOINT=('239.0.0.1', 6766), DEFAULT_MULTICAST_BIND_ADDRESS='0.0.0.0', DEFAULT_COMMAND_ENDPOINT=('127.0.0.1', 6776), DEFAULT_COMMAND_TIMEOUT=None):
         pass
 
     @property
@@ -20,25 +23,33 @@ class AbstractConnect(ABC):
     def is_connect(self):
         pass
 
+    @abstractmethod
+    def set_command_timeout(self, command_timeout=None):
+        pass
+
     @abstractmethod
     def disconnect(self):
         pass
 
     @abstractmethod
-    def exec_script(self, script='ImportStaticMesh.py'):
+    def exec_script(self, script='ImportStaticMesh.py', concurrent=True, result_channel='SOCKET', args={}):
         pass
 
 class ConnectToUnrealEngine(AbstractConnect):
 
     _remote = REMOTE_EXEC
 
-    def connect(self, DEFAULT_MULTICAST_TTL=0, DEFAULT_MULTICAST_GROUP_ENDPOINT=('239.0.0.1', 6766), DEFAULT_MULTICAST_BIND_ADDRESS='0.0.0.0', DEFAULT_COMMAND_ENDPOINT=('127.0.0.1', 6776)):
-        self._remote.start(config=RemoteExecutionConfig(DEFAULT_MULTICAST_TTL=DEFAULT_MULTICAST_TTL, DEFAULT_MULTICAST_GROUP_ENDPOINT=DEFAULT_MULTICAST_GROUP_ENDPOINT, DEFAULT_MULTICAST_BIND_ADDRESS=DEFAULT_MULTICAST_BIND_ADDRESS, DEFAULT_COMMAND_ENDPOINT=DEFAULT_COMMAND_ENDPOINT))
+    def connect(self, DEFAULT_MULTICAST_TTL=0, DEFAULT_MULTICAST_GROUP_ENDPOINT=('239.0.0.1', 6766), DEFAULT_MULTICAST_BIND_ADDRESS='0.0.0.0', DEFAULT_COMMAND_ENDPOINT=('127.0.0.1', 6776), DEFAULT_COMMAND_TIMEOUT=None):
+        self._remote.start(config=RemoteExecutionConfig(DEFAULT_MULTICAST_TTL=DEFAULT_MULTICAST_TTL, DEFAULT_MULTICAST_GROUP_ENDPOINT=DEFAULT_MULTICAST_GROUP_ENDPOINT, DEFAULT_MULTICAST_BIND_ADDRESS=DEFAULT_MULTICAST_BIND_ADDRESS, DEFAULT_COMMAND_ENDPOINT=DEFAULT_COMMAND_ENDPOINT, DEFAULT_COMMAND_TIMEOUT=DEFAULT_COMMAND_TIMEOUT))
 
     @property
     def is_connect(self):
         return not (self._remote._broadcast_connection is None)
 
+    def set_command_timeout(self, command_timeout=None):
+        # apply to pooled connection on their next command, no need to reconnect
+        self._remote._config.command_timeout = command_timeout or None
+
     def disconnect(self):
         self._remote.stop()
 
@@ -46,13 +57,77 @@ class ConnectToUnrealEngine(AbstractConnect):
     def remote_nodes(self):
         return self._remote.remote_nodes
 
-    def exec_script(self, script='ImportStaticMesh.py'):
-        for node_id in [user['node_id'] for user in self._remote.remote_nodes]:
-            self._remote.open_command_connection(node_id)
-            script_path = os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'ue4_script', script)).replace(os.sep, '/')
-            addon_path = os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')).replace(os.sep, '/')
-            self._remote.run_command('exec(open("' + script_path + '").read(), {"addon_path": "' + addon_path + '", "node_id": "' + str(node_id) + '"})', exec_mode='ExecuteStatement')
-            self._remote.close_command_connection()
+    def exec_script(self, script='ImportStaticMesh.py', concurrent=True, result_channel='SOCKET', args={}):
+        # command connections stay open between calls, only drop the ones for nodes that are gone
+        self._remote.prune_command_connections()
+        script_path = os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'ue4_script', script)).replace(os.sep, '/')
+        addon_path = os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')).replace(os.sep, '/')
+        # evaluate the script so the "result" variable it set come back as the command result
+        commands = {node_id: '(lambda scope: exec(open("' + script_path + '").read(), scope) or scope.get("result"))({"addon_path": "' + addon_path + '", "node_id": "' + str(node_id) + '", "result_channel": "' + result_channel + '", "args": ' + repr(args) + '})' for node_id in [user['node_id'] for user in self._remote.remote_nodes]}
+
+        reports = self._remote.run_command_on_nodes(commands, exec_mode='EvaluateStatement', concurrent=concurrent)
+        for report in reports:
+            report['payload'] = self.decode_result(report['result']) if report['success'] else None
+        return reports
+
+    def exec_script_result(self, script, filename, result_channel='SOCKET', args={}):
+        if result_channel == 'FILE':
+            result_path = os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'temp', filename))
+
+            with open(result_path, 'w+') as file:
+                file.write(json.dumps([]))
+
+            # every node append to the same file, so run them one after another
+            reports = self.exec_script(script, concurrent=False, result_channel='FILE', args=args)
+
+            with open(result_path, 'r') as file:
+                rows = json.loads(file.read())
+        else:
+            reports = self.exec_script(script, result_channel='SOCKET', args=args)
+            rows = [row for report in reports if isinstance(report['payload'], list) for row in report['payload']]
+
+        return rows, reports
+
+    def send_file(self, folder, filename, data, chunk_size=4194304):
+        # file bytes go in the command as base64, unreal engine write them to its own temporary folder
+        reports = []
+        for offset in range(0, max(len(data), 1), chunk_size):
+            reports.extend(self.exec_script('ReceiveFile.py', args={
+                'folder': folder,
+                'filename': filename,
+                'offset': offset,
+                'data': base64.b64encode(data[offset:offset + chunk_size]).decode('ascii')
+            }))
+        return reports
+
+    @staticmethod
+    def decode_result(result):
+        # command result is the repr of the evaluated value, a json string set by the script
+        if not result or result == 'None':
+            return None
+        try:
+            value = json.loads(result)
+        except ValueError:
+            try:
+                value = ast.literal_eval(result)
+            except (ValueError, SyntaxError):
+                return None
+        if isinstance(value, str):
+            # script result can be a plain string, keep it as is
+            try:
+                return json.loads(value)
+            except ValueError:
+                return value
+        return value
+
+    @staticmethod
+    def failed_report(reports):
+        # operator report message, last line of the first failed node result is the error of the script
+        failed = [report for report in reports if not report['success']]
+        if not bool(failed):
+            return ''
+        error = str(failed[0]['result'] or 'no result').strip().splitlines()
+        return str(len(failed)) + ' of ' + str(len(reports)) + ' Unreal Engine node failed, ' + str(failed[0]['node_id']) + ': ' + (error[-1] if error else 'no result')
 
 remote = ConnectToUnrealEngine()
 skeletons = []
\ No newline at end of file
@@ -0,0 +1,237 @@
+import math
+from struct import pack
+import bpy
+from . import fbx_writer
+from . fbx_reader import read_fbx, get_value
+
+EXPORT_SCENE_NAME = 'UE4WorkspaceExport'
+# name of the user object while its copy export under its name
+EXPORT_PLACEHOLDER_NAME = 'UE4WorkspaceOriginal'
+
+def get_dependencies(obj, dependencies=None):
+    # parent, modifier object, constraint and driver target of the object, they are evaluated with it
+    if dependencies is None:
+        dependencies = [obj]
+
+    constraints = list(obj.constraints) + ([constraint for pose_bone in obj.pose.bones for constraint in pose_bone.constraints] if obj.pose else [])
+    targets = [obj.parent] + [getattr(modifier, 'object', None) for modifier in obj.modifiers]
+    for constraint in constraints:
+        targets.append(getattr(constraint, 'target', None))
+        # armature constraint has a list of target
+        targets.extend([target.target for target in getattr(constraint, 'targets', [])])
+
+    for id_data in [obj, obj.data]:
+        animation_data = getattr(id_data, 'animation_data', None)
+        if animation_data:
+            targets.extend([target.id for driver in animation_data.drivers for variable in driver.driver.variables for target in variable.targets])
+
+    for target in targets:
+        if isinstance(target, bpy.types.Object) and target not in dependencies:
+            dependencies.append(target)
+            get_dependencies(target, dependencies)
+
+    return dependencies
+
+def rename_fbx_objects(filepath, names, use_compression=True):
+    # names is {object name: name in the file}, only model and node attribute name are changed
+    elements = read_fbx(filepath, decode_arrays=False)
+    if elements is None:
+        return False
+
+    for element in elements:
+        if element.name != b'Objects':
+            continue
+        for child in element.children:
+            if child.name in [b'Model', b'NodeAttribute'] and len(child.props) > 1:
+                name, class_name = get_value(child.props[1]).split(b'\x00\x01')
+                new_name = names.get(name.decode('utf-8'))
+                if new_name is not None:
+                    value = new_name.encode('utf-8') + b'\x00\x01' + class_name
+                    child.props[1] = [b'S' + pack('<I', len(value)), value]
+
+    with open(filepath, 'wb') as file:
+        fbx_writer.write_elements(file, elements, use_compression)
+    return True
+
+class ExportScene:
+
+    def __init__(self, source_scene):
+        # throwaway scene, object copies are prepared here, user object only lend their name until clear
+        self.scene = bpy.data.scenes.new(EXPORT_SCENE_NAME)
+        self.scene.unit_settings.system = source_scene.unit_settings.system
+        self.scene.unit_settings.scale_length = source_scene.unit_settings.scale_length
+        self.scene.render.fps = source_scene.render.fps
+        self.scene.render.fps_base = source_scene.render.fps_base
+        self.scene.frame_start = source_scene.frame_start
+        self.scene.frame_end = source_scene.frame_end
+        self.view_layer = self.scene.view_layers[0]
+        self.objects = []
+        # original object linked to the scene, only unlinked on clear
+        self.linked_objects = []
+        # name of the copy in the exported file, the name in blender can be taken by the original
+        self.export_names = {}
+        # user object that gave its name to a copy, renamed back on clear
+        self.renamed_objects = []
+        self.active_object = None
+
+    def link(self, obj):
+        self.scene.collection.objects.link(obj)
+        obj.hide_select = False
+        obj.hide_viewport = False
+        obj.select_set(state=True, view_layer=self.view_layer)
+        self.objects.append(obj)
+        return obj
+
+    def copy_object(self, obj, parent=None, name=None):
+        obj_copy = obj.copy()
+        if parent is not None:
+            obj_copy.parent = parent
+        if name is not None:
+            self.take_name(obj_copy, name)
+        return self.link(obj_copy)
+
+    def take_name(self, obj, name):
+        # object that hold the name, usually the original of the copy, get a placeholder until clear
+        holder = bpy.data.objects.get(name)
+        if holder is not None and holder != obj and holder.library is None:
+            self.renamed_objects.append((holder, holder.name))
+            holder.name = EXPORT_PLACEHOLDER_NAME
+        obj.name = name
+        self.export_names[obj.as_pointer()] = name
+
+    def get_export_name(self, obj):
+        return self.export_names.get(obj.as_pointer(), obj.name)
+
+    def get_renames(self):
+        # copy that still could not take its export name, name of a linked library object or too long for blender
+        return {obj.name: self.get_export_name(obj) for obj in self.objects if obj.name != self.get_export_name(obj)}
+
+    def link_original(self, obj):
+        if obj.name not in self.scene.collection.objects:
+            self.scene.collection.objects.link(obj)
+            self.linked_objects.append(obj)
+        return obj
+
+    def add_armature(self, obj):
+        # the armature itself is linked, action and pose are still the one of the user scene
+        # every frame of the bake only evaluate the armature and what it depend on
+        for dependency in get_dependencies(obj)[1:]:
+            self.link_original(dependency)
+
+        self.link_original(obj).select_set(state=True, view_layer=self.view_layer)
+        self.active_object = obj
+        return obj
+
+    def add_skeletal_mesh(self, obj, mesh_objects):
+        # armature and its meshes are linked as they are, only what the export need is evaluated
+        for dependency in get_dependencies(obj)[1:] + [dependency for mesh_object in mesh_objects for dependency in get_dependencies(mesh_object)[1:]]:
+            self.link_original(dependency)
+
+        for linked_object in [obj] + mesh_objects:
+            self.link_original(linked_object)
+        self.select_only([obj] + mesh_objects)
+        self.active_object = obj
+        return obj
+
+    def select_only(self, objects):
+        for linked_object in self.linked_objects:
+            linked_object.select_set(state=(linked_object in objects), view_layer=self.view_layer)
+
+    def add_static_mesh(self, obj, origin='OBJECT', apply_rotation=True):
+        # the original get a placeholder name until clear, the copy export under the real name
+        proxy = self.copy_object(obj, name=obj.name)
+
+        constraint = proxy.constraints.get('attach_to')
+        if constraint:
+            proxy.constraints.remove(constraint)
+
+        if origin == 'OBJECT':
+            proxy.matrix_world.translation = (0, 0, 0)
+
+        if not apply_rotation:
+            if proxy.rotation_mode == 'QUATERNION':
+                proxy.rotation_quaternion = (1, 0, 0, 0)
+            else:
+                proxy.rotation_euler = (0, 0, 0)
+
+        self.active_object = proxy
+        return proxy
+
+    def add_custom_collision(self, proxy, collision_objects):
+        base_collision_name = 'UCX_' + self.get_export_name(proxy) + '_'
+        for index, collision_object in enumerate(collision_objects, start=1):
+            self.copy_object(collision_object, parent=proxy, name=(base_collision_name + ('0' if index <= 9 else '') + str(index)))
+
+    def add_socket(self, proxy, socket_objects):
+        for socket_object in socket_objects:
+            socket_copy = self.copy_object(socket_object, parent=proxy, name=('SOCKET_' + socket_object.name))
+            socket_copy.scale /= 100
+            socket_copy.rotation_euler.x += math.radians(90)
+
+    def add_lod(self, proxy, lods_data):
+        if not bool(lods_data):
+            return
+
+        lod_parent = bpy.data.objects.new('LOD_' + self.get_export_name(proxy), None)
+        self.take_name(lod_parent, 'LOD_' + self.get_export_name(proxy))
+        self.link(lod_parent)
+        lod_parent.matrix_world.translation = proxy.matrix_world.translation
+        lod_parent.empty_display_size = 2
+        lod_parent.empty_display_type = 'ARROWS'
+        lod_parent['fbx_type'] = 'LodGroup'
+
+        # without other parent, proxy world matrix under the lod group is its basis, no view layer update needed
+        proxy.parent = lod_parent
+        proxy.matrix_parent_inverse = lod_parent.matrix_world.inverted()
+
+        for lod_obj, screen_size in lods_data:
+            lod_obj_copy = self.copy_object(lod_obj, parent=lod_parent)
+            lod_obj_copy.matrix_world = proxy.matrix_basis.copy()
+
+    def context_override(self):
+        return {
+            'scene': self.scene,
+            'view_layer': self.view_layer,
+            'selected_objects': list(self.objects) + [obj for obj in self.linked_objects if obj.select_get(view_layer=self.view_layer)],
+            'active_object': self.active_object,
+            'object': self.active_object
+        }
+
+    def export(self, export_operator, export_setting):
+        override = self.context_override()
+        if hasattr(bpy.context, 'temp_override'):
+            with bpy.context.temp_override(**override):
+                result = export_operator(**export_setting)
+        else:
+            result = export_operator(override, **export_setting)
+
+        # fallback, rewrite the file only when a copy could not take its name
+        renames = self.get_renames()
+        if renames and 'FINISHED' in result:
+            rename_fbx_objects(export_setting['filepath'], renames)
+        return result
+
+    def write_fbx(self, **export_setting):
+        # evaluate once, the writer read evaluated mesh and matrix of the temporary scene
+        self.view_layer.update()
+        return fbx_writer.write_fbx(self.objects, self.scene, self.view_layer.depsgraph, names=self.get_renames(), **export_setting)
+
+    def clear(self):
+        for obj in self.objects:
+            bpy.data.objects.remove(obj, do_unlink=True)
+        self.objects = []
+        self.export_names = {}
+        self.active_object = None
+
+        # copy are removed, the name is free again
+        for obj, name in reversed(self.renamed_objects):
+            obj.name = name
+        self.renamed_objects = []
+
+        for obj in self.linked_objects:
+            self.scene.collection.objects.unlink(obj)
+        self.linked_objects = []
+
+    def remove(self):
+        self.clear()
+        bpy.data.scenes.remove(self.scene, do_unlink=True)
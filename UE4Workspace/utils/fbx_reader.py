@@ -0,0 +1,87 @@
+import zlib
+from struct import unpack, calcsize
+import numpy as np
+from . fbx_writer import FBXElement, FBXArray, FBX_HEADER_MAGIC
+
+# only 32 bit offset file, what blender fbx exporter write
+FBX_MAX_VERSION = 7499
+
+SCALAR_FORMATS = {b'Y': '<h', b'C': '<?', b'I': '<i', b'F': '<f', b'D': '<d', b'L': '<q'}
+ARRAY_DTYPES = {b'f': np.float32, b'd': np.float64, b'l': np.int64, b'i': np.int32, b'b': np.bool_}
+
+def read_prop(data, offset, decode_arrays=True):
+    type_code = data[offset:offset + 1]
+    if type_code in SCALAR_FORMATS:
+        end = offset + 1 + calcsize(SCALAR_FORMATS[type_code])
+        return [data[offset:end]], end
+    if type_code in [b'S', b'R']:
+        length, = unpack('<I', data[offset + 1:offset + 5])
+        end = offset + 5 + length
+        return [data[offset:offset + 5], data[offset + 5:end]], end
+    if type_code in ARRAY_DTYPES:
+        length, encoding, compressed_length = unpack('<3I', data[offset + 1:offset + 13])
+        end = offset + 13 + compressed_length
+        if not decode_arrays:
+            # written back as it is, array that is not changed does not need zlib
+            return [data[offset:end]], end
+        array_data = data[offset + 13:end]
+        if encoding == 1:
+            array_data = zlib.decompress(array_data)
+        return FBXArray(np.frombuffer(array_data, dtype=ARRAY_DTYPES[type_code], count=length)), end
+    raise ValueError('Unknown FBX property type ' + repr(type_code))
+
+def read_element(data, offset, decode_arrays=True):
+    end_offset, num_props, props_length, name_length = unpack('<3IB', data[offset:offset + 13])
+    if end_offset == 0:
+        return None, offset + 13
+
+    offset += 13
+    element = FBXElement(data[offset:offset + name_length].decode('utf-8'))
+    offset += name_length
+
+    for _ in range(num_props):
+        prop, offset = read_prop(data, offset, decode_arrays)
+        element.props.append(prop)
+        if isinstance(prop, FBXArray):
+            element.arrays.append(prop)
+
+    element.null_record = offset < end_offset
+    while offset < end_offset:
+        child, offset = read_element(data, offset, decode_arrays)
+        if child is not None:
+            element.children.append(child)
+
+    return element, end_offset
+
+def read_fbx(filepath, decode_arrays=True):
+    # return top level elements, None when the file is not a binary fbx this can write back
+    with open(filepath, 'rb') as file:
+        data = file.read()
+
+    if not data.startswith(FBX_HEADER_MAGIC) or unpack('<I', data[23:27])[0] > FBX_MAX_VERSION:
+        return None
+
+    elements = []
+    offset = 27
+    while True:
+        element, offset = read_element(data, offset, decode_arrays)
+        if element is None:
+            return elements
+        elements.append(element)
+
+def get_value(prop):
+    # scalar or string property of a read element
+    type_code = prop[0][:1]
+    if type_code in SCALAR_FORMATS:
+        return unpack(SCALAR_FORMATS[type_code], prop[0][1:])[0]
+    return prop[1]
+
+def get_array(element):
+    return element.props[0].array
+
+def find_child(element, name):
+    name = name.encode('utf-8')
+    for child in element.children:
+        if child.name == name:
+            return child
+    return None
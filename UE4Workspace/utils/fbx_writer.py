@@ -0,0 +1,490 @@
+import os
+import math
+import zlib
+from struct import pack
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from mathutils import Matrix
+from bpy_extras.io_utils import axis_conversion
+
+FBX_VERSION = 7400
+FBX_HEADER_MAGIC = b'Kaydara FBX Binary  \x00\x1a\x00'
+# fixed creation time and file id, fbx sdk check them against the footer id
+FBX_TIME_ID = '1970-01-01 10:00:00:000'
+FBX_FILE_ID = b'\x28\xb3\x2a\xeb\xb6\x24\xcc\xc2\xbf\xc8\xb0\x2a\xa9\x2b\xfc\xf1'
+FBX_FOOTER_ID = b'\xfa\xbc\xab\x09\xd0\xc8\xd4\x66\xb1\x76\xfb\x83\x1c\xf7\x26\x7e'
+FBX_FOOTER_MAGIC = b'\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b'
+FBX_NULL_RECORD = b'\x00' * 13
+
+FBX_MODEL_VERSION = 232
+FBX_GEOMETRY_VERSION = 124
+
+# small array is not worth to compress, low level because the writer is limited by zlib
+ARRAY_COMPRESS_THRESHOLD = 128
+ARRAY_COMPRESS_LEVEL = 1
+
+AXIS_INDEX = {'X': 0, 'Y': 1, 'Z': 2}
+
+ARRAY_TYPE_CODES = {
+    np.dtype(np.float64): b'd',
+    np.dtype(np.float32): b'f',
+    np.dtype(np.int64): b'l',
+    np.dtype(np.int32): b'i',
+    np.dtype(np.bool_): b'b'
+}
+
+class FBXArray:
+
+    def __init__(self, array):
+        self.array = np.ascontiguousarray(array)
+        self.type_code = ARRAY_TYPE_CODES[self.array.dtype]
+        self.chunks = None
+
+    def encode(self, use_compression=True):
+        data = self.array.data.cast('B')
+        encoding = 0
+        if use_compression and data.nbytes > ARRAY_COMPRESS_THRESHOLD:
+            data = zlib.compress(data, ARRAY_COMPRESS_LEVEL)
+            encoding = 1
+        self.chunks = [self.type_code + pack('<3I', self.array.size, encoding, len(data)), data]
+        self.array = None
+
+class FBXElement:
+
+    def __init__(self, name, *values):
+        self.name = name.encode('utf-8')
+        self.props = []
+        self.arrays = []
+        self.children = []
+        # None follow the usual rule, a read element keep what the file had
+        self.null_record = None
+        for value in values:
+            self.add(value)
+
+    def add(self, value):
+        # int is written as 32 bit, use add_int64 for object id
+        if isinstance(value, bool):
+            self.props.append([b'C' + pack('<?', value)])
+        elif isinstance(value, int):
+            self.props.append([b'I' + pack('<i', value)])
+        elif isinstance(value, float):
+            self.props.append([b'D' + pack('<d', value)])
+        elif isinstance(value, str):
+            self.add_bytes(value.encode('utf-8'), b'S')
+        elif isinstance(value, bytes):
+            self.add_bytes(value, b'R')
+        elif isinstance(value, np.ndarray):
+            array = FBXArray(value)
+            self.arrays.append(array)
+            self.props.append(array)
+        else:
+            raise TypeError('Unsupported FBX property ' + repr(value))
+        return self
+
+    def add_int64(self, value):
+        self.props.append([b'L' + pack('<q', value)])
+        return self
+
+    def add_bytes(self, value, type_code=b'R'):
+        self.props.append([type_code + pack('<I', len(value)), value])
+        return self
+
+    def add_name_class(self, name, class_name):
+        # binary fbx separate object name and class with \x00\x01
+        return self.add_bytes(name.encode('utf-8') + b'\x00\x01' + class_name.encode('utf-8'), b'S')
+
+    def child(self, name, *values):
+        element = FBXElement(name, *values)
+        self.children.append(element)
+        return element
+
+    def iter_arrays(self):
+        yield from self.arrays
+        for child in self.children:
+            yield from child.iter_arrays()
+
+    def prop_chunks(self, prop):
+        return prop.chunks if isinstance(prop, FBXArray) else prop
+
+    def props_length(self):
+        return sum([len(chunk) for prop in self.props for chunk in self.prop_chunks(prop)])
+
+    def has_null_record(self):
+        if self.null_record is not None:
+            return self.null_record
+        return bool(self.children) or not bool(self.props)
+
+    def size(self):
+        size = 13 + len(self.name) + self.props_length()
+        if self.has_null_record():
+            size += sum([child.size() for child in self.children]) + len(FBX_NULL_RECORD)
+        return size
+
+    def write(self, file, offset):
+        props_length = self.props_length()
+        file.write(pack('<3IB', offset + self.size(), len(self.props), props_length, len(self.name)))
+        file.write(self.name)
+        for prop in self.props:
+            for chunk in self.prop_chunks(prop):
+                file.write(chunk)
+
+        if self.has_null_record():
+            offset += 13 + len(self.name) + props_length
+            for child in self.children:
+                child.write(file, offset)
+                offset += child.size()
+            file.write(FBX_NULL_RECORD)
+
+def add_properties(element):
+    return element.child('Properties70')
+
+def add_property(properties, name, type_name, label, flags, *values):
+    return properties.child('P', name, type_name, label, flags, *values)
+
+def add_custom_properties(properties, obj):
+    for key in obj.keys():
+        if key.startswith('_') or key == 'fbx_type':
+            continue
+        value = obj[key]
+        if isinstance(value, bool):
+            add_property(properties, key, 'bool', '', 'U', int(value))
+        elif isinstance(value, int):
+            add_property(properties, key, 'int', 'Integer', 'U', value)
+        elif isinstance(value, float):
+            add_property(properties, key, 'double', 'Number', 'U', value)
+        elif isinstance(value, str):
+            add_property(properties, key, 'KString', '', 'U', value)
+
+def foreach_get(collection, prop, size=1, dtype=np.float32):
+    data = np.empty(len(collection) * size, dtype=dtype)
+    if len(collection):
+        collection.foreach_get(prop, data)
+    return data
+
+def is_supported(export_setting):
+    # anything the writer does not handle go to the stock exporter
+    return (
+        export_setting.get('axis_forward', '-Z')[-1] != export_setting.get('axis_up', 'Y')[-1] and
+        not export_setting.get('bake_space_transform', False) and
+        not export_setting.get('use_tspace', False) and
+        not export_setting.get('use_subsurf', False) and
+        not export_setting.get('use_mesh_edges', False) and
+        not export_setting.get('bake_anim', False) and
+        set(export_setting.get('object_types', {'MESH', 'EMPTY'})) <= {'MESH', 'EMPTY'}
+    )
+
+def get_unit_scale(scene, global_scale, apply_unit_scale):
+    # same as stock exporter with all local scaling, scale go to root object transform and fbx unit stay centimeter
+    unit_scale = (1.0 if scene.unit_settings.system == 'NONE' else 100.0 * scene.unit_settings.scale_length) if apply_unit_scale else 100.0
+    return unit_scale * global_scale
+
+def get_axis_settings(axis_forward, axis_up):
+    # (axis, sign) of fbx up, front and coord axis, same as RIGHT_HAND_AXES of the stock exporter
+    # front sign is the opposite of forward, coord sign keep the axis system right handed
+    up = (AXIS_INDEX[axis_up[-1]], -1 if axis_up.startswith('-') else 1)
+    front = (AXIS_INDEX[axis_forward[-1]], 1 if axis_forward.startswith('-') else -1)
+    coord_index = 3 - up[0] - front[0]
+    identity = np.identity(3)
+    determinant = np.linalg.det([identity[up[0]] * up[1], identity[front[0]] * front[1], identity[coord_index]])
+    return up, front, (coord_index, 1 if determinant > 0 else -1)
+
+class FBXWriter:
+
+    def __init__(self, scene, depsgraph, global_scale=1.0, apply_unit_scale=True, axis_forward='-Z', axis_up='Y', mesh_smooth_type='OFF', use_mesh_modifiers=True, use_custom_props=False, names=None):
+        self.scene = scene
+        # like the stock exporter without bake space transform, mesh data stay in blender space and root objects carry the axis conversion
+        self.axis_matrix = axis_conversion(to_forward=axis_forward, to_up=axis_up).to_4x4()
+        self.axis_settings = get_axis_settings(axis_forward, axis_up)
+        # {object name: name in the file}
+        self.names = names or {}
+        self.depsgraph = depsgraph
+        self.unit_scale = get_unit_scale(scene, global_scale, apply_unit_scale)
+        self.mesh_smooth_type = mesh_smooth_type
+        self.use_mesh_modifiers = use_mesh_modifiers
+        self.use_custom_props = use_custom_props
+
+        self.last_id = 1000000
+        self.objects = FBXElement('Objects')
+        self.connections = FBXElement('Connections')
+        self.materials = {}
+        self.counts = {'Model': 0, 'Geometry': 0, 'Material': 0, 'NodeAttribute': 0}
+
+    def create_id(self):
+        self.last_id += 1
+        return self.last_id
+
+    def connect(self, child_id, parent_id):
+        self.connections.child('C', 'OO').add_int64(child_id).add_int64(parent_id)
+
+    def get_local_matrix(self, obj, obj_eval, object_pointers):
+        if obj.parent is not None and obj.parent.as_pointer() in object_pointers:
+            return obj.parent.evaluated_get(self.depsgraph).matrix_world.inverted() @ obj_eval.matrix_world
+        return Matrix.Scale(self.unit_scale, 4) @ self.axis_matrix @ obj_eval.matrix_world
+
+    def get_name(self, obj):
+        return self.names.get(obj.name, obj.name)
+
+    def add_model(self, obj, obj_eval, model_type, local_matrix):
+        model_id = self.create_id()
+        model = self.objects.child('Model').add_int64(model_id).add_name_class(self.get_name(obj), 'Model').add(model_type)
+        model.child('Version', FBX_MODEL_VERSION)
+
+        location, rotation, scale = local_matrix.decompose()
+        properties = add_properties(model)
+        add_property(properties, 'Lcl Translation', 'Lcl Translation', '', 'A', *[float(value) for value in location])
+        add_property(properties, 'Lcl Rotation', 'Lcl Rotation', '', 'A', *[math.degrees(value) for value in rotation.to_euler('XYZ')])
+        add_property(properties, 'Lcl Scaling', 'Lcl Scaling', '', 'A', *[float(value) for value in scale])
+        add_property(properties, 'DefaultAttributeIndex', 'int', 'Integer', '', 0)
+        add_property(properties, 'InheritType', 'enum', '', '', 1)
+        if self.use_custom_props:
+            add_custom_properties(properties, obj)
+
+        model.child('MultiLayer', 0)
+        model.child('MultiTake', 0)
+        model.child('Shading', True)
+        model.child('Culling', 'CullingOff')
+
+        self.counts['Model'] += 1
+        return model_id
+
+    def add_material(self, material):
+        key = material.as_pointer() if material is not None else 0
+        if key not in self.materials:
+            material_id = self.create_id()
+            element = self.objects.child('Material').add_int64(material_id).add_name_class(material.name if material is not None else 'DefaultMaterial', 'Material').add('')
+            element.child('Version', 102)
+            element.child('ShadingModel', 'Phong')
+            element.child('MultiLayer', 0)
+            properties = add_properties(element)
+            diffuse_color = list(material.diffuse_color)[:3] if material is not None else [0.8, 0.8, 0.8]
+            add_property(properties, 'DiffuseColor', 'Color', '', 'A', *[float(value) for value in diffuse_color])
+            add_property(properties, 'Opacity', 'double', 'Number', '', 1.0)
+            self.materials[key] = material_id
+            self.counts['Material'] += 1
+        return self.materials[key]
+
+    def add_empty(self, obj, model_id):
+        attribute_id = self.create_id()
+        attribute_type = str(obj.get('fbx_type', 'Null'))
+        attribute = self.objects.child('NodeAttribute').add_int64(attribute_id).add_name_class(self.get_name(obj), 'NodeAttribute').add(attribute_type)
+        attribute.child('TypeFlags', attribute_type)
+        add_properties(attribute)
+        self.connect(attribute_id, model_id)
+        self.counts['NodeAttribute'] += 1
+
+    def add_mesh(self, obj, obj_eval, model_id):
+        mesh_owner = obj_eval if self.use_mesh_modifiers else obj
+        mesh = mesh_owner.to_mesh()
+        try:
+            geometry_id = self.create_id()
+            geometry = self.objects.child('Geometry').add_int64(geometry_id).add_name_class(obj.data.name, 'Geometry').add('Mesh')
+            add_properties(geometry)
+            geometry.child('GeometryVersion', FBX_GEOMETRY_VERSION)
+
+            geometry.child('Vertices', foreach_get(mesh.vertices, 'co', 3).astype(np.float64))
+
+            loop_start = foreach_get(mesh.polygons, 'loop_start', 1, np.int32)
+            loop_total = foreach_get(mesh.polygons, 'loop_total', 1, np.int32)
+            # last vertex of every polygon is stored as bitwise not
+            polygon_vertex_index = foreach_get(mesh.loops, 'vertex_index', 1, np.int32)
+            if len(loop_start):
+                polygon_last_loop = loop_start + loop_total - 1
+                polygon_vertex_index[polygon_last_loop] = ~polygon_vertex_index[polygon_last_loop]
+            geometry.child('PolygonVertexIndex', polygon_vertex_index)
+
+            layers = []
+
+            if hasattr(mesh, 'corner_normals'):
+                normals = foreach_get(mesh.corner_normals, 'vector', 3)
+            else:
+                mesh.calc_normals_split()
+                normals = foreach_get(mesh.loops, 'normal', 3)
+            layer_element = geometry.child('LayerElementNormal', 0)
+            layer_element.child('Version', 101)
+            layer_element.child('Name', '')
+            layer_element.child('MappingInformationType', 'ByPolygonVertex')
+            layer_element.child('ReferenceInformationType', 'Direct')
+            layer_element.child('Normals', normals.astype(np.float64))
+            layers.append((0, 'LayerElementNormal'))
+
+            if self.mesh_smooth_type == 'FACE':
+                layer_element = geometry.child('LayerElementSmoothing', 0)
+                layer_element.child('Version', 102)
+                layer_element.child('Name', '')
+                layer_element.child('MappingInformationType', 'ByPolygon')
+                layer_element.child('ReferenceInformationType', 'Direct')
+                layer_element.child('Smoothing', foreach_get(mesh.polygons, 'use_smooth', 1, bool).astype(np.int32))
+                layers.append((0, 'LayerElementSmoothing'))
+            elif self.mesh_smooth_type == 'EDGE':
+                # fbx edge is the polygon vertex index of the first loop that use the edge
+                edge_indices, edge_first_loop = np.unique(foreach_get(mesh.loops, 'edge_index', 1, np.int32), return_index=True)
+                geometry.child('Edges', edge_first_loop.astype(np.int32))
+                layer_element = geometry.child('LayerElementSmoothing', 0)
+                layer_element.child('Version', 102)
+                layer_element.child('Name', '')
+                layer_element.child('MappingInformationType', 'ByEdge')
+                layer_element.child('ReferenceInformationType', 'Direct')
+                layer_element.child('Smoothing', np.logical_not(foreach_get(mesh.edges, 'use_edge_sharp', 1, bool)[edge_indices]).astype(np.int32))
+                layers.append((0, 'LayerElementSmoothing'))
+
+            for index, vertex_color in enumerate(getattr(mesh, 'vertex_colors', [])):
+                layer_element = geometry.child('LayerElementColor', index)
+                layer_element.child('Version', 101)
+                layer_element.child('Name', vertex_color.name)
+                layer_element.child('MappingInformationType', 'ByPolygonVertex')
+                layer_element.child('ReferenceInformationType', 'IndexToDirect')
+                layer_element.child('Colors', foreach_get(vertex_color.data, 'color', 4).astype(np.float64))
+                layer_element.child('ColorIndex', np.arange(len(mesh.loops), dtype=np.int32))
+                layers.append((index, 'LayerElementColor'))
+
+            for index, uv_layer in enumerate(mesh.uv_layers):
+                layer_element = geometry.child('LayerElementUV', index)
+                layer_element.child('Version', 101)
+                layer_element.child('Name', uv_layer.name)
+                layer_element.child('MappingInformationType', 'ByPolygonVertex')
+                layer_element.child('ReferenceInformationType', 'IndexToDirect')
+                layer_element.child('UV', foreach_get(uv_layer.data, 'uv', 2).astype(np.float64))
+                layer_element.child('UVIndex', np.arange(len(mesh.loops), dtype=np.int32))
+                layers.append((index, 'LayerElementUV'))
+
+            materials = [material_slot.material for material_slot in obj_eval.material_slots]
+            if bool(materials):
+                # same material on many slot is connected once, polygon index follow the connection order
+                material_ids = []
+                slot_indices = []
+                for material in materials:
+                    material_id = self.add_material(material)
+                    if material_id not in material_ids:
+                        material_ids.append(material_id)
+                    slot_indices.append(material_ids.index(material_id))
+
+                polygon_material_index = foreach_get(mesh.polygons, 'material_index', 1, np.int32)
+                polygon_material_index = np.array(slot_indices, dtype=np.int32)[np.clip(polygon_material_index, 0, len(slot_indices) - 1)]
+
+                layer_element = geometry.child('LayerElementMaterial', 0)
+                layer_element.child('Version', 101)
+                layer_element.child('Name', '')
+                layer_element.child('MappingInformationType', 'ByPolygon')
+                layer_element.child('ReferenceInformationType', 'IndexToDirect')
+                layer_element.child('Materials', polygon_material_index)
+                layers.append((0, 'LayerElementMaterial'))
+
+                for material_id in material_ids:
+                    self.connect(material_id, model_id)
+
+            for layer_index in sorted(set([layer_index for layer_index, layer_type in layers])):
+                layer = geometry.child('Layer', layer_index)
+                layer.child('Version', 100)
+                for typed_index, layer_type in layers:
+                    if typed_index == layer_index:
+                        layer_element = layer.child('LayerElement')
+                        layer_element.child('Type', layer_type)
+                        layer_element.child('TypedIndex', typed_index)
+
+            self.connect(geometry_id, model_id)
+            self.counts['Geometry'] += 1
+        finally:
+            mesh_owner.to_mesh_clear()
+
+    def add_objects(self, objects):
+        objects = [obj for obj in objects if obj.type in ['MESH', 'EMPTY']]
+        object_pointers = set([obj.as_pointer() for obj in objects])
+        model_ids = {}
+
+        for obj in objects:
+            obj_eval = obj.evaluated_get(self.depsgraph)
+            model_ids[obj.as_pointer()] = self.add_model(obj, obj_eval, ('Mesh' if obj.type == 'MESH' else 'Null'), self.get_local_matrix(obj, obj_eval, object_pointers))
+
+        # parent connection first so children order stay the same as object order, lod group read it as lod index
+        for obj in objects:
+            parent_pointer = obj.parent.as_pointer() if obj.parent is not None else 0
+            self.connect(model_ids[obj.as_pointer()], model_ids.get(parent_pointer, 0))
+
+        for obj in objects:
+            if obj.type == 'MESH':
+                self.add_mesh(obj, obj.evaluated_get(self.depsgraph), model_ids[obj.as_pointer()])
+            else:
+                self.add_empty(obj, model_ids[obj.as_pointer()])
+
+    def create_header_elements(self):
+        header = FBXElement('FBXHeaderExtension')
+        header.child('FBXHeaderVersion', 1003)
+        header.child('FBXVersion', FBX_VERSION)
+        header.child('EncryptionType', 0)
+        header.child('Creator', 'UE4Workspace FBX Writer')
+
+        global_settings = FBXElement('GlobalSettings')
+        global_settings.child('Version', 1000)
+        properties = add_properties(global_settings)
+        # axis of the converted root transform, same value as the stock exporter
+        (up_axis, up_sign), (front_axis, front_sign), (coord_axis, coord_sign) = self.axis_settings
+        for name, value in [('UpAxis', up_axis), ('UpAxisSign', up_sign), ('FrontAxis', front_axis), ('FrontAxisSign', front_sign), ('CoordAxis', coord_axis), ('CoordAxisSign', coord_sign), ('OriginalUpAxis', -1), ('OriginalUpAxisSign', 1)]:
+            add_property(properties, name, 'int', 'Integer', '', value)
+        add_property(properties, 'UnitScaleFactor', 'double', 'Number', '', 1.0)
+        add_property(properties, 'OriginalUnitScaleFactor', 'double', 'Number', '', 1.0)
+
+        documents = FBXElement('Documents')
+        documents.child('Count', 1)
+        document = documents.child('Document').add_int64(self.create_id()).add('').add('Scene')
+        add_properties(document)
+        document.child('RootNode').add_int64(0)
+
+        definitions = FBXElement('Definitions')
+        definitions.child('Version', 100)
+        counts = [('GlobalSettings', 1)] + [(object_type, count) for object_type, count in self.counts.items() if count]
+        definitions.child('Count', sum([count for object_type, count in counts]))
+        for object_type, count in counts:
+            definitions.child('ObjectType', object_type).child('Count', count)
+
+        return [
+            header,
+            FBXElement('FileId', FBX_FILE_ID),
+            FBXElement('CreationTime', FBX_TIME_ID),
+            FBXElement('Creator', 'UE4Workspace FBX Writer'),
+            global_settings,
+            documents,
+            FBXElement('References'),
+            definitions
+        ]
+
+    def write(self, filepath, use_compression=True):
+        # filepath can be a file object, fbx sent over the command socket stay in memory
+        if hasattr(filepath, 'write'):
+            return self.write_file(filepath, use_compression)
+        with open(filepath, 'wb') as file:
+            return self.write_file(file, use_compression)
+
+    def write_file(self, file, use_compression=True):
+        write_elements(file, self.create_header_elements() + [self.objects, self.connections], use_compression)
+
+def write_elements(file, elements, use_compression=True):
+    # zlib release the gil, compress every array on all core before write
+    arrays = [array for element in elements for array in element.iter_arrays()]
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        list(executor.map(lambda array: array.encode(use_compression), arrays))
+
+    file.write(FBX_HEADER_MAGIC)
+    file.write(pack('<I', FBX_VERSION))
+
+    offset = file.tell()
+    for element in elements:
+        element.write(file, offset)
+        offset += element.size()
+    file.write(FBX_NULL_RECORD)
+
+    file.write(FBX_FOOTER_ID)
+    file.write(b'\x00' * 4)
+    # footer is aligned to 16 byte, full 16 byte when already aligned
+    padding = ((file.tell() + 15) & ~15) - file.tell()
+    file.write(b'\x00' * (padding or 16))
+    file.write(pack('<I', FBX_VERSION))
+    file.write(b'\x00' * 120)
+    file.write(FBX_FOOTER_MAGIC)
+
+def write_fbx(objects, scene, depsgraph, filepath, global_scale=1.0, apply_unit_scale=True, axis_forward='-Z', axis_up='Y', mesh_smooth_type='OFF', use_mesh_modifiers=True, use_custom_props=False, use_compression=True, file=None, names=None, **kwargs):
+    # accept the same keyword as bpy.ops.export_scene.fbx, unsupported one is checked by is_supported
+    # compression make smaller file but take most of the write time, temporary file for unreal engine does not need it
+    writer = FBXWriter(scene, depsgraph, global_scale=global_scale, apply_unit_scale=apply_unit_scale, axis_forward=axis_forward, axis_up=axis_up, mesh_smooth_type=mesh_smooth_type, use_mesh_modifiers=use_mesh_modifiers, use_custom_props=use_custom_props, names=names)
+    writer.add_objects(objects)
+    writer.write(filepath if file is None else file, use_compression=use_compression)
+    return {'FINISHED'}
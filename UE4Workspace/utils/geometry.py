@@ -0,0 +1,204 @@
+import itertools
+import numpy as np
+import bmesh
+
+# face, edge and corner direction of a cube, extreme point along them span the prefilter polytope
+HULL_DIRECTIONS = np.array([direction for direction in itertools.product([-1.0, 0.0, 1.0], repeat=3) if any(direction)])
+VOXEL_CORNERS = np.array(list(itertools.product([0.0, 1.0], repeat=3)))
+
+def get_vertices_co(mesh, selected_only=False):
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get('co', co)
+    co = co.reshape(-1, 3)
+
+    if selected_only:
+        select = np.empty(len(mesh.vertices), dtype=bool)
+        mesh.vertices.foreach_get('select', select)
+        co = co[select]
+
+    return co
+
+def get_extreme_points(points):
+    return points[np.unique(np.argmax(points @ HULL_DIRECTIONS.T, axis=0))]
+
+def get_polytope_planes(points):
+    # small convex hull of the extreme points, plane normal point outward
+    bm = bmesh.new()
+    for point in points:
+        bm.verts.new(point)
+    bmesh.ops.convex_hull(bm, input=bm.verts)
+    bm.normal_update()
+
+    centroid = points.mean(axis=0)
+    normals = []
+    offsets = []
+    for face in bm.faces:
+        normal = np.array(face.normal)
+        center = np.array(face.calc_center_median())
+        if normal.dot(center - centroid) < 0:
+            normal = -normal
+        normals.append(normal)
+        offsets.append(normal.dot(center))
+    bm.free()
+
+    return np.array(normals).reshape(-1, 3), np.array(offsets)
+
+def remove_interior_points(points, normals, offsets, tolerance=1e-6):
+    # point strictly inside every plane can not be on the hull
+    if not len(normals):
+        return points
+    distances = points @ normals.T - offsets
+    return points[np.any(distances >= -tolerance, axis=1)]
+
+def reduce_hull_points(points, min_points=64):
+    # akl-toussaint heuristic, drop point inside the polytope of the extreme points before the real convex hull
+    points = np.unique(points, axis=0)
+    if len(points) <= min_points:
+        return points
+
+    extreme_points = get_extreme_points(points)
+    if len(extreme_points) < 4:
+        return points
+
+    normals, offsets = get_polytope_planes(extreme_points)
+    # tolerance follow the size of the mesh
+    tolerance = 1e-6 * max(float(np.ptp(points, axis=0).max()), 1.0)
+    return remove_interior_points(points, normals, offsets, tolerance)
+
+def create_convex_hull(points):
+    # bmesh with only the hull, interior and unused vertex removed
+    bm = bmesh.new()
+    for point in points:
+        bm.verts.new(point)
+    result = bmesh.ops.convex_hull(bm, input=bm.verts)
+    bmesh.ops.delete(bm, geom=list(set(result['geom_interior'] + result['geom_unused'])), context='VERTS')
+    return bm
+
+def get_convex_hull_volume(points):
+    if len(points) < 4:
+        return 0.0
+    bm = create_convex_hull(points)
+    volume = abs(bm.calc_volume())
+    bm.free()
+    return volume
+
+def get_mesh_triangles(mesh):
+    mesh.calc_loop_triangles()
+    triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get('vertices', triangles)
+    return triangles.reshape(-1, 3)
+
+def sample_triangles(points, triangles, spacing, max_subdivision=64):
+    # barycentric grid on every triangle, denser than the voxel so no voxel on the surface is missed
+    corners = points[triangles]
+    edge_length = np.linalg.norm(corners - np.roll(corners, 1, axis=1), axis=2).max(axis=1)
+    subdivisions = np.clip(np.ceil(edge_length / spacing), 1, max_subdivision).astype(np.int32)
+
+    samples = [points]
+    for subdivision in np.unique(subdivisions):
+        weights = np.array([(i, j, subdivision - i - j) for i in range(subdivision + 1) for j in range(subdivision + 1 - i)], dtype=np.float64) / subdivision
+        samples.append(np.einsum('wk,tkc->twc', weights, corners[subdivisions == subdivision]).reshape(-1, 3))
+    return np.concatenate(samples)
+
+def fill_voxels(surface):
+    # flood fill the outside from the padded border, everything else is solid, open mesh only keep the surface
+    outside = np.zeros_like(surface)
+    outside[0, :, :] = outside[-1, :, :] = outside[:, 0, :] = outside[:, -1, :] = outside[:, :, 0] = outside[:, :, -1] = True
+    outside &= ~surface
+
+    while True:
+        grown = outside.copy()
+        grown[1:, :, :] |= outside[:-1, :, :]
+        grown[:-1, :, :] |= outside[1:, :, :]
+        grown[:, 1:, :] |= outside[:, :-1, :]
+        grown[:, :-1, :] |= outside[:, 1:, :]
+        grown[:, :, 1:] |= outside[:, :, :-1]
+        grown[:, :, :-1] |= outside[:, :, 1:]
+        grown &= ~surface
+        if np.array_equal(grown, outside):
+            return ~outside
+        outside = grown
+
+def voxelize(points, triangles, resolution=32):
+    # return solid voxel index and the grid origin and voxel size to turn index back to position
+    bound_min = points.min(axis=0)
+    voxel_size = max(float(np.ptp(points, axis=0).max()), 1e-6) / resolution
+    # one empty voxel around the mesh so the flood fill can go around
+    origin = bound_min - voxel_size
+
+    samples = sample_triangles(points, triangles, voxel_size * 0.5) if len(triangles) else points
+    indices = np.floor((samples - origin) / voxel_size).astype(np.int64)
+
+    surface = np.zeros(tuple(indices.max(axis=0) + 2), dtype=bool)
+    surface[indices[:, 0], indices[:, 1], indices[:, 2]] = True
+
+    return np.argwhere(fill_voxels(surface)), origin, voxel_size
+
+def get_voxel_hull_points(voxels, origin, voxel_size):
+    # hull of the voxel cubes is the hull of the voxel plus the cube corners, only hull vertex of the voxel can make a corner
+    # voxel index is the min corner of the voxel
+    centers = reduce_hull_points(voxels.astype(np.float64))
+    corners = (centers[:, None, :] + VOXEL_CORNERS[None, :, :]).reshape(-1, 3)
+    return reduce_hull_points(origin + corners * voxel_size)
+
+class ConvexPart:
+
+    def __init__(self, voxels, origin, voxel_size):
+        self.voxels = voxels
+        self.hull_points = get_voxel_hull_points(voxels, origin, voxel_size)
+        self.volume = len(voxels) * voxel_size ** 3
+        self.hull_volume = get_convex_hull_volume(self.hull_points)
+
+    @property
+    def concavity(self):
+        return max(self.hull_volume - self.volume, 0.0)
+
+def split_part(part, origin, voxel_size, planes_per_axis=7):
+    # try axis aligned plane through the voxel grid, keep the split with the smallest total hull volume
+    best = None
+    for axis in range(3):
+        low, high = part.voxels[:, axis].min(), part.voxels[:, axis].max()
+        if low == high:
+            continue
+        for position in np.unique(np.linspace(low + 1, high, planes_per_axis + 2, dtype=np.int64)[1:-1]):
+            mask = part.voxels[:, axis] < position
+            if mask.all() or not mask.any():
+                continue
+            parts = (ConvexPart(part.voxels[mask], origin, voxel_size), ConvexPart(part.voxels[~mask], origin, voxel_size))
+            cost = parts[0].hull_volume + parts[1].hull_volume
+            if best is None or cost < best[0]:
+                best = (cost, parts)
+    return best[1] if best is not None else None
+
+def convex_decomposition(points, triangles, max_hulls=8, concavity=0.01, resolution=32):
+    # v-hacd like, voxelize then split the most concave part on the best plane until it is convex enough
+    voxels, origin, voxel_size = voxelize(points, triangles, resolution)
+    parts = [ConvexPart(voxels, origin, voxel_size)]
+    max_concavity = concavity * parts[0].volume
+
+    while len(parts) < max_hulls:
+        candidates = [part for part in parts if part.concavity > max_concavity and len(part.voxels) > 1]
+        if not candidates:
+            break
+        part = max(candidates, key=lambda part: part.concavity)
+        split = split_part(part, origin, voxel_size)
+        if split is None:
+            break
+        parts.remove(part)
+        parts.extend(split)
+
+    # voxel can stick out of the mesh by one voxel, keep the hull inside the mesh bound
+    return [np.unique(np.clip(part.hull_points, points.min(axis=0), points.max(axis=0)), axis=0) for part in parts]
+
+def limit_hull_vertices(points, max_vertices):
+    # farthest point sampling from the extreme points, hull of the subset stay inside the original hull
+    if len(points) <= max_vertices:
+        return points
+
+    selected = [int(index) for index in np.unique(np.argmax(points @ HULL_DIRECTIONS.T, axis=0))][:max_vertices]
+    distances = np.min(np.linalg.norm(points[:, None, :] - points[selected][None, :, :], axis=2), axis=1)
+    while len(selected) < max_vertices:
+        index = int(np.argmax(distances))
+        selected.append(index)
+        distances = np.minimum(distances, np.linalg.norm(points - points[index], axis=1))
+    return points[selected]
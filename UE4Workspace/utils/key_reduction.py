@@ -0,0 +1,99 @@
+import numpy as np
+from . fbx_writer import FBXElement, write_elements
+from . fbx_reader import read_fbx, get_value, get_array, find_child
+
+# eInterpolationConstant, eInterpolationLinear, eInterpolationCubic bit of KeyAttrFlags
+FBX_INTERPOLATION_MASK = 0x0e
+FBX_INTERPOLATION_LINEAR = 0x04
+
+def reduce_keys(times, values, starts, tolerances):
+    # ramer douglas peucker on every curve at once, curves are concatenated and start at starts
+    # every segment between kept keys is split on its worst key until linear interpolation is within tolerance
+    count = len(values)
+    index = np.arange(count)
+    keep = np.zeros(count, dtype=bool)
+    keep[starts] = True
+    keep[np.append(starts[1:], count) - 1] = True
+
+    while True:
+        previous = np.maximum.accumulate(np.where(keep, index, 0))
+        following = np.minimum.accumulate(np.where(keep, index, count - 1)[::-1])[::-1]
+
+        span = times[following] - times[previous]
+        factor = np.divide(times - times[previous], span, out=np.zeros(count), where=(span > 0))
+        error = np.abs(values - (values[previous] + (values[following] - values[previous]) * factor)) - tolerances
+        error[keep] = -np.inf
+
+        segment_starts = np.flatnonzero(keep)
+        segment_ids = np.repeat(np.arange(len(segment_starts)), np.diff(np.append(segment_starts, count)))
+        segment_max = np.maximum.reduceat(error, segment_starts)
+
+        candidates = np.flatnonzero((error > 0) & (error == segment_max[segment_ids]))
+        if not len(candidates):
+            return keep
+
+        # one key per segment, the first one when several have the same error
+        segment_ids, first = np.unique(segment_ids[candidates], return_index=True)
+        keep[candidates[first]] = True
+
+def get_curve_node_types(objects, connections):
+    # AnimationCurve id to the T, R or S of the AnimationCurveNode it is connected to
+    curve_node_types = {}
+    for element in objects.children:
+        if element.name == b'AnimationCurveNode':
+            curve_node_types[get_value(element.props[0])] = get_value(element.props[1]).split(b'\x00\x01')[0]
+
+    return {get_value(element.props[1]): curve_node_types.get(get_value(element.props[2])) for element in connections.children if element.name == b'C' and get_value(element.props[0]) == b'OP'}
+
+def reduce_fbx_animation(filepath, location_tolerance=0.01, rotation_tolerance=0.05, scale_tolerance=0.0001, use_compression=True):
+    # remove baked key that linear interpolation of its neighbor already give, return number of removed key
+    elements = read_fbx(filepath)
+    if elements is None:
+        return 0
+
+    objects = next((element for element in elements if element.name == b'Objects'), None)
+    connections = next((element for element in elements if element.name == b'Connections'), None)
+    if objects is None or connections is None:
+        return 0
+
+    node_types = get_curve_node_types(objects, connections)
+    node_tolerances = {b'T': location_tolerance, b'R': rotation_tolerance, b'S': scale_tolerance}
+
+    curves = []
+    for element in objects.children:
+        if element.name != b'AnimationCurve' or node_types.get(get_value(element.props[0])) not in node_tolerances:
+            continue
+
+        key_time, key_value, key_flags, key_ref_count = [find_child(element, name) for name in ['KeyTime', 'KeyValueFloat', 'KeyAttrFlags', 'KeyAttrRefCount']]
+        if None in [key_time, key_value, key_flags, key_ref_count]:
+            continue
+
+        # only curve with one linear interpolation for every key, like blender write
+        flags = get_array(key_flags)
+        if len(flags) != 1 or (int(flags[0]) & FBX_INTERPOLATION_MASK) != FBX_INTERPOLATION_LINEAR:
+            continue
+
+        curves.append((element, key_time, key_value, key_ref_count, node_tolerances[node_types[get_value(element.props[0])]]))
+
+    if not curves:
+        return 0
+
+    lengths = np.array([len(get_array(key_time)) for element, key_time, key_value, key_ref_count, tolerance in curves])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    times = np.concatenate([get_array(key_time) for element, key_time, key_value, key_ref_count, tolerance in curves]).astype(np.float64)
+    values = np.concatenate([get_array(key_value) for element, key_time, key_value, key_ref_count, tolerance in curves]).astype(np.float64)
+    tolerances = np.repeat([tolerance for element, key_time, key_value, key_ref_count, tolerance in curves], lengths)
+
+    keep = reduce_keys(times, values, starts, tolerances)
+    if keep.all():
+        return 0
+
+    for (element, key_time, key_value, key_ref_count, tolerance), start, length in zip(curves, starts, lengths):
+        curve_keep = keep[start:start + length]
+        for child, array in [(key_time, get_array(key_time)[curve_keep]), (key_value, get_array(key_value)[curve_keep]), (key_ref_count, np.array([curve_keep.sum()], dtype=np.int32))]:
+            element.children[element.children.index(child)] = FBXElement(child.name.decode('utf-8'), array)
+
+    with open(filepath, 'wb') as file:
+        write_elements(file, elements, use_compression)
+
+    return int(len(keep) - keep.sum())
@@ -0,0 +1,93 @@
+import os
+import uuid
+import queue
+import threading
+from . connect import remote
+
+def transfer_file(file, data=None):
+    # send the fbx over the command socket instead of letting unreal engine read it from the temporary folder
+    if data is None:
+        with open(file['path'], 'rb') as fbx_file:
+            data = fbx_file.read()
+        os.remove(file['path'])
+
+    # unique folder for every file, exports with the same file name do not overwrite each other upload
+    file['transfer'] = uuid.uuid4().hex
+    return remote.send_file(file['transfer'], os.path.basename(file['path']), data)
+
+def remove_temporary_files(unreal_engine_import_setting, files, reports):
+    # every unreal engine node import the same file, remove it after all of them finished
+    # file stay in temporary folder when a node failed, so the import can be checked
+    if not unreal_engine_import_setting.get('temporary') or not all(report['success'] for report in reports):
+        return
+
+    for file in files:
+        if not file.get('transfer') and os.path.isfile(file['path']):
+            try:
+                os.remove(file['path'])
+            except OSError:
+                print('Failed to Remove Temporary File, Location : ' + file['path'])
+
+class ImportPipeline:
+
+    def __init__(self, script, unreal_engine_import_setting, max_queue_size=4, max_batch_size=8, transfer=False):
+        # unreal engine import run on a consumer thread while blender keep exporting
+        self.script = script
+        self.transfer = transfer
+        self.unreal_engine_import_setting = {key: value for key, value in unreal_engine_import_setting.items() if key != 'files'}
+        self.max_batch_size = max_batch_size
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.reports = []
+        self.cancelled = False
+        self.thread = threading.Thread(target=self.consume, daemon=True)
+        self.thread.start()
+
+    def put(self, file, data=None):
+        # block when unreal engine is behind, so exported file does not pile up
+        self.queue.put((file, data))
+
+    def consume(self):
+        is_closed = False
+        while not is_closed and not self.cancelled:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            # everything already waiting go in the same import call
+            batch = [item]
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    is_closed = True
+                    break
+                batch.append(item)
+
+            if not self.cancelled:
+                self.import_batch(batch)
+
+    def import_batch(self, batch):
+        try:
+            if self.transfer:
+                for file, data in batch:
+                    self.reports.extend([report for report in transfer_file(file, data) if not report['success']])
+            reports = remote.exec_script(self.script, args={'import_setting': dict(self.unreal_engine_import_setting, files=[file for file, data in batch])})
+            remove_temporary_files(self.unreal_engine_import_setting, [file for file, data in batch], reports)
+        except Exception as error:
+            reports = [{'node_id': None, 'success': False, 'result': str(error), 'elapsed': 0.0}]
+        self.reports.extend(reports)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        return self.reports
+
+    def cancel(self):
+        # import already sent to unreal engine finish on its own
+        self.cancelled = True
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
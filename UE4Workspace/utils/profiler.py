@@ -0,0 +1,89 @@
+import os
+import csv
+import json
+import time
+import functools
+from contextlib import contextmanager
+
+class ExportProfiler:
+
+    def __init__(self, name='', enabled=True):
+        self.name = name
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.records = []
+        self.remote_records = []
+
+    @contextmanager
+    def phase(self, phase, object_name=''):
+        # yield the record so the caller can fill the bytes written
+        record = {'phase': phase, 'object': object_name, 'elapsed': 0.0, 'bytes': 0}
+        if not self.enabled:
+            yield record
+            return
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['elapsed'] = time.perf_counter() - start
+            self.records.append(record)
+
+    def add_remote_reports(self, script, reports):
+        if self.enabled:
+            self.remote_records.extend([{'script': script, 'node_id': report['node_id'], 'success': report['success'], 'elapsed': report['elapsed']} for report in reports])
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def group_elapsed(self, key):
+        groups = {}
+        for record in self.records:
+            if record[key]:
+                groups[record[key]] = groups.get(record[key], 0.0) + record['elapsed']
+        return groups
+
+    def write(self, directory):
+        if not self.enabled:
+            return None
+
+        base_path = os.path.join(directory, 'ue4workspace_profile_' + self.name + '_' + time.strftime('%Y%m%d_%H%M%S') + '_' + str(os.getpid()))
+
+        with open(base_path + '.json', 'w+') as file:
+            file.write(json.dumps({
+                'name': self.name,
+                'total': self.total,
+                'bytes': sum([record['bytes'] for record in self.records]),
+                'phases': self.group_elapsed('phase'),
+                'objects': self.group_elapsed('object'),
+                'records': self.records,
+                'remote': self.remote_records
+            }, indent=4))
+
+        with open(base_path + '.csv', 'w+', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['phase', 'object', 'elapsed', 'bytes'])
+            for record in self.records:
+                writer.writerow([record['phase'], record['object'], '{0:.6f}'.format(record['elapsed']), record['bytes']])
+            for record in self.remote_records:
+                writer.writerow(['remote:' + record['script'], record['node_id'], '{0:.6f}'.format(record['elapsed']), 0])
+
+        return base_path
+
+    @property
+    def summary(self):
+        if not self.enabled:
+            return ''
+        phases = sorted(self.group_elapsed('phase').items(), key=lambda item: item[1], reverse=True)
+        return ', ' + ', '.join([phase + ' ' + '{0:.2f}s'.format(elapsed) for phase, elapsed in phases[:3]] + ['total ' + '{0:.2f}s'.format(self.total)])
+
+def profile_phase(phase):
+    # time an ExportOperator method, the first argument is used as object name when it is an object
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.phase(phase, getattr(args[0], 'name', '') if bool(args) else ''):
+                return function(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -2,6 +2,7 @@
 # Original file from Engine/Plugins/Experimental/PythonScriptPlugin/Content/Python/remote_execution.py
 
 import sys as _sys
+import re as _re
 import json as _json
 import uuid as _uuid
 import time as _time
@@ -21,11 +22,16 @@ _TYPE_COMMAND_RESULT = 'command_result'                 # Result of executing a
 
 _NODE_PING_SECONDS = 1                                  # Number of seconds to wait before sending another "ping" message to discover remote notes
 _NODE_TIMEOUT_SECONDS = 5                               # Number of seconds to wait before timing out a remote node that was discovered via UDP and has stopped sending "pong" responses
+_RECEIVE_BUFFER_SIZE = 65536                            # Initial size in bytes of the reusable buffer for TCP command results, it grows as needed for larger results
+_RECEIVE_BUFFER_MAX_KEEP_SIZE = 16 * 1024 * 1024        # Size in bytes above which the buffer is shrunk back to its initial size after a result has been received
+_JSON_STRUCTURE_PATTERN = _re.compile(b'[{}"]')         # Bytes that change the nesting of a received JSON document outside of a string
+_JSON_STRING_PATTERN = _re.compile(b'[^"\\\\]*(?:\\\\.[^"\\\\]*)*', _re.DOTALL) # Body of a string of a received JSON document, up to its closing quote or an unfinished escape
 
 # DEFAULT_MULTICAST_TTL = 0                               # Multicast TTL (0 is limited to the local host, 1 is limited to the local subnet)
 # DEFAULT_MULTICAST_GROUP_ENDPOINT = ('239.0.0.1', 6766)  # The multicast group endpoint tuple that the UDP multicast socket should join (must match the "Multicast Group Endpoint" setting in the Python plugin)
 # DEFAULT_MULTICAST_BIND_ADDRESS = '0.0.0.0'              # The adapter address that the UDP multicast socket should bind to, or 0.0.0.0 to bind to all adapters (must match the "Multicast Bind Address" setting in the Python plugin)
 # DEFAULT_COMMAND_ENDPOINT = ('127.0.0.1', 6776)          # The endpoint tuple for the TCP command connection hosted by this client (that the remote client will connect to)
+# DEFAULT_COMMAND_TIMEOUT = None                          # Number of seconds to wait for a remote node to answer a command, or None to wait forever
 
 # Execution modes (these must match the names given to LexToString for EPythonCommandExecutionMode in IPythonScriptPlugin.h)
 MODE_EXEC_FILE = 'ExecuteFile'                          # Execute the Python command as a file. This allows you to execute either a literal Python script containing multiple statements, or a file with optional arguments
@@ -36,11 +42,12 @@ class RemoteExecutionConfig(object):
     '''
     Configuration data for establishing a remote connection with a UE4 instance running Python.
     '''
-    def __init__(self, DEFAULT_MULTICAST_TTL=0, DEFAULT_MULTICAST_GROUP_ENDPOINT=("239.0.0.1", 6766), DEFAULT_MULTICAST_BIND_ADDRESS="0.0.0.0", DEFAULT_COMMAND_ENDPOINT=("127.0.0.1", 6776)):
+    def __init__(self, DEFAULT_MULTICAST_TTL=0, DEFAULT_MULTICAST_GROUP_ENDPOINT=("239.0.0.1", 6766), DEFAULT_MULTICAST_BIND_ADDRESS="0.0.0.0", DEFAULT_COMMAND_ENDPOINT=("127.0.0.1", 6776), DEFAULT_COMMAND_TIMEOUT=None):
         self.multicast_ttl = DEFAULT_MULTICAST_TTL
         self.multicast_group_endpoint = DEFAULT_MULTICAST_GROUP_ENDPOINT
         self.multicast_bind_address = DEFAULT_MULTICAST_BIND_ADDRESS
         self.command_endpoint = DEFAULT_COMMAND_ENDPOINT
+        self.command_timeout = DEFAULT_COMMAND_TIMEOUT
 
 class RemoteExecution(object):
     '''
@@ -53,6 +60,8 @@ class RemoteExecution(object):
         self._config = config
         self._broadcast_connection = None
         self._command_connection = None
+        self._command_connections = {}
+        self._command_connections_lock = _threading.RLock()
         self._node_id = str(_uuid.uuid4())
 
     @property
@@ -78,6 +87,7 @@ class RemoteExecution(object):
         Stop the remote execution session. This will end the discovey process for remote "nodes" (UE4 instances running Python), and close any open command connection.
         '''
         self.close_command_connection()
+        self.close_command_connections()
         if self._broadcast_connection:
             self._broadcast_connection.close()
             self._broadcast_connection = None
@@ -109,24 +119,143 @@ class RemoteExecution(object):
             self._command_connection.close(self._broadcast_connection)
             self._command_connection = None
 
-    def run_command(self, command, unattended=True, exec_mode=MODE_EXEC_FILE, raise_on_failure=False):
+    def get_command_connection(self, remote_node_id):
         '''
-        Run a command remotely based on the current command connection.
+        Get the pooled command connection to the given remote "node", opening a new one if there is none or the pooled one is no longer alive.
+
+        Args:
+            remote_node_id (string): The ID of the remote node (this can be obtained by querying `remote_nodes`).
+
+        Returns:
+            _RemoteExecutionCommandConnection: The open command connection.
+        '''
+        with self._command_connections_lock:
+            command_connection = self._command_connections.get(remote_node_id)
+            if command_connection and command_connection.is_alive():
+                return command_connection
+            if command_connection:
+                self.close_command_connections(remote_node_id)
+            # Command connections share the same command endpoint, so open them one at a time
+            command_connection = _RemoteExecutionCommandConnection(self._config, self._node_id, remote_node_id)
+            command_connection.open(self._broadcast_connection)
+            self._command_connections[remote_node_id] = command_connection
+            return command_connection
+
+    def close_command_connections(self, *remote_node_ids):
+        '''
+        Close pooled command connections.
+
+        Args:
+            remote_node_ids (string): The IDs of the remote nodes to close, or nothing to close every pooled command connection.
+        '''
+        with self._command_connections_lock:
+            for remote_node_id in list(remote_node_ids or self._command_connections.keys()):
+                command_connection = self._command_connections.pop(remote_node_id, None)
+                if command_connection:
+                    command_connection.close(self._broadcast_connection)
+
+    def prune_command_connections(self):
+        '''
+        Close pooled command connections of remote nodes that are no longer discovered.
+        '''
+        with self._command_connections_lock:
+            remote_node_ids = [remote_node['node_id'] for remote_node in self.remote_nodes]
+            self.close_command_connections(*[remote_node_id for remote_node_id in self._command_connections.keys() if remote_node_id not in remote_node_ids])
+
+    def run_command(self, command, unattended=True, exec_mode=MODE_EXEC_FILE, raise_on_failure=False, remote_node_id=None):
+        '''
+        Run a command remotely based on the current command connection, or the pooled command connection of the given remote node.
 
         Args:
             command (string): The Python command to run remotely.
             unattended (bool): True to run this command in "unattended" mode (suppressing some UI).
             exec_mode (string): The execution mode to use as a string value (must be one of MODE_EXEC_FILE, MODE_EXEC_STATEMENT, or MODE_EVAL_STATEMENT).
             raise_on_failure (bool): True to raise a RuntimeError if the command fails on the remote target.
+            remote_node_id (string): The ID of the remote node to run the command on using the connection pool, or None to use the current command connection.
 
         Returns:
             dict: The result from running the remote command (see `command_result` from the protocol definition).
         '''
-        data = self._command_connection.run_command(command, unattended, exec_mode)
+        if remote_node_id is None:
+            data = self._command_connection.run_command(command, unattended, exec_mode)
+        else:
+            data = self._run_pooled_command(command, unattended, exec_mode, remote_node_id)
         if raise_on_failure and not data['success']:
             raise RuntimeError('Remote Python Command failed! {0}'.format(data['result']))
         return data
 
+    def run_command_on_nodes(self, commands, unattended=True, exec_mode=MODE_EXEC_FILE, concurrent=True):
+        '''
+        Run a command on several remote nodes using the connection pool, each node on its own thread.
+
+        Args:
+            commands (dict): The Python command to run remotely, keyed by the ID of the remote node to run it on.
+            unattended (bool): True to run this command in "unattended" mode (suppressing some UI).
+            exec_mode (string): The execution mode to use as a string value (must be one of MODE_EXEC_FILE, MODE_EXEC_STATEMENT, or MODE_EVAL_STATEMENT).
+            concurrent (bool): False to run the command on one node after another.
+
+        Returns:
+            list: A report dict per remote node containing the node ID, whether it succeeded, the result and the elapsed seconds.
+        '''
+        reports = {remote_node_id: {'node_id': remote_node_id, 'success': False, 'result': None, 'elapsed': 0.0} for remote_node_id in commands.keys()}
+
+        def run(remote_node_id):
+            report = reports[remote_node_id]
+            start = _time_now()
+            try:
+                data = self._run_pooled_command(commands[remote_node_id], unattended, exec_mode, remote_node_id)
+                report['success'] = data['success']
+                report['result'] = data['result']
+            except _socket.timeout:
+                report['result'] = 'Remote party did not respond within {0} seconds!'.format(self._config.command_timeout)
+            except (OSError, RuntimeError) as e:
+                report['result'] = str(e)
+            report['elapsed'] = _time_now() - start
+
+        # Command connections share the same command endpoint so they are opened one after another, only the commands run concurrently
+        for remote_node_id in commands.keys():
+            try:
+                self.get_command_connection(remote_node_id)
+            except (OSError, RuntimeError) as e:
+                reports[remote_node_id]['result'] = str(e)
+
+        remote_node_ids = [remote_node_id for remote_node_id in commands.keys() if remote_node_id in self._command_connections]
+        if concurrent and len(remote_node_ids) > 1:
+            threads = [_threading.Thread(target=run, args=(remote_node_id,)) for remote_node_id in remote_node_ids]
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+            for thread in threads:
+                thread.join()
+        else:
+            for remote_node_id in remote_node_ids:
+                run(remote_node_id)
+
+        return list(reports.values())
+
+    def _run_pooled_command(self, command, unattended, exec_mode, remote_node_id):
+        '''
+        Run a command on the pooled command connection of the given remote node, reconnecting once if the command could not be sent.
+
+        Returns:
+            dict: The result from running the remote command (see `command_result` from the protocol definition).
+        '''
+        command_connection = self.get_command_connection(remote_node_id)
+        try:
+            command_connection.send_command(command, unattended, exec_mode)
+        except OSError:
+            # The command never reached the remote party, so it is safe to send it again over a new connection
+            self.close_command_connections(remote_node_id)
+            command_connection = self.get_command_connection(remote_node_id)
+            command_connection.send_command(command, unattended, exec_mode)
+        # The command timeout can change while the connection stays in the pool
+        command_connection.set_command_timeout(self._config.command_timeout)
+        try:
+            return command_connection.receive_command_result()
+        except (OSError, RuntimeError):
+            self.close_command_connections(remote_node_id)
+            raise
+
 class _RemoteExecutionNode(object):
     '''
     A discovered remote "node" (aka, a UE4 instance running Python).
@@ -384,6 +513,7 @@ class _RemoteExecutionCommandConnection(object):
         self._remote_node_id = remote_node_id
         self._command_listen_socket = None
         self._command_channel_socket = _socket.socket() # This type is only here to appease PyLint
+        self._receive_buffer = bytearray(_RECEIVE_BUFFER_SIZE)
 
     def open(self, broadcast_connection):
         '''
@@ -411,6 +541,16 @@ class _RemoteExecutionCommandConnection(object):
             self._command_listen_socket.close()
             self._command_listen_socket = None
 
+    def set_command_timeout(self, command_timeout):
+        '''
+        Set how long to wait for the remote party between two received chunks of a command result.
+
+        Args:
+            command_timeout (float): Number of seconds to wait, or None to wait forever.
+        '''
+        if self._command_channel_socket:
+            self._command_channel_socket.settimeout(command_timeout)
+
     def run_command(self, command, unattended, exec_mode):
         '''
         Run a command on the remote party.
@@ -423,14 +563,57 @@ class _RemoteExecutionCommandConnection(object):
         Returns:
             dict: The result from running the remote command (see `command_result` from the protocol definition).
         '''
+        self.send_command(command, unattended, exec_mode)
+        return self.receive_command_result()
+
+    def send_command(self, command, unattended, exec_mode):
+        '''
+        Send a command to the remote party without waiting for the result.
+
+        Args:
+            command (string): The Python command to run remotely.
+            unattended (bool): True to run this command in "unattended" mode (suppressing some UI).
+            exec_mode (string): The execution mode to use as a string value (must be one of MODE_EXEC_FILE, MODE_EXEC_STATEMENT, or MODE_EVAL_STATEMENT).
+        '''
         self._send_message(_RemoteExecutionMessage(_TYPE_COMMAND, self._node_id, self._remote_node_id, {
             'command': command,
             'unattended': unattended,
             'exec_mode': exec_mode,
             }))
+
+    def receive_command_result(self):
+        '''
+        Wait for the result of the last command sent to the remote party.
+
+        Returns:
+            dict: The result from running the remote command (see `command_result` from the protocol definition).
+        '''
         result = self._receive_message(_TYPE_COMMAND_RESULT)
         return result.data
 
+    def is_alive(self):
+        '''
+        Check whether the command connection is still usable, without blocking.
+
+        Returns:
+            bool: True if the socket is open with no unexpected pending data, False otherwise.
+        '''
+        if not self._command_channel_socket:
+            return False
+        timeout = self._command_channel_socket.gettimeout()
+        try:
+            self._command_channel_socket.setblocking(False)
+            try:
+                # Empty data means the remote party closed the connection, pending data means the channel is out of sync
+                self._command_channel_socket.recv(1, _socket.MSG_PEEK)
+            finally:
+                self._command_channel_socket.settimeout(timeout)
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            return False
+        return False
+
     def _send_message(self, message):
         '''
         Send the given message over the TCP socket to the remote party.
@@ -450,18 +633,71 @@ class _RemoteExecutionCommandConnection(object):
         Returns:
             The message that was received.
         '''
-        data = self._command_channel_socket.recv(4096)
-        if data:
+        json_obj = self._receive_json_obj()
+        if json_obj is not None:
             message = _RemoteExecutionMessage(None, None)
-            if message.from_json_bytes(data) and message.passes_receive_filter(self._node_id) and message.type_ == expected_type:
+            if message.from_json_obj(json_obj) and message.passes_receive_filter(self._node_id) and message.type_ == expected_type:
                 return message
         raise RuntimeError('Remote party failed to send a valid response!')
 
+    def _receive_json_obj(self):
+        '''
+        Receive data over the TCP socket into the reusable receive buffer until it holds a complete JSON document.
+        The protocol has no length prefix, so the brace depth is tracked over each received chunk (skipping strings and escapes) and the document is parsed once when the outer object closes.
+
+        Returns:
+            dict: The parsed JSON document, or None if the remote party closed the connection before sending a complete document.
+        '''
+        size = 0
+        position = 0
+        depth = 0
+        in_string = False
+        view = memoryview(self._receive_buffer)
+        try:
+            while True:
+                if size == len(self._receive_buffer):
+                    # A bytearray cannot be resized while a memoryview of it exists
+                    view.release()
+                    self._receive_buffer.extend(bytearray(len(self._receive_buffer)))
+                    view = memoryview(self._receive_buffer)
+                received = self._command_channel_socket.recv_into(view[size:])
+                if not received:
+                    return None
+                size += received
+                # Only the new bytes are scanned, a string or an escape cut by the end of a chunk continue from where it stopped
+                while position < size:
+                    if in_string:
+                        position = _JSON_STRING_PATTERN.match(self._receive_buffer, position, size).end()
+                        if position == size or self._receive_buffer[position] != 0x22: # '"'
+                            break
+                        in_string = False
+                        position += 1
+                        continue
+                    match = _JSON_STRUCTURE_PATTERN.search(self._receive_buffer, position, size)
+                    if match is None:
+                        position = size
+                        break
+                    byte = self._receive_buffer[match.start()]
+                    position = match.start() + 1
+                    if byte == 0x22: # '"'
+                        in_string = True
+                    elif byte == 0x7B: # '{'
+                        depth += 1
+                    else: # '}'
+                        depth -= 1
+                        if depth == 0:
+                            return _json.loads(str(view[:position], 'utf-8'))
+        finally:
+            view.release()
+            if len(self._receive_buffer) > _RECEIVE_BUFFER_MAX_KEEP_SIZE:
+                self._receive_buffer = bytearray(_RECEIVE_BUFFER_SIZE)
+
     def _init_command_listen_socket(self):
         '''
         Initialize the TCP based command socket based on the current configuration, and set it to listen for an incoming connection.
         '''
         self._command_listen_socket = _socket.socket(_socket.AF_INET, _socket.SOCK_STREAM, _socket.IPPROTO_TCP) # TCP/IP socket
+        self._command_listen_socket.setsockopt(_socket.SOL_SOCKET, _socket.SO_REUSEADDR, 1)
         self._command_listen_socket.bind(self._config.command_endpoint)
         self._command_listen_socket.listen(1)
         self._command_listen_socket.settimeout(5)
@@ -478,6 +714,10 @@ class _RemoteExecutionCommandConnection(object):
             try:
                 self._command_channel_socket = self._command_listen_socket.accept()[0]
                 self._command_channel_socket.setblocking(True)
+                self._command_channel_socket.settimeout(self._config.command_timeout)
+                # The listen socket is only needed to accept, free the command endpoint for the next command connection
+                self._command_listen_socket.close()
+                self._command_listen_socket = None
                 return
             except _socket.timeout:
                 continue
@@ -555,7 +795,23 @@ class _RemoteExecutionMessage(object):
             bool: True if this message could be parsed, False otherwise.
         '''
         try:
-            json_obj = _json.loads(json_str, encoding='utf-8')
+            json_obj = _json.loads(json_str)
+        except Exception as e:
+            print('Failed to deserialize JSON "{0}": {1}'.format(json_str, str(e)))
+            return False
+        return self.from_json_obj(json_obj)
+
+    def from_json_obj(self, json_obj):
+        '''
+        Parse this message from its already deserialized JSON representation.
+
+        Args:
+            json_obj (dict): The deserialized JSON representation of this message.
+
+        Returns:
+            bool: True if this message could be parsed, False otherwise.
+        '''
+        try:
             # Read and validate required protocol version information
             if json_obj['version'] != _PROTOCOL_VERSION:
                 raise ValueError('"version" is incorrect (got {0}, expected {1})!'.format(json_obj['version'], _PROTOCOL_VERSION))
@@ -570,7 +826,7 @@ class _RemoteExecutionMessage(object):
             self.dest = json_obj.get('dest')
             self.data = json_obj.get('data')
         except Exception as e:
-            print('Failed to deserialize JSON "{0}": {1}'.format(json_str, str(e)))
+            print('Failed to deserialize JSON "{0}": {1}'.format(json_obj, str(e)))
             return False
         return True
 
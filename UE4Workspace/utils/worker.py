@@ -0,0 +1,223 @@
+import os
+import re
+import json
+import shutil
+import tempfile
+import subprocess
+import bpy
+from . connect import skeletons
+
+# set on background worker process, path for worker to write export result
+WORKER_RESULT_ENV = 'UE4WORKSPACE_WORKER_RESULT'
+
+WORKER_SCRIPT = os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'background_script', 'ExportWorker.py'))
+
+# object names to export, only filled on background worker process
+job_objects = []
+# extra data from the export operator, only filled on background worker process
+job_data = {}
+
+def is_worker():
+    return bool(os.environ.get(WORKER_RESULT_ENV))
+
+def write_worker_result(result):
+    with open(os.environ[WORKER_RESULT_ENV], 'w+') as file:
+        file.write(json.dumps(result))
+
+def property_group_to_dict(property_group):
+    data = {}
+    for prop in property_group.bl_rna.properties:
+        if prop.identifier in ['rna_type', 'bl_idname'] or prop.type == 'COLLECTION' or (prop.is_readonly and prop.type != 'POINTER'):
+            continue
+        value = getattr(property_group, prop.identifier, None)
+        if prop.type == 'POINTER':
+            if isinstance(value, bpy.types.PropertyGroup):
+                data[prop.identifier] = property_group_to_dict(value)
+        elif prop.type == 'ENUM' and prop.is_enum_flag:
+            data[prop.identifier] = list(value)
+        elif getattr(prop, 'is_array', False):
+            data[prop.identifier] = list(value)
+        else:
+            data[prop.identifier] = value
+    return data
+
+def dict_to_property_group(property_group, data):
+    for key, value in data.items():
+        if isinstance(value, dict):
+            dict_to_property_group(getattr(property_group, key), value)
+        else:
+            try:
+                setattr(property_group, key, set(value) if property_group.bl_rna.properties[key].type == 'ENUM' and isinstance(value, list) else value)
+            except (AttributeError, TypeError, ValueError, KeyError):
+                print('Failed to set preference ' + key)
+
+def create_shards(objects, total, key, weight=None):
+    # objects with same filename, ignoring the duplicate suffix, stay on same shard so the suffix stay unique
+    groups = {}
+    for obj in objects:
+        groups.setdefault(re.sub(r'(_\d+)+$', '', key(obj.name)).lower(), []).append(obj)
+
+    if weight is None:
+        weight = lambda obj: 1 + (len(obj.data.polygons) if obj.type == 'MESH' else 0)
+    weights = {name: sum([weight(obj) for obj in group]) for name, group in groups.items()}
+
+    shards = [[] for _ in range(min(total, len(groups)))]
+    shard_weights = [0] * len(shards)
+    for name in sorted(groups, key=lambda name: weights[name], reverse=True):
+        index = shard_weights.index(min(shard_weights))
+        shards[index].extend([obj.name for obj in groups[name]])
+        shard_weights[index] += weights[name]
+
+    return [shard for shard in shards if bool(shard)]
+
+def start_worker(directory, snapshot, index, job):
+    job_path = os.path.join(directory, 'job_' + str(index) + '.json')
+    result_path = os.path.join(directory, 'result_' + str(index) + '.json')
+    log_path = os.path.join(directory, 'log_' + str(index) + '.txt')
+
+    with open(job_path, 'w+') as file:
+        file.write(json.dumps(job))
+
+    log_file = open(log_path, 'w+')
+    process = subprocess.Popen([bpy.app.binary_path, '--background', '-noaudio', snapshot, '--python-exit-code', '1', '--python', WORKER_SCRIPT, '--', job_path], stdout=log_file, stderr=subprocess.STDOUT, env=dict(os.environ, **{WORKER_RESULT_ENV: result_path}))
+    return process, log_file, log_path, result_path
+
+def read_worker_result(process, log_path, result_path):
+    if process.returncode == 0 and os.path.isfile(result_path):
+        with open(result_path, 'r') as file:
+            return json.loads(file.read())
+
+    with open(log_path, 'r') as file:
+        print('Background Worker Failed :\n' + file.read())
+    return None
+
+def wait_workers(processes):
+    # yield None while a worker still run, so modal operator keep the ui responsive
+    results = []
+    for process, log_file, log_path, result_path in processes:
+        while True:
+            try:
+                process.wait(timeout=0.01)
+                break
+            except subprocess.TimeoutExpired:
+                yield None
+        log_file.close()
+        results.append(read_worker_result(process, log_path, result_path))
+    return results
+
+def stop_workers(processes):
+    # worker still running when the operator is cancelled
+    for process, log_file, log_path, result_path in processes:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        log_file.close()
+
+def save_snapshot(directory):
+    snapshot = os.path.join(directory, 'snapshot.blend')
+    bpy.ops.wm.save_as_mainfile(filepath=snapshot, copy=True, check_existing=False)
+    return snapshot
+
+def run_export_workers(operator_idname, section, objects, preferences, total, key, weight=None, data=None):
+    # generator, yield None while waiting, return (files, cache changes, failed)
+    preferences_dict = property_group_to_dict(preferences)
+    if 'option' in preferences_dict.get(section, {}):
+        preferences_dict[section]['option'] = 'SELECT'
+
+    files = []
+    cache_changes = {}
+    failed = 0
+    directory = tempfile.mkdtemp(prefix='ue4workspace_')
+    processes = []
+
+    try:
+        snapshot = save_snapshot(directory)
+
+        for index, shard in enumerate(create_shards(objects, total, key, weight)):
+            processes.append(start_worker(directory, snapshot, index, {
+                'operator': operator_idname,
+                'objects': shard,
+                'preferences': preferences_dict,
+                'skeletons': skeletons,
+                'data': data if data is not None else {}
+            }))
+
+        results = yield from wait_workers(processes)
+        for result in results:
+            if result is None:
+                failed += 1
+            else:
+                files.extend(result['files'])
+                cache_changes.update(result.get('cache_changes', {}))
+    finally:
+        stop_workers(processes)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return files, cache_changes, failed
+
+def run_mesh_workers(operator_idname, objects, properties, total):
+    # generator, yield None while waiting, return (meshes, failed)
+    # worker write the mesh it made to a .blend library, the meshes are appended here
+    meshes = {}
+    failed = 0
+    directory = tempfile.mkdtemp(prefix='ue4workspace_')
+    processes = []
+
+    try:
+        snapshot = save_snapshot(directory)
+
+        for index, shard in enumerate(create_shards(objects, total, lambda name: name)):
+            processes.append(start_worker(directory, snapshot, index, {
+                'operator': operator_idname,
+                'objects': shard,
+                'properties': properties,
+                'skeletons': skeletons
+            }))
+
+        results = yield from wait_workers(processes)
+        for result in results:
+            if result is None:
+                failed += 1
+                continue
+
+            mesh_names = [name for names in result['meshes'].values() for name in names]
+            with bpy.data.libraries.load(result['library']) as (data_from, data_to):
+                data_to.meshes = mesh_names
+
+            # appended mesh can be renamed when the name is taken, map it back by order
+            appended = dict(zip(mesh_names, data_to.meshes))
+            for obj_name, names in result['meshes'].items():
+                meshes[obj_name] = [appended[name] for name in names if appended.get(name) is not None]
+    finally:
+        stop_workers(processes)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return meshes, failed
+
+def write_worker_meshes(meshes):
+    # meshes is {object name: [mesh]}, written next to the worker result
+    library = os.path.splitext(os.environ[WORKER_RESULT_ENV])[0] + '.blend'
+    bpy.data.libraries.write(library, set([mesh for obj_meshes in meshes.values() for mesh in obj_meshes]), fake_user=False)
+    write_worker_result({
+        'library': library,
+        'meshes': {obj_name: [mesh.name for mesh in obj_meshes] for obj_name, obj_meshes in meshes.items()}
+    })
+
+def run_job(job_path):
+    with open(job_path, 'r') as file:
+        job = json.loads(file.read())
+
+    skeletons.clear()
+    skeletons.extend([tuple(skeleton) for skeleton in job['skeletons']])
+
+    preferences = bpy.context.preferences.addons['UE4Workspace'].preferences
+    dict_to_property_group(preferences, job.get('preferences', {}))
+
+    job_objects.clear()
+    job_objects.extend(job['objects'])
+
+    job_data.clear()
+    job_data.update(job.get('data', {}))
+
+    category, operator = job['operator'].split('.')
+    return getattr(getattr(bpy.ops, category), operator)(**job.get('properties', {}))
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import tempfile
+import bpy
+import addon_utils
+
+# compare UE4Workspace fast fbx writer with Blender FBX exporter on a 1M triangle static mesh, need UE4Workspace add-on installed
+# blender --background --factory-startup --python benchmark/fbx_writer.py -- [triangles] [repeat]
+
+if 'UE4Workspace' not in bpy.context.preferences.addons:
+    addon_utils.enable('UE4Workspace', default_set=False)
+
+from UE4Workspace.utils import fbx_writer
+
+args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+triangles = int(args[0]) if len(args) > 0 else 1000000
+repeat = int(args[1]) if len(args) > 1 else 3
+
+# grid of n * n quad give 2 * n * n triangle
+subdivisions = int((triangles / 2) ** 0.5) + 1
+
+bpy.ops.object.select_all(action='DESELECT')
+bpy.ops.mesh.primitive_grid_add(x_subdivisions=subdivisions, y_subdivisions=subdivisions, size=2, calc_uvs=True)
+obj = bpy.context.active_object
+obj.data.uv_layers.new(name='Lightmap')
+
+for index in range(2):
+    obj.data.materials.append(bpy.data.materials.new('Material_' + str(index)))
+obj.data.polygons.foreach_set('material_index', [index % 2 for index in range(len(obj.data.polygons))])
+
+bpy.ops.object.modifier_add(type='TRIANGULATE')
+
+scene = bpy.context.scene
+depsgraph = bpy.context.evaluated_depsgraph_get()
+directory = tempfile.mkdtemp(prefix='ue4workspace_benchmark_')
+
+export_setting = {
+    'check_existing': False,
+    'use_selection': True,
+    'object_types': {'MESH', 'EMPTY'},
+    'bake_anim': False,
+    'mesh_smooth_type': 'OFF',
+    'use_mesh_modifiers': True
+}
+
+def benchmark(name, function):
+    filepath = os.path.join(directory, name + '.fbx')
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(filepath)
+        timings.append(time.perf_counter() - start)
+    print('{0:<12} best {1:8.3f}s mean {2:8.3f}s size {3:10.2f} MB'.format(name, min(timings), sum(timings) / len(timings), os.path.getsize(filepath) / (1024 * 1024)))
+    return min(timings)
+
+print('Triangles : ' + str(len(obj.evaluated_get(depsgraph).data.polygons)) + ', Repeat : ' + str(repeat))
+
+stock = benchmark('stock', lambda filepath: bpy.ops.export_scene.fbx(filepath=filepath, **export_setting))
+fast = benchmark('fast', lambda filepath: fbx_writer.write_fbx([obj], scene, depsgraph, filepath=filepath, **export_setting))
+uncompressed = benchmark('uncompressed', lambda filepath: fbx_writer.write_fbx([obj], scene, depsgraph, filepath=filepath, use_compression=False, **export_setting))
+
+print('Speedup : {0:.2f}x, {1:.2f}x uncompressed'.format(stock / fast, stock / uncompressed))
+print('Output : ' + directory)
@@ -0,0 +1,132 @@
+import os
+import sys
+import math
+import tempfile
+import bpy
+import addon_utils
+from mathutils import Matrix, Euler
+
+# compare what UE4Workspace fast fbx writer write with Blender FBX exporter, need UE4Workspace add-on installed
+# axis settings, root and child transform, lod group and mesh data of both file must be the same
+# blender --background --factory-startup --python benchmark/fbx_writer_check.py
+
+if 'UE4Workspace' not in bpy.context.preferences.addons:
+    addon_utils.enable('UE4Workspace', default_set=False)
+
+from UE4Workspace.utils import fbx_writer
+from UE4Workspace.utils.fbx_reader import read_fbx, get_value, get_array, find_child
+
+TOLERANCE = 1e-4
+
+bpy.ops.object.select_all(action='DESELECT')
+
+bpy.ops.mesh.primitive_grid_add(x_subdivisions=8, y_subdivisions=6, size=2, calc_uvs=True, location=(1.5, -2.0, 0.75), rotation=(0.3, -0.2, 1.1))
+root = bpy.context.active_object
+root.name = 'CheckRoot'
+root.scale = (1.5, 0.5, 2.0)
+root.data.materials.append(bpy.data.materials.new('CheckMaterial'))
+
+bpy.ops.mesh.primitive_cube_add(size=0.5, location=(0.5, 0.5, 1.0), rotation=(0.0, 0.4, 0.0))
+child = bpy.context.active_object
+child.name = 'CheckChild'
+child.parent = root
+child.matrix_parent_inverse = root.matrix_world.inverted()
+
+lod_group = bpy.data.objects.new('LOD_CheckRoot', None)
+bpy.context.scene.collection.objects.link(lod_group)
+lod_group.location = (-1.0, 2.0, 0.0)
+lod_group['fbx_type'] = 'LodGroup'
+
+objects = [root, child, lod_group]
+scene = bpy.context.scene
+bpy.context.view_layer.update()
+depsgraph = bpy.context.evaluated_depsgraph_get()
+directory = tempfile.mkdtemp(prefix='ue4workspace_check_')
+
+def get_properties(element):
+    properties = find_child(element, 'Properties70')
+    if properties is None:
+        return {}
+    return {get_value(prop.props[0]).decode('utf-8'): [get_value(value) for value in prop.props[4:]] for prop in properties.children}
+
+def get_global_settings(elements):
+    global_settings = next(element for element in elements if element.name == b'GlobalSettings')
+    properties = get_properties(global_settings)
+    return {name: properties[name][0] for name in ['UpAxis', 'UpAxisSign', 'FrontAxis', 'FrontAxisSign', 'CoordAxis', 'CoordAxisSign', 'UnitScaleFactor']}
+
+def get_model_matrices(elements):
+    objects_element = next(element for element in elements if element.name == b'Objects')
+    matrices = {}
+    for element in objects_element.children:
+        if element.name != b'Model':
+            continue
+        properties = get_properties(element)
+        location = properties.get('Lcl Translation', [0.0, 0.0, 0.0])
+        rotation = properties.get('Lcl Rotation', [0.0, 0.0, 0.0])
+        scale = properties.get('Lcl Scaling', [1.0, 1.0, 1.0])
+        matrix = Matrix.Translation(location) @ Euler([math.radians(value) for value in rotation], 'XYZ').to_matrix().to_4x4()
+        for axis, value in enumerate(scale):
+            matrix = matrix @ Matrix.Scale(value, 4, [1.0 if index == axis else 0.0 for index in range(3)])
+        matrices[get_value(element.props[1]).split(b'\x00\x01')[0].decode('utf-8')] = matrix
+    return matrices
+
+def get_geometries(elements):
+    objects_element = next(element for element in elements if element.name == b'Objects')
+    return {get_value(element.props[1]).split(b'\x00\x01')[0].decode('utf-8'): (get_array(find_child(element, 'Vertices')), get_array(find_child(element, 'PolygonVertexIndex'))) for element in objects_element.children if element.name == b'Geometry'}
+
+def compare(axis_forward, axis_up):
+    export_setting = {
+        'check_existing': False,
+        'use_selection': True,
+        'object_types': {'MESH', 'EMPTY'},
+        'bake_anim': False,
+        'axis_forward': axis_forward,
+        'axis_up': axis_up,
+        'use_mesh_modifiers': True
+    }
+    stock_path = os.path.join(directory, 'stock_' + axis_forward + axis_up + '.fbx')
+    fast_path = os.path.join(directory, 'fast_' + axis_forward + axis_up + '.fbx')
+
+    for obj in objects:
+        obj.select_set(state=True)
+    bpy.ops.export_scene.fbx(filepath=stock_path, **export_setting)
+    fbx_writer.write_fbx(objects, scene, depsgraph, filepath=fast_path, **export_setting)
+
+    stock = read_fbx(stock_path)
+    fast = read_fbx(fast_path)
+    errors = []
+
+    stock_settings, fast_settings = get_global_settings(stock), get_global_settings(fast)
+    for name, value in stock_settings.items():
+        if abs(value - fast_settings[name]) > TOLERANCE:
+            errors.append('GlobalSettings ' + name + ' stock ' + str(value) + ' fast ' + str(fast_settings[name]))
+
+    stock_matrices, fast_matrices = get_model_matrices(stock), get_model_matrices(fast)
+    for name, matrix in stock_matrices.items():
+        if name not in fast_matrices:
+            errors.append('Model ' + name + ' missing')
+            continue
+        difference = max([abs(value) for row in (matrix - fast_matrices[name]) for value in row])
+        if difference > TOLERANCE:
+            errors.append('Model ' + name + ' transform differ by ' + str(difference))
+
+    stock_geometries, fast_geometries = get_geometries(stock), get_geometries(fast)
+    for name, (vertices, polygons) in stock_geometries.items():
+        if name not in fast_geometries:
+            errors.append('Geometry ' + name + ' missing')
+            continue
+        fast_vertices, fast_polygons = fast_geometries[name]
+        if len(vertices) != len(fast_vertices) or abs(vertices - fast_vertices).max() > TOLERANCE:
+            errors.append('Geometry ' + name + ' vertices differ')
+        if len(polygons) != len(fast_polygons) or (polygons != fast_polygons).any():
+            errors.append('Geometry ' + name + ' polygons differ')
+
+    print('{0:<4} {1:<4} {2}'.format(axis_forward, axis_up, 'OK' if not errors else 'FAILED'))
+    for error in errors:
+        print('    ' + error)
+    return not errors
+
+results = [compare(axis_forward, axis_up) for axis_forward, axis_up in [('-Z', 'Y'), ('Y', 'Z'), ('X', 'Z'), ('-Y', '-X')]]
+
+print('Output : ' + directory)
+sys.exit(0 if all(results) else 1)